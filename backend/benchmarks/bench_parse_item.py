@@ -0,0 +1,165 @@
+"""
+Items/sec for turning Creators API items into response dicts, old vs new.
+
+    python benchmarks/bench_parse_item.py
+    python benchmarks/bench_parse_item.py --items 20000
+
+"before" is the original main._parse_item (nested try/except, 9-key dict)
+followed by the per-endpoint copy; "after" is services.products.parse_item
+plus the endpoint's serializer. Items come from a synthetic SearchItems payload
+(fixtures/creators_api/search_items.json: hand-built in the API's response
+shape, not recorded), loaded into the SDK's Item models like a live response.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from creatorsapi_python_sdk.models.item import Item  # noqa: E402
+
+from services.products import parse_item, to_homepage_deal, to_item, to_search_result  # noqa: E402
+
+PAYLOAD = os.path.join(os.path.dirname(__file__), "fixtures", "creators_api", "search_items.json")
+
+
+def legacy_parse_item(item) -> dict:
+    """main._parse_item as it was before the AmazonProduct record."""
+    title = ""
+    try:
+        title = item.item_info.title.display_value
+    except Exception:
+        pass
+
+    image_url = None
+    try:
+        if item.images and item.images.primary:
+            if item.images.primary.large:
+                image_url = item.images.primary.large.url
+            elif item.images.primary.medium:
+                image_url = item.images.primary.medium.url
+    except Exception:
+        pass
+
+    price = None
+    original_price = None
+    discount_percent = 0
+    is_prime = False
+
+    try:
+        if item.offers and item.offers.listings:
+            listing = item.offers.listings[0]
+            if listing.price and listing.price.display_amount:
+                price = listing.price.display_amount
+            try:
+                if listing.saving_basis and listing.saving_basis.display_amount:
+                    original_price = listing.saving_basis.display_amount
+                    curr = float(listing.price.amount)
+                    orig = float(listing.saving_basis.amount)
+                    if orig > 0:
+                        discount_percent = int(((orig - curr) / orig) * 100)
+            except Exception:
+                pass
+            try:
+                is_prime = listing.delivery_info.is_prime_eligible or False
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+    description = ""
+    try:
+        if item.item_info and item.item_info.features:
+            description = " ".join(
+                [f.display_value for f in item.item_info.features.display_values[:2]]
+            )
+    except Exception:
+        pass
+
+    detail_url = ""
+    try:
+        detail_url = item.detail_page_url or ""
+    except Exception:
+        pass
+
+    return {
+        "asin": getattr(item, "asin", ""),
+        "title": title,
+        "description": description,
+        "imageUrl": image_url,
+        "price": price,
+        "originalPrice": original_price,
+        "discountPercent": discount_percent,
+        "isPrime": is_prime,
+        "detailPageURL": detail_url,
+    }
+
+
+def legacy_homepage(item) -> dict:
+    data = legacy_parse_item(item)
+    return {
+        "asin": data["asin"],
+        "title": data["title"],
+        "image_url": data["imageUrl"],
+        "price": data["price"],
+        "original_price": data["originalPrice"],
+        "discount_percent": data["discountPercent"],
+        "detail_url": data["detailPageURL"],
+    }
+
+
+def legacy_search(item) -> dict:
+    data = legacy_parse_item(item)
+    return {
+        "title": data["title"],
+        "description": data["description"],
+        "imageUrl": data["imageUrl"],
+        "price": data["price"],
+        "detailPageURL": data["detailPageURL"],
+    }
+
+
+CASES = [
+    ("full item", legacy_parse_item, lambda item: to_item(parse_item(item))),
+    ("homepage deal", legacy_homepage, lambda item: to_homepage_deal(parse_item(item))),
+    ("search result", legacy_search, lambda item: to_search_result(parse_item(item))),
+]
+
+
+def items_per_second(fn, items, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--items", type=int, default=10000, help="items per timed run (the payload is repeated)")
+    ap.add_argument("--repeat", type=int, default=5, help="timed runs; the best one is reported")
+    args = ap.parse_args()
+
+    with open(PAYLOAD, encoding="utf-8") as f:
+        payload = [Item.from_dict(raw) for raw in json.load(f)["searchResult"]["items"]]
+    items = (payload * (args.items // len(payload) + 1))[:args.items]
+
+    print(f"{len(payload)} synthetic items, {len(items)} per run, best of {args.repeat}\n")
+    print(f"{'shape':<15} {'before items/s':>15} {'after items/s':>15} {'speedup':>8}")
+    for name, before, after in CASES:
+        old = items_per_second(before, items, args.repeat)
+        new = items_per_second(after, items, args.repeat)
+        print(f"{name:<15} {old:>15,.0f} {new:>15,.0f} {new / old:>7.1f}x")
+
+    # The old parser read the PA-API shape, so on Creators API items it found no prices.
+    old_priced = sum(1 for item in payload if legacy_parse_item(item)["price"])
+    new_priced = sum(1 for item in payload if parse_item(item).price)
+    print(f"\nitems with a price: before {old_priced}/{len(payload)}, after {new_priced}/{len(payload)}")
+
+
+if __name__ == "__main__":
+    main()
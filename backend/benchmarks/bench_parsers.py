@@ -0,0 +1,89 @@
+"""
+Compare the HTML parser backends on the product page fixtures.
+
+    python benchmarks/bench_parsers.py                 # pages padded to ~500 KB
+    python benchmarks/bench_parsers.py --inflate 2000  # ~2 MB, the heavy end
+    python benchmarks/bench_parsers.py --inflate 0     # fixtures as-is
+
+The fixtures are synthetic: hand-written stubs under 1 KB that carry each
+platform's selectors and meta tags, not saved marketplace pages (see
+fixtures/pages/README.md). Real product pages are 0.5–3 MB, so each page is
+padded with listing-grid markup by default; timings on the bare stubs mostly
+measure parser start-up. Each row also checks that both backends extracted
+the same values.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.html_parsers import make_parser  # noqa: E402
+from services.platforms import PlatformRegistry  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "pages")
+
+# fixture → platform plan it's parsed with
+PLATFORMS = {
+    "flipkart": "flipkart",
+    "amazon": "amazon",
+    "myntra": "myntra",
+    "meesho": "meesho",
+    "shopify": "default",
+    "generic": "default",
+}
+
+# Filler resembling a listing grid: lots of tags and text, a few ₹ strings that are too long to be a price.
+FILLER = (
+    '<div class="card"><a href="/p/{i}"><img src="/img/{i}.jpg" alt="item {i}"></a>'
+    '<span class="name">Recommended product number {i}</span>'
+    '<span class="note">Bank offer: 10% instant discount up to ₹1,500</span></div>\n'
+)
+
+
+def load_page(name: str, inflate_kb: int) -> bytes:
+    with open(os.path.join(PAGES_DIR, f"{name}.html"), "rb") as f:
+        page = f.read()
+    if inflate_kb:
+        filler, i = [], 0
+        while sum(len(s) for s in filler) < inflate_kb * 1024:
+            filler.append(FILLER.format(i=i))
+            i += 1
+        page = page.replace(b"</body>", "".join(filler).encode() + b"</body>")
+    return page
+
+
+def time_extract(parser, page: bytes, plan, rounds: int):
+    result = parser.extract(page, plan)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parser.extract(page, plan)
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=50)
+    ap.add_argument("--inflate", type=int, default=500, metavar="KB",
+                    help="pad each page with KB of extra markup (0 = fixtures as-is)")
+    ap.add_argument("--og", action="store_true", help="also extract og: tags (the no-<head>-meta path)")
+    args = ap.parse_args()
+
+    soup, lxml = make_parser("soup"), make_parser("lxml")
+    registry = PlatformRegistry(check_interval=0)
+
+    print(f"{'page':<10} {'size':>9} {'soup ms':>9} {'lxml ms':>9} {'speedup':>8}  price / match")
+    for name, platform in PLATFORMS.items():
+        page = load_page(name, args.inflate)
+        spec = registry.get(platform)
+        plan = spec.plan_with_og if args.og else spec.plan
+        soup_ms, soup_result = time_extract(soup, page, plan, args.rounds)
+        lxml_ms, lxml_result = time_extract(lxml, page, plan, args.rounds)
+        match = "ok" if soup_result == lxml_result else f"MISMATCH {soup_result} != {lxml_result}"
+        print(f"{name:<10} {len(page) // 1024:>7}KB {soup_ms:>9.2f} {lxml_ms:>9.2f} "
+              f"{soup_ms / lxml_ms:>7.1f}x  {lxml_result['price'] or '-'} / {match}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+The backend app wired to the replay upstreams in fake_upstream.py.
+
+    python -m uvicorn benchmarks.fake_app:app --workers 2     # from backend/
+
+Every worker imports this module, so each gets its own fakes. Tune them with
+env vars (load_test.py sets these from its flags):
+
+    FAKE_AMAZON_MEDIAN_MS / FAKE_AMAZON_P99_MS / FAKE_AMAZON_ERROR_RATE
+    FAKE_HTTP_MEDIAN_MS   / FAKE_HTTP_P99_MS   / FAKE_HTTP_ERROR_RATE
+    FAKE_SEED
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+from benchmarks.fake_upstream import FakeCreatorsApi, make_transport  # noqa: E402
+
+_seed = int(os.getenv("FAKE_SEED", "1"))
+
+main.amazon_client.api = FakeCreatorsApi(
+    median_ms=float(os.getenv("FAKE_AMAZON_MEDIAN_MS", "250")),
+    p99_ms=float(os.getenv("FAKE_AMAZON_P99_MS", "1200")),
+    error_rate=float(os.getenv("FAKE_AMAZON_ERROR_RATE", "0")),
+    seed=_seed,
+)
+# Must be set before the lifespan's converter.start() builds the httpx client.
+main.earnkaro_converter.transport = make_transport(
+    median_ms=float(os.getenv("FAKE_HTTP_MEDIAN_MS", "150")),
+    p99_ms=float(os.getenv("FAKE_HTTP_P99_MS", "800")),
+    error_rate=float(os.getenv("FAKE_HTTP_ERROR_RATE", "0")),
+    seed=_seed + 1,
+)
+
+app = main.app
@@ -0,0 +1,155 @@
+"""
+Replay stand-ins for everything the backend talks to, for load tests without credentials.
+
+    FakeCreatorsApi        drop-in for the AmazonCreatorsApi object behind
+                           AsyncAmazonClient (search_items / get_items), built
+                           from a synthetic SearchItems payload
+    make_transport(...)    httpx transport for EarnkaroConverter: the Earnkaro
+                           converter API plus marketplace product pages served
+                           from fixtures/pages
+
+Both add latency drawn from a log-normal distribution (`median_ms`,
+`p99_ms`) and fail `error_rate` of calls — the Creators API with
+TooManyRequestsError, the HTTP side with 429/503 — so runs exercise
+the backend's timeouts, breakers and fallbacks rather than a perfect network.
+All randomness comes from a seeded Random, so two runs see the same traffic.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+from amazon_creatorsapi.errors import TooManyRequestsError
+from creatorsapi_python_sdk.models.item import Item
+from creatorsapi_python_sdk.models.search_result import SearchResult
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+SEARCH_PAYLOAD = os.path.join(FIXTURES, "creators_api", "search_items.json")
+PAGES_DIR = os.path.join(FIXTURES, "pages")
+
+EARNKARO_HOST = "ekaro-api.affiliaters.in"
+
+# marketplace host → saved page it's answered with (anything else gets generic.html)
+PAGES = {
+    "flipkart.com": "flipkart.html",
+    "amazon.in": "amazon.html",
+    "myntra.com": "myntra.html",
+    "meesho.com": "meesho.html",
+    "shop.example.com": "shopify.html",
+}
+
+
+class Latency:
+    """Log-normal latency with the given median and 99th percentile (milliseconds)."""
+
+    def __init__(self, median_ms: float = 80.0, p99_ms: float = 400.0, seed: int = 1):
+        self.mu = math.log(max(median_ms, 0.001))
+        # z(0.99) ≈ 2.326
+        self.sigma = max(0.0, math.log(max(p99_ms, median_ms) / max(median_ms, 0.001)) / 2.326)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        """One latency in seconds."""
+        with self._lock:
+            return self._random.lognormvariate(self.mu, self.sigma) / 1000
+
+    def fails(self, rate: float) -> bool:
+        with self._lock:
+            return self._random.random() < rate
+
+
+def _fake_asin(*parts) -> str:
+    digest = hashlib.md5(":".join(str(p) for p in parts).encode()).hexdigest().upper()
+    return "B0" + digest[:8]
+
+
+class FakeCreatorsApi:
+    """
+    Synthetic SearchItems/GetItems responses with simulated latency and throttling.
+
+    Each (keywords, search index, page) gets its own stable ASINs, so caches,
+    result windows and the local index see distinct products per query, the way
+    they would live.
+    """
+
+    def __init__(self, payload_path: str = SEARCH_PAYLOAD, median_ms: float = 250.0, p99_ms: float = 1200.0,
+                 error_rate: float = 0.0, total_results: int = 60, seed: int = 1):
+        with open(payload_path, encoding="utf-8") as f:
+            self.templates = json.load(f)["searchResult"]["items"]
+        self.latency = Latency(median_ms, p99_ms, seed)
+        self.error_rate = error_rate
+        self.total_results = total_results
+        self.calls = 0
+
+    def _call(self):
+        # The real SDK blocks its executor thread for the round trip; so do we.
+        self.calls += 1
+        time.sleep(self.latency.sample())
+        if self.latency.fails(self.error_rate):
+            raise TooManyRequestsError("Simulated throttling")
+
+    def _item(self, raw: dict, asin: str) -> dict:
+        item = copy.deepcopy(raw)
+        item["asin"] = asin
+        item["detailPageURL"] = f"https://www.amazon.in/dp/{asin}?tag=bench-21"
+        return item
+
+    def search_items(self, keywords: str = None, search_index: str = None, item_count: int = None,
+                     item_page: int = None, **kwargs) -> SearchResult:
+        self._call()
+        count, page = item_count or 10, item_page or 1
+        start = (page - 1) * count
+        items = [
+            self._item(self.templates[(start + i) % len(self.templates)], _fake_asin(keywords, search_index, start + i))
+            for i in range(max(0, min(count, self.total_results - start)))
+        ]
+        return SearchResult.from_dict({"items": items, "totalResultCount": self.total_results})
+
+    def get_items(self, items, **kwargs):
+        self._call()
+        return [
+            Item.from_dict(self._item(self.templates[int(asin[2:], 16) % len(self.templates)], asin))
+            for asin in items
+            if len(asin) == 10 and all(c in "0123456789ABCDEF" for c in asin[2:])
+        ]
+
+
+def make_transport(median_ms: float = 150.0, p99_ms: float = 800.0, error_rate: float = 0.0,
+                   seed: int = 2) -> httpx.MockTransport:
+    """An httpx transport answering Earnkaro API calls and marketplace page fetches."""
+    latency = Latency(median_ms, p99_ms, seed)
+    pages = {}
+    for name in set(PAGES.values()) | {"generic.html"}:
+        with open(os.path.join(PAGES_DIR, name), "rb") as f:
+            pages[name] = f.read()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency.sample())
+        host = (request.url.host or "").lower()
+
+        if host == EARNKARO_HOST:
+            if latency.fails(error_rate):
+                return httpx.Response(503, json={"error": 1, "message": "Simulated outage"})
+            payload = json.loads(request.content or b"{}")
+            deal = payload.get("deal", "")
+            body = {"error": 0, "data": "https://ekaro.in/enkr" + hashlib.md5(deal.encode()).hexdigest()[:10]}
+            if payload.get("convert_option") == "convert_and_scrape":
+                path = urlsplit(deal).path.strip("/").replace("-", " ")
+                body.update(product_name=path.title() or "Product", image="https://img.example.com/p.jpg", price="₹999")
+            return httpx.Response(200, json=body)
+
+        if latency.fails(error_rate):
+            return httpx.Response(429 if latency.fails(0.5) else 503, text="Simulated block")
+        bare = host[4:] if host.startswith("www.") else host
+        page = PAGES.get(bare, "generic.html")
+        return httpx.Response(200, content=pages[page], headers={"Content-Type": "text/html; charset=utf-8"})
+
+    return httpx.MockTransport(handler)
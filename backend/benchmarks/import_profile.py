@@ -0,0 +1,176 @@
+"""
+Cold-start profile: import time of the app and time to its first response.
+
+    python benchmarks/import_profile.py                    # 5 runs
+    python benchmarks/import_profile.py --out benchmarks/results/startup.json
+    python benchmarks/import_profile.py --compare benchmarks/results/startup.json
+
+Each run is a fresh interpreter, like a new Render instance or uvicorn worker:
+  - `python -X importtime -c "import main"` gives the total import time of
+    main and the cost of each module it imports directly (transitive imports are
+    charged to whichever direct import loaded them first)
+  - `uvicorn main:app` is started and polled until GET / answers, which also
+    covers the lifespan startup (converter client, snapshot restore)
+The server runs with the refresh scheduler, warm-up and snapshots off, so it
+makes no upstream calls. Bytecode is compiled by an untimed first run.
+
+Medians over --runs are reported. --compare exits 1 if either median grew by
+more than --max-regression (and more than --min-delta-ms).
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# No upstream traffic and no state from earlier runs.
+SERVER_ENV = {
+    "REFRESH_SCHEDULER_ENABLED": "false",
+    "CACHE_WARMUP": "false",
+    "CACHE_SNAPSHOT_PATH": "",
+    "LOG_LEVEL": "WARNING",
+}
+
+
+def import_times() -> dict:
+    """{module: cumulative µs} for main and each module it imports directly."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env={**os.environ, **SERVER_ENV}, capture_output=True, text=True, check=True,
+    )
+    # Children are printed before their parent, so the depth-1 lines since the
+    # previous top-level import are main's direct imports.
+    children = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # importtime indents by two spaces per nesting level, after one leading space.
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            children[name.strip()] = int(cumulative)
+        elif depth == 0:
+            if name.strip() == "main":
+                return {"main": int(cumulative), **children}
+            children = {}
+    raise RuntimeError("no import time reported for main")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_response(timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn until GET / returns 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env={**os.environ, **SERVER_ENV},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f"server did not answer within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def profile(runs: int) -> dict:
+    import_times()  # compile bytecode; not measured
+    imports = [import_times() for _ in range(runs)]
+    first_response = [time_to_first_response() for _ in range(runs)]
+    modules = {name for run in imports for name in run} - {"main"}
+    return {
+        "import_ms": round(statistics.median(r["main"] for r in imports) / 1000, 1),
+        "first_response_ms": round(statistics.median(first_response) * 1000, 1),
+        "modules_ms": dict(sorted(
+            ((name, round(statistics.median(r.get(name, 0) for r in imports) / 1000, 1)) for name in modules),
+            key=lambda kv: kv[1], reverse=True,
+        )),
+    }
+
+
+# ── Reporting ────────────────────────────────────────────────────────────────
+
+def print_report(result: dict, top: int):
+    print(f"\nimport main          {result['import_ms']:>8.1f} ms")
+    print(f"first response       {result['first_response_ms']:>8.1f} ms")
+    print(f"\n{'imported by main':<36} {'ms':>8}")
+    for name, ms in list(result["modules_ms"].items())[:top]:
+        print(f"{name:<36} {ms:>8.1f}")
+
+
+def compare(result: dict, baseline: dict, max_regression: float, min_delta_ms: float) -> bool:
+    """Print the medians against `baseline`; False if either regressed."""
+    ok = True
+    print(f"\n{'metric':<20} {'before':>9} {'after':>9} {'change':>8}")
+    for metric in ("import_ms", "first_response_ms"):
+        before, now = baseline[metric], result[metric]
+        change = (now - before) / before if before else 0.0
+        regressed = change > max_regression and now - before > min_delta_ms
+        ok = ok and not regressed
+        print(f"{metric:<20} {before:>9.1f} {now:>9.1f} {change * 100:>+7.1f}%{'  REGRESSED' if regressed else ''}")
+    return ok
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    ap.add_argument("--top", type=int, default=15, help="direct imports to list")
+    ap.add_argument("--out", help="write the JSON result here")
+    ap.add_argument("--compare", help="earlier JSON result to check against")
+    ap.add_argument("--max-regression", type=float, default=0.15, help="allowed growth (0.15 = 15%%)")
+    ap.add_argument("--min-delta-ms", type=float, default=30, help="growth below this never counts")
+    args = ap.parse_args()
+
+    result = {
+        "meta": {
+            "commit": _git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "runs": args.runs,
+        },
+        **profile(args.runs),
+    }
+    print_report(result, args.top)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=1)
+        print(f"\nwrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.max_regression, args.min_delta_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
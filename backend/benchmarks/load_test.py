@@ -0,0 +1,400 @@
+"""
+Open-loop load test of the backend against replayed upstreams.
+
+    python benchmarks/load_test.py                                 # 2 workers, 100 rps, 30 s
+    python benchmarks/load_test.py --workers 4 --rps 400 --out benchmarks/results/base.json
+    python benchmarks/load_test.py --compare benchmarks/results/base.json
+
+Starts `uvicorn benchmarks.fake_app:app` (the real app with fake_upstream.py
+standing in for the Creators API, Earnkaro and marketplaces), sends a weighted
+mix of requests across the endpoints at a fixed arrival rate, and reports per
+endpoint: throughput, errors and p50/p95/p99/max latency, plus CPU and RSS of
+every server process. Latency is measured from each request's *scheduled*
+send time, so a stalled server shows up as latency instead of as fewer
+requests (no coordinated omission).
+
+Results are written as JSON (--out). --compare loads an earlier result and
+exits 1 if any endpoint's p95 grew by more than --max-regression (and more
+than --min-delta-ms), or its error rate rose by more than 1 point — suitable
+as a pre-deploy check. Compare runs made with the same settings.
+Every request in the mix is valid, so any 4xx counts as an error alongside
+5xx and connection failures: a 404 means the scenario (or a route) is broken,
+and would otherwise be timed as a very fast success.
+CPU/RSS sampling reads /proc, so it's Linux-only (skipped elsewhere).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from main import CATEGORIES as APP_CATEGORIES  # noqa: E402
+
+KEYWORDS = [
+    "wireless earbuds", "boat airdopes", "mixer grinder", "running shoes", "lipstick", "yoga mat",
+    "beard trimmer", "steel bottle", "smartwatch", "redmi 5g", "polo t-shirt", "face cream",
+]
+# The app's own category names, URL-quoted ("Home & Kitchen" → "Home%20%26%20Kitchen").
+CATEGORIES = [quote(name, safe="") for name in APP_CATEGORIES]
+IMPORT_URLS = [
+    "https://www.flipkart.com/boat-airdopes-141/p/itm123?pid=ACCG6ZGY&otracker=search",
+    "https://www.amazon.in/boAt-Airdopes/dp/B09N3ZNHTY/ref=sr_1_1",
+    "https://www.myntra.com/tshirts/allen-solly/polo/1234567/buy",
+    "https://www.meesho.com/women-kurti/p/2abc3d",
+    "https://shop.example.com/products/ceramic-mug",
+    "https://www.ajio.com/puma-sneakers/p/469123",
+]
+
+
+def _search_advanced(rng):
+    return {
+        "keywords": rng.choice(KEYWORDS),
+        "min_price": rng.choice([None, 50000, 100000]),
+        "max_price": rng.choice([None, 300000]),
+        "min_rating": rng.choice([None, 4]),
+        "sort_by": rng.choice([None, "Price:LowToHigh", "AvgCustomerReviews"]),
+        "page": rng.choice([1, 1, 1, 2, 3]),
+        "items_per_page": 10,
+    }
+
+
+# name → (weight, method, path or path factory, body factory or None)
+SCENARIOS = {
+    "health": (2, "GET", "/", None),
+    "categories": (2, "GET", "/api/categories", None),
+    "deals": (12, "GET", "/api/deals", None),
+    "deals_category": (6, "GET", lambda r: f"/api/deals/{r.choice(CATEGORIES)}", None),
+    "search_get": (10, "GET", lambda r: f"/api/search?keywords={r.choice(KEYWORDS)}", None),
+    "search_post": (6, "POST", "/api/search", lambda r: {"keywords": r.choice(KEYWORDS)}),
+    "search_advanced": (16, "POST", "/api/amazon/search-advanced", _search_advanced),
+    "search_local": (8, "GET", lambda r: f"/api/search/local?q={r.choice(KEYWORDS)[:r.randint(3, 9)]}", None),
+    "suggest": (14, "GET", lambda r: f"/api/suggest?q={r.choice(KEYWORDS)[:r.randint(2, 6)]}", None),
+    "items": (4, "POST", "/api/amazon/items", lambda r: {"asins": [f"B0{r.getrandbits(32):08X}" for _ in range(5)]}),
+    "smart_import": (8, "POST", "/api/earnkaro/convert", lambda r: {"url": r.choice(IMPORT_URLS)}),
+    "smart_import_batch": (1, "POST", "/api/earnkaro/convert/batch", lambda r: {"urls": r.sample(IMPORT_URLS, 3)}),
+    "stats": (1, "GET", "/api/stats", None),
+    "scraper_hosts": (1, "GET", "/api/scraper/hosts", None),
+    "platforms": (1, "GET", "/api/platforms", None),
+}
+
+
+# ── Server processes ─────────────────────────────────────────────────────────
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, port: int, log) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "FAKE_AMAZON_MEDIAN_MS": str(args.amazon_ms), "FAKE_AMAZON_P99_MS": str(args.amazon_p99_ms),
+        "FAKE_AMAZON_ERROR_RATE": str(args.amazon_errors),
+        "FAKE_HTTP_MEDIAN_MS": str(args.http_ms), "FAKE_HTTP_P99_MS": str(args.http_p99_ms),
+        "FAKE_HTTP_ERROR_RATE": str(args.http_errors),
+        "FAKE_SEED": str(args.seed),
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.fake_app:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.25)
+    raise RuntimeError("server did not come up")
+
+
+def _process_tree(root: int) -> list:
+    """`root` and all its descendants, from /proc."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, ValueError, IndexError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    pids, todo = [], [root]
+    while todo:
+        pid = todo.pop()
+        pids.append(pid)
+        todo.extend(children.get(pid, ()))
+    return pids
+
+
+def _cpu_seconds_and_rss(pid: int):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+    return cpu, rss
+
+
+def _role(pid: int, root: int) -> str:
+    if pid == root:
+        return "master"
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return "helper" if b"resource_tracker" in f.read() else "worker"
+    except OSError:
+        return "worker"
+
+
+class ResourceSampler:
+    """CPU% and RSS of every process under the server, sampled once a second."""
+
+    def __init__(self, root: int):
+        self.root = root
+        self.procs = {}  # pid → {"cpu_start", "cpu_last", "rss_max", "rss_sum", "samples"}
+        self.started = self.last = time.monotonic()
+
+    def sample(self):
+        self.last = time.monotonic()
+        for pid in _process_tree(self.root):
+            try:
+                cpu, rss = _cpu_seconds_and_rss(pid)
+            except OSError:
+                continue
+            p = self.procs.setdefault(pid, {"cpu_start": cpu, "rss_max": 0, "rss_sum": 0, "samples": 0})
+            p["cpu_last"] = cpu
+            p["rss_max"] = max(p["rss_max"], rss)
+            p["rss_sum"] += rss
+            p["samples"] += 1
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            self.sample()
+            try:
+                await asyncio.wait_for(stop.wait(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    def report(self) -> list:
+        wall = max(self.last - self.started, 1e-9)
+        return [
+            {
+                "pid": pid,
+                "role": _role(pid, self.root),
+                "cpu_percent": round((p["cpu_last"] - p["cpu_start"]) / wall * 100, 1),
+                "rss_mb_avg": round(p["rss_sum"] / p["samples"] / 2 ** 20, 1),
+                "rss_mb_max": round(p["rss_max"] / 2 ** 20, 1),
+            }
+            for pid, p in sorted(self.procs.items())
+        ]
+
+
+# ── Load generation ──────────────────────────────────────────────────────────
+
+async def run_load(client: httpx.AsyncClient, rps: float, duration: float, seed: int, record: bool) -> dict:
+    """Send requests at `rps` for `duration` s; {scenario: [(latency s, ok), ...]}."""
+    rng = random.Random(seed)
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[n][0] for n in names]
+    samples = {n: [] for n in names}
+    tasks = set()
+
+    async def one(name: str, scheduled: float):
+        _, method, path, body = SCENARIOS[name]
+        path = path(rng) if callable(path) else path
+        try:
+            if method == "GET":
+                response = await client.get(path)
+            else:
+                response = await client.post(path, json=body(rng) if body else None)
+            await response.aread()
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if record:
+            samples[name].append((time.monotonic() - scheduled, ok))
+
+    start = time.monotonic()
+    total = int(rps * duration)
+    for i in range(total):
+        scheduled = start + i / rps
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(one(rng.choices(names, weights)[0], scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return {"samples": samples, "elapsed": time.monotonic() - start}
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    latencies = sorted(s[0] for s in samples)
+    errors = sum(1 for s in samples if not s[1])
+    ms = lambda v: round(v * 1000, 2)  # noqa: E731
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": ms(_percentile(latencies, 0.50)),
+        "p95_ms": ms(_percentile(latencies, 0.95)),
+        "p99_ms": ms(_percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1]) if latencies else 0.0,
+    }
+
+
+# ── Reporting ────────────────────────────────────────────────────────────────
+
+def print_report(result: dict):
+    print(f"\n{'endpoint':<20} {'reqs':>7} {'err%':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    rows = list(result["endpoints"].items()) + [("TOTAL", result["overall"])]
+    for name, s in rows:
+        print(f"{name:<20} {s['requests']:>7} {s['error_rate'] * 100:>5.1f}% {s['throughput_rps']:>8.1f} "
+              f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+    if result["processes"]:
+        print(f"\n{'pid':>8} {'role':<7} {'cpu %':>7} {'rss avg MB':>11} {'rss max MB':>11}")
+        for p in result["processes"]:
+            print(f"{p['pid']:>8} {p['role']:<7} {p['cpu_percent']:>7.1f} {p['rss_mb_avg']:>11.1f} {p['rss_mb_max']:>11.1f}")
+
+
+# Settings that must match for two results to be comparable.
+COMPARABLE_ARGS = ("workers", "rps", "duration", "seed", "amazon_ms", "amazon_p99_ms", "amazon_errors",
+                   "http_ms", "http_p99_ms", "http_errors")
+
+
+def compare(result: dict, baseline: dict, max_regression: float, min_delta_ms: float) -> bool:
+    """Print p95/error-rate deltas against `baseline`; False if anything regressed."""
+    ok = True
+    differing = [k for k in COMPARABLE_ARGS if result["meta"]["args"].get(k) != baseline["meta"]["args"].get(k)]
+    if differing:
+        print(f"\nwarning: baseline was run with different {', '.join(differing)}")
+    print(f"\n{'endpoint':<20} {'p95 before':>11} {'p95 after':>10} {'change':>8} {'err% before':>12} {'err% after':>11}")
+    for name, now in list(result["endpoints"].items()) + [("TOTAL", result["overall"])]:
+        before = baseline["overall"] if name == "TOTAL" else baseline["endpoints"].get(name)
+        if not before or not before["requests"] or not now["requests"]:
+            continue
+        change = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        # Sub-millisecond endpoints jitter by large percentages; ignore small absolute moves.
+        slower = change > max_regression and now["p95_ms"] - before["p95_ms"] > min_delta_ms
+        regressed = slower or now["error_rate"] - before["error_rate"] > 0.01
+        ok = ok and not regressed
+        print(f"{name:<20} {before['p95_ms']:>11.1f} {now['p95_ms']:>10.1f} {change * 100:>+7.1f}% "
+              f"{before['error_rate'] * 100:>11.1f}% {now['error_rate'] * 100:>10.1f}%{'  REGRESSED' if regressed else ''}")
+    return ok
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    ap.add_argument("--rps", type=float, default=100, help="target request rate")
+    ap.add_argument("--duration", type=float, default=30, help="measured seconds")
+    ap.add_argument("--warmup", type=float, default=5, help="unmeasured seconds first (fills caches)")
+    ap.add_argument("--url", help="load an already running server instead (no CPU/RSS unless --pid)")
+    ap.add_argument("--pid", type=int, help="server process to sample with --url")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--amazon-ms", type=float, default=250, help="fake Creators API median latency")
+    ap.add_argument("--amazon-p99-ms", type=float, default=1200)
+    ap.add_argument("--amazon-errors", type=float, default=0.01, help="fraction of throttled API calls")
+    ap.add_argument("--http-ms", type=float, default=150, help="fake Earnkaro/marketplace median latency")
+    ap.add_argument("--http-p99-ms", type=float, default=800)
+    ap.add_argument("--http-errors", type=float, default=0.02, help="fraction of 429/503 page fetches")
+    ap.add_argument("--out", help="write the JSON result here")
+    ap.add_argument("--compare", help="earlier JSON result to check against")
+    ap.add_argument("--max-regression", type=float, default=0.15, help="allowed p95 growth (0.15 = 15%%)")
+    ap.add_argument("--min-delta-ms", type=float, default=5, help="p95 growth below this never counts")
+    args = ap.parse_args()
+
+    server = None
+    url, pid = args.url, args.pid
+    if not url:
+        port = _free_port()
+        # The app logs every request; keep that out of the report.
+        server_log = tempfile.NamedTemporaryFile("w+b", prefix="load_test_server_", suffix=".log", delete=False)
+        server = start_server(args, port, server_log)
+        url, pid = f"http://127.0.0.1:{port}", server.pid
+        print(f"server log: {server_log.name}")
+
+    limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+    try:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+            await wait_ready(client)
+            if args.warmup:
+                print(f"warming up for {args.warmup:.0f}s ...")
+                await run_load(client, args.rps, args.warmup, args.seed + 1, record=False)
+
+            sampler = ResourceSampler(pid) if pid and os.path.isdir("/proc") else None
+            stop = asyncio.Event()
+            sampling = asyncio.create_task(sampler.run(stop)) if sampler else None
+            print(f"measuring {args.rps:g} rps for {args.duration:.0f}s against {url} ...")
+            load = await run_load(client, args.rps, args.duration, args.seed, record=True)
+            stop.set()
+            if sampling:
+                await sampling
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    everything = [s for samples in load["samples"].values() for s in samples]
+    result = {
+        "meta": {
+            "commit": _git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        },
+        "overall": summarize(everything, load["elapsed"]),
+        "endpoints": {name: summarize(s, load["elapsed"]) for name, s in load["samples"].items() if s},
+        "processes": sampler.report() if sampler else [],
+    }
+    print_report(result)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=1)
+        print(f"\nwrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.max_regression, args.min_delta_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
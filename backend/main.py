@@ -1,13 +1,34 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
 from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import json
 import os
+import time
 from dotenv import load_dotenv
 import logging
-from amazon_creatorsapi import AmazonCreatorsApi, Country
+from services.amazon_client import AsyncAmazonClient
+from services.cache import SingleFlight, TTLCache
+from services.cache_backends import CacheEntry, make_backend
+from services.cache_snapshot import load_snapshot, save_snapshot, snapshot_signature
+from services.candidates import build_candidates, is_local_sort, select as select_candidates
 from services.earnkaro_converter import EarnkaroConverter
+from services.host_guard import HostGuards
+from services.item_lookup import ItemLookup
+from services.logging_setup import RequestContextMiddleware, RouteSampler, setup_logging
+from services.metrics import REGISTRY, MetricsMiddleware
+from services.product_urls import canonical_product_url
+from services.product_index import ProductIndex
+from services.products import AmazonProduct, to_category_deal, to_homepage_deal, to_search_result
+from services.platforms import DEFAULT_PLATFORMS_FILE, PlatformRegistry
+from services.refresher import DealsRefresher
+from services.suggest import SuggestIndex
 
 # ─── Pydantic models ──────────────────────────────────────────────────────────
 
@@ -23,23 +44,52 @@ class AdvancedSearchRequest(BaseModel):
     max_price: Optional[int] = None
     min_rating: Optional[int] = None
     brand: Optional[str] = None
-    prime_only: Optional[bool] = False
     sort_by: Optional[str] = None
     page: Optional[int] = 1
     items_per_page: Optional[int] = 10
 
 
+class ItemsRequest(BaseModel):
+    asins: List[str]
+    refresh: Optional[bool] = False
+
+
 class EarnkaroConvertRequest(BaseModel):
     url: str
 
 
+class EarnkaroBatchRequest(BaseModel):
+    urls: List[str]
+
+
 # ─── Setup ────────────────────────────────────────────────────────────────────
 
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AffiliStore Deals API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Configured here rather than at import, so importing main (tests,
+    # benchmarks, tooling) doesn't take over the process's logging.
+    log_listener = setup_logging(os.getenv("LOG_LEVEL", "INFO"), os.getenv("LOG_FORMAT", "json"))
+    # Builds the Creators API client in the background; startup doesn't wait.
+    amazon_client.prepare()
+    await earnkaro_converter.start()
+    await _restore_cache_snapshot()
+    if REFRESH_SCHEDULER_ENABLED:
+        # Its first check runs now and refreshes whatever is missing or expired.
+        deals_refresher.start()
+    await _warm_caches()
+    yield
+    await deals_refresher.stop()
+    await _stop_cache_snapshots()
+    await earnkaro_converter.aclose()
+    amazon_client.shutdown()
+    log_listener.stop()
+
+
+app = FastAPI(title="AffiliStore Deals API", version="1.0.0", lifespan=lifespan)
 
 # CORS
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
@@ -58,6 +108,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so CORS preflights are timed too.
+app.add_middleware(MetricsMiddleware)
+# Outside the metrics layer so its access line includes all of the request's time.
+app.add_middleware(
+    RequestContextMiddleware,
+    sampler=RouteSampler.from_env(
+        os.getenv("LOG_SAMPLE_ROUTES", "/api/suggest=0.01,/metrics=0"),
+        default=float(os.getenv("LOG_SAMPLE_DEFAULT", "1.0")),
+    ),
+    slow_ms=float(os.getenv("LOG_SLOW_REQUEST_MS", "1000")),
+)
 
 # ─── Amazon Creators API Configuration ───────────────────────────────────────
 
@@ -67,13 +128,27 @@ AMAZON_API_VERSION = os.getenv("AMAZON_API_VERSION", "2.2")
 AMAZON_MARKETPLACE = os.getenv("AMAZON_MARKETPLACE", "www.amazon.in")
 AMAZON_PARTNER_TAG = os.getenv("AMAZON_PARTNER_TAG", "")
 
-# Initialize Creators API client
-amazon_api = AmazonCreatorsApi(
-    credential_id=AMAZON_CREDENTIAL_ID,
-    credential_secret=AMAZON_CREDENTIAL_SECRET,
-    version=AMAZON_API_VERSION,
-    tag=AMAZON_PARTNER_TAG,
-    country=Country.IN,
+
+def _make_amazon_api():
+    # Imported here, not at the top: the SDK and its models are ~0.3 s of
+    # import time. AsyncAmazonClient calls this on first use (or prepare()).
+    from amazon_creatorsapi import AmazonCreatorsApi, Country
+
+    return AmazonCreatorsApi(
+        credential_id=AMAZON_CREDENTIAL_ID,
+        credential_secret=AMAZON_CREDENTIAL_SECRET,
+        version=AMAZON_API_VERSION,
+        tag=AMAZON_PARTNER_TAG,
+        country=Country.IN,
+    )
+
+
+# WHY wrap it? The SDK is blocking — see AsyncAmazonClient for the details.
+amazon_client = AsyncAmazonClient(
+    api_factory=_make_amazon_api,
+    max_concurrency=int(os.getenv("AMAZON_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("AMAZON_MAX_QUEUE", "32")),
+    timeout=float(os.getenv("AMAZON_CALL_TIMEOUT", "10")),
 )
 
 # ─── Categories ───────────────────────────────────────────────────────────────
@@ -89,119 +164,306 @@ CATEGORIES = {
 
 # ─── Cache ────────────────────────────────────────────────────────────────────
 
-deals_cache: Dict[str, List] = {}
-cache_timestamp: Dict[str, datetime] = {}
 CACHE_DURATION = timedelta(hours=24)
-
-search_cache: Dict[str, Dict] = {}
-search_cache_timestamp: Dict[str, datetime] = {}
 SEARCH_CACHE_DURATION = timedelta(hours=24)
 
+# Optional stale-while-revalidate window: for this many seconds after expiry a
+# cached value is still served while a single background refresh runs.
+CACHE_STALE_SECONDS = float(os.getenv("CACHE_STALE_SECONDS", "0"))
 
-def is_cache_valid(key: str, ts_dict: Dict) -> bool:
-    if key not in ts_dict:
-        return False
-    return datetime.now() - ts_dict[key] < CACHE_DURATION
+# WHY configurable? The default "memory" backend is per-worker. "sqlite" shares
+# one file between the workers on a host, "redis" shares across every instance,
+# so each worker doesn't warm its own copy and spend its own API quota.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL", "")
 
 
-# ─── Item Parser ──────────────────────────────────────────────────────────────
+def _make_cache(name: str, ttl: timedelta, max_entries: int, max_bytes: int = 32 * 1024 * 1024) -> TTLCache:
+    return TTLCache(
+        ttl=ttl.total_seconds(),
+        stale_ttl=CACHE_STALE_SECONDS,
+        name=name,
+        backend=make_backend(CACHE_BACKEND, name, max_entries, max_bytes, CACHE_BACKEND_URL),
+    )
 
-def _parse_item(item) -> dict:
-    """Extract fields from a Creators API item object."""
-    title = ""
-    try:
-        title = item.item_info.title.display_value
-    except Exception:
-        pass
 
-    image_url = None
-    try:
-        if item.images and item.images.primary:
-            if item.images.primary.large:
-                image_url = item.images.primary.large.url
-            elif item.images.primary.medium:
-                image_url = item.images.primary.medium.url
-    except Exception:
-        pass
-
-    price = None
-    original_price = None
-    discount_percent = 0
-    is_prime = False
+deals_cache = _make_cache("deals", CACHE_DURATION, max_entries=len(CATEGORIES) * 2)
 
+# WHY bounded? Keys include every keyword/filter/page combination, so without
+# caps a crawler sending random keywords grows the worker's memory forever.
+search_cache = _make_cache(
+    "search",
+    SEARCH_CACHE_DURATION,
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000")),
+    max_bytes=int(os.getenv("SEARCH_CACHE_MAX_MB", "32")) * 1024 * 1024,
+)
+
+# Parsed Creators API items by ASIN — filled by GetItems lookups and by every search.
+item_cache = _make_cache(
+    "items",
+    timedelta(hours=float(os.getenv("ITEM_CACHE_HOURS", "6"))),
+    max_entries=int(os.getenv("ITEM_CACHE_MAX_ENTRIES", "20000")),
+)
+
+# Smart Import caches, keyed by canonical product URL. Affiliate links don't
+# change, scraped prices do — hence the separate TTLs.
+product_cache = _make_cache(
+    "products",
+    timedelta(hours=float(os.getenv("PRODUCT_CACHE_HOURS", "6"))),
+    max_entries=int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "5000")),
+)
+affiliate_link_cache = _make_cache(
+    "affiliate_links",
+    timedelta(days=float(os.getenv("AFFILIATE_LINK_CACHE_DAYS", "7"))),
+    max_entries=int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "5000")),
+)
+
+# ─── Earnkaro Converter ───────────────────────────────────────────────────────
+
+# Marketplace selectors live in a data file so they can be fixed without a deploy;
+# edits are picked up within PLATFORMS_RELOAD_INTERVAL seconds (0 = only via /api/platforms/reload).
+platform_registry = PlatformRegistry(
+    os.getenv("PLATFORMS_FILE") or DEFAULT_PLATFORMS_FILE,
+    check_interval=float(os.getenv("PLATFORMS_RELOAD_INTERVAL", "30")),
+)
+
+# Per-marketplace circuit breaker and adaptive (AIMD) concurrency limit for page fetches.
+scraper_hosts = HostGuards(
+    failure_threshold=int(os.getenv("SCRAPER_BREAKER_FAILURES", "5")),
+    cool_off=float(os.getenv("SCRAPER_BREAKER_COOLOFF", "300")),
+    min_limit=int(os.getenv("SCRAPER_HOST_MIN_CONCURRENCY", "1")),
+    max_limit=int(os.getenv("SCRAPER_HOST_MAX_CONCURRENCY", "8")),
+    initial_limit=int(os.getenv("SCRAPER_HOST_INITIAL_CONCURRENCY", "2")),
+)
+
+# One converter per process so its connection pool is reused across requests.
+earnkaro_converter = EarnkaroConverter(
+    max_connections=int(os.getenv("SCRAPER_MAX_CONNECTIONS", "50")),
+    max_keepalive=int(os.getenv("SCRAPER_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("SCRAPER_KEEPALIVE_EXPIRY", "60")),
+    http2=os.getenv("SCRAPER_HTTP2", "true").lower() == "true",
+    parser=os.getenv("HTML_PARSER", "auto"),
+    platforms=platform_registry,
+    link_cache=affiliate_link_cache,
+    details_cache=product_cache,
+    negative_ttl=float(os.getenv("PRODUCT_NEGATIVE_CACHE_SECONDS", "300")),
+    hosts=scraper_hosts,
+)
+
+# Overall time budget (seconds) for one Smart Import: conversion + scraping.
+SMART_IMPORT_DEADLINE = float(os.getenv("SMART_IMPORT_DEADLINE", "20"))
+
+# Bulk Smart Import: max URLs per request, concurrent imports per batch, concurrent page fetches per marketplace.
+BATCH_IMPORT_MAX_URLS = int(os.getenv("BATCH_IMPORT_MAX_URLS", "500"))
+BATCH_IMPORT_CONCURRENCY = int(os.getenv("BATCH_IMPORT_CONCURRENCY", "16"))
+BATCH_IMPORT_PER_HOST = int(os.getenv("BATCH_IMPORT_PER_HOST", "4"))
+
+# ─── Item Lookup ──────────────────────────────────────────────────────────────
+
+# Every product parsed from the Creators API or Smart Imported is added to this
+# in-process index, so /api/search/local (and, with SEARCH_LOCAL_FIRST, plain
+# /api/search) can answer from products we've already seen.
+product_index = ProductIndex(max_docs=int(os.getenv("LOCAL_INDEX_MAX_DOCS", "50000")))
+
+# Typeahead for the search box (/api/suggest): keywords people searched, and
+# the first words of product titles we've listed.
+suggestions = SuggestIndex(max_phrases=int(os.getenv("SUGGEST_MAX_PHRASES", "20000")))
+SUGGEST_QUERY_WEIGHT = float(os.getenv("SUGGEST_QUERY_WEIGHT", "5"))
+SUGGEST_TITLE_WORDS = int(os.getenv("SUGGEST_TITLE_WORDS", "6"))
+
+
+def _products_seen(products: List[AmazonProduct]):
+    product_index.add_products(products)
+    for product in products:
+        if product.title:
+            suggestions.add(" ".join(product.title.split()[:SUGGEST_TITLE_WORDS]))
+
+
+# Parses Creators API items (services/products.py) and keeps the per-ASIN cache,
+# the local index and the suggestions filled.
+item_lookup = ItemLookup(
+    amazon_client,
+    item_cache,
+    on_parsed=_products_seen,
+    not_found_ttl=float(os.getenv("ITEM_NOT_FOUND_SECONDS", "600")),
+)
+
+
+async def _fetch_category_deals(category: str, max_items: int = 10) -> List[Dict]:
+    """Fetch discounted deals for a category, raising on upstream errors (so the refresher can retry)."""
+    search_index = CATEGORIES.get(category, "All")
+    result = await amazon_client.search_items(
+        keywords=f"{category} deals discount",
+        search_index=search_index,
+        item_count=max_items,
+    )
+    items = result.items if result and result.items else []
+    deals = [
+        to_category_deal(product, category)
+        for product in item_lookup.parse_items(items)
+        if product.discount_percent > 0
+    ]
+    logger.info("Found %d deals for %s", len(deals), category)
+    return deals
+
+
+# ─── Background Refresher ─────────────────────────────────────────────────────
+
+# Progress of /api/refresh-cache jobs. On a shared CACHE_BACKEND any worker can
+# answer a poll; with "memory" only the worker that started the job can.
+refresh_jobs = _make_cache("refresh_jobs", timedelta(days=1), max_entries=100)
+
+# WHY these defaults? The Creators API quota starts at 1 request/second, and
+# refreshing an hour before the 24h expiry leaves plenty of room for retries.
+deals_refresher = DealsRefresher(
+    deals_cache,
+    _fetch_category_deals,
+    list(CATEGORIES.keys()),
+    rate=float(os.getenv("AMAZON_TPS", "1")),
+    burst=int(os.getenv("AMAZON_TPS_BURST", "1")),
+    max_retries=int(os.getenv("REFRESH_MAX_RETRIES", "3")),
+    refresh_ahead=float(os.getenv("REFRESH_AHEAD_SECONDS", "3600")),
+    check_interval=float(os.getenv("REFRESH_CHECK_INTERVAL", "300")),
+    jobs=refresh_jobs,
+)
+REFRESH_SCHEDULER_ENABLED = os.getenv("REFRESH_SCHEDULER_ENABLED", "true").lower() == "true"
+
+
+# ─── Cache Snapshots & Warm-up ────────────────────────────────────────────────
+
+# WHY? A restart otherwise begins with empty deals caches, and the first
+# visitor to each category waits on the Creators API. The deals are saved to
+# CACHE_SNAPSHOT_PATH (every CACHE_SNAPSHOT_INTERVAL seconds when they changed,
+# and at shutdown) and restored at boot, where expired ones are served stale
+# while they're refetched in the background. Point the path at a persistent
+# disk to survive deploys; an empty path turns snapshots off.
+CACHE_SNAPSHOT_PATH = os.getenv(
+    "CACHE_SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "deals.jsonl")
+)
+CACHE_SNAPSHOT_INTERVAL = float(os.getenv("CACHE_SNAPSHOT_INTERVAL", "300"))
+# Snapshot entries older than this are dropped rather than served stale.
+CACHE_SNAPSHOT_MAX_AGE = float(os.getenv("CACHE_SNAPSHOT_MAX_AGE", str(7 * 24 * 3600)))
+# Fetch missing/expired deals at startup even when the refresh scheduler is off.
+CACHE_WARMUP = os.getenv("CACHE_WARMUP", "true").lower() == "true"
+
+_snapshot_task: Optional[asyncio.Task] = None
+_snapshot_saved = ()
+_warmup_tasks = set()
+
+
+def _snapshot_contents() -> Dict[TTLCache, List[str]]:
+    return {deals_cache: [HOMEPAGE_DEALS_KEY, *CATEGORIES]}
+
+
+async def _restore_cache_snapshot():
+    global _snapshot_task, _snapshot_saved
+    if not CACHE_SNAPSHOT_PATH:
+        return
+    restored = await asyncio.to_thread(load_snapshot, CACHE_SNAPSHOT_PATH, [deals_cache], CACHE_SNAPSHOT_MAX_AGE)
+    logger.info("Restored cache snapshot: %s", restored)
+    _snapshot_saved = await asyncio.to_thread(snapshot_signature, _snapshot_contents())
+    _snapshot_task = asyncio.create_task(_snapshot_loop())
+
+
+async def _save_cache_snapshot():
+    global _snapshot_saved
+    contents = _snapshot_contents()
+    signature = await asyncio.to_thread(snapshot_signature, contents)
+    if signature == _snapshot_saved:
+        return
     try:
-        if item.offers and item.offers.listings:
-            listing = item.offers.listings[0]
-            if listing.price and listing.price.display_amount:
-                price = listing.price.display_amount
-            try:
-                if listing.saving_basis and listing.saving_basis.display_amount:
-                    original_price = listing.saving_basis.display_amount
-                    curr = float(listing.price.amount)
-                    orig = float(listing.saving_basis.amount)
-                    if orig > 0:
-                        discount_percent = int(((orig - curr) / orig) * 100)
-            except Exception:
-                pass
-            try:
-                is_prime = listing.delivery_info.is_prime_eligible or False
-            except Exception:
-                pass
-    except Exception:
-        pass
-
-    description = ""
-    try:
-        if item.item_info and item.item_info.features:
-            description = " ".join(
-                [f.display_value for f in item.item_info.features.display_values[:2]]
-            )
-    except Exception:
-        pass
-
-    detail_url = ""
+        written = await asyncio.to_thread(save_snapshot, CACHE_SNAPSHOT_PATH, contents)
+    except OSError as e:
+        logger.error("Saving cache snapshot failed: %s", e)
+        return
+    _snapshot_saved = signature
+    logger.info("Saved %d cache entries to %s", written, CACHE_SNAPSHOT_PATH)
+
+
+async def _snapshot_loop():
+    while True:
+        await asyncio.sleep(CACHE_SNAPSHOT_INTERVAL)
+        await _save_cache_snapshot()
+
+
+async def _stop_cache_snapshots():
+    global _snapshot_task
+    if _snapshot_task is None:
+        return
+    _snapshot_task.cancel()
+    await asyncio.gather(_snapshot_task, return_exceptions=True)
+    _snapshot_task = None
+    await _save_cache_snapshot()
+
+
+async def _warm_caches():
+    """Fetch the deals a restore didn't bring back (or brought back expired), in the background."""
+    if not CACHE_WARMUP:
+        return
+    if not REFRESH_SCHEDULER_ENABLED:
+        due = await asyncio.to_thread(deals_refresher.due_categories)
+        if due:
+            await deals_refresher.trigger(due, trigger="startup")
+    task = asyncio.create_task(_warm_homepage_deals())
+    _warmup_tasks.add(task)
+    task.add_done_callback(_warmup_tasks.discard)
+
+
+async def _warm_homepage_deals():
+    # A stale restored entry comes back at once and revalidates in the background.
     try:
-        detail_url = item.detail_page_url or ""
-    except Exception:
-        pass
+        await deals_cache.get_or_load(HOMEPAGE_DEALS_KEY, _fetch_homepage_deals)
+    except Exception as e:
+        logger.warning("Homepage deals warm-up failed: %s", e)
 
-    return {
-        "asin": getattr(item, "asin", ""),
-        "title": title,
-        "description": description,
-        "imageUrl": image_url,
-        "price": price,
-        "originalPrice": original_price,
-        "discountPercent": discount_percent,
-        "isPrime": is_prime,
-        "detailPageURL": detail_url,
+
+# ─── HTTP Caching ─────────────────────────────────────────────────────────────
+
+# How long browsers / the CDN may reuse a response before revalidating.
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "60"))
+
+
+def _cached_json(request: Request, key: str, entry: CacheEntry, body: dict) -> Response:
+    """
+    Return `body` with ETag / Last-Modified validators, or 304 if the client's copy is current.
+
+    WHY derive the ETag from the cache entry instead of hashing the body?
+    The body only changes when the entry is reloaded, so key + stored_at
+    identifies it exactly — and costs nothing compared to serializing the body.
+    """
+    etag = 'W/"' + hashlib.md5(f"{key}:{entry.stored_at}".encode()).hexdigest() + '"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(entry.stored_at, usegmt=True),
+        "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate",
     }
 
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+            # HTTP dates have 1-second resolution.
+            if int(entry.stored_at) <= since:
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
 
-def fetch_deals_from_amazon(category: str, max_items: int = 10) -> List[Dict]:
-    """Fetch discounted deals for a category."""
-    try:
-        search_index = CATEGORIES.get(category, "All")
-        result = amazon_api.search_items(
-            keywords=f"{category} deals discount",
-            search_index=search_index,
-            item_count=max_items,
-        )
-        items = result.items if result and result.items else []
-        deals = []
-        for item in items:
-            try:
-                data = _parse_item(item)
-                data["category"] = category
-                if data["discountPercent"] > 0:
-                    deals.append(data)
-            except Exception as e:
-                logger.error(f"Error parsing item: {e}")
-        logger.info(f"Found {len(deals)} deals for {category}")
-        return deals
-    except Exception as e:
-        logger.error(f"Error fetching deals for {category}: {e}")
-        return []
+    return JSONResponse(body, headers=headers)
+
+
+def _search_cache_key(keywords: str, category: Optional[str]) -> str:
+    """
+    Normalize a basic search so trivially different queries share one cache entry.
+
+    "  Wireless  EARBUDS " and "wireless earbuds" are the same search, and an
+    unknown or missing category both mean the "All" search index.
+    """
+    normalized = " ".join(keywords.lower().split())
+    search_index = CATEGORIES.get(category, "All") if category else "All"
+    return f"search:{search_index}:{normalized}"
 
 
 # ─── Endpoints ────────────────────────────────────────────────────────────────
@@ -211,58 +473,57 @@ async def root():
     return {"status": "online", "message": "AffiliStore Deals API", "version": "1.0.0"}
 
 
+HOMEPAGE_DEALS_KEY = "__homepage__"
+
+
 @app.get("/api/deals")
-async def get_deals():
-    """Get Amazon deals. Returns empty array on failure (frontend shows Coming Soon)."""
+async def get_deals(request: Request):
+    """Get Amazon deals with 24h caching. Returns empty array on failure (frontend shows Coming Soon)."""
     try:
-        result = amazon_api.search_items(
-            keywords="deals offers",
-            search_index="All",
-            item_count=20,
-        )
-        items = result.items if result and result.items else []
-        deals = []
-        for item in items:
-            try:
-                data = _parse_item(item)
-                deals.append({
-                    "asin": data["asin"],
-                    "title": data["title"],
-                    "image_url": data["imageUrl"],
-                    "price": data["price"],
-                    "original_price": data["originalPrice"],
-                    "discount_percent": data["discountPercent"],
-                    "detail_url": data["detailPageURL"],
-                })
-            except Exception as e:
-                logger.error(f"Error parsing deal item: {e}")
-        logger.info(f"Fetched {len(deals)} deals")
-        return {"deals": deals, "total": len(deals)}
+        # Failures raise out of the loader, so an empty result is never cached.
+        entry = await deals_cache.get_or_load(HOMEPAGE_DEALS_KEY, _fetch_homepage_deals)
     except Exception as e:
-        logger.error(f"Error fetching deals: {e}")
+        logger.error("Error fetching deals: %s", e)
         return {"deals": [], "total": 0}
+    return _cached_json(request, HOMEPAGE_DEALS_KEY, entry, {"deals": entry.value, "total": len(entry.value)})
+
+
+async def _fetch_homepage_deals() -> List[Dict]:
+    result = await amazon_client.search_items(
+        keywords="deals offers",
+        search_index="All",
+        item_count=20,
+    )
+    items = result.items if result and result.items else []
+    deals = [to_homepage_deal(product) for product in item_lookup.parse_items(items)]
+    logger.info("Fetched %d deals", len(deals))
+    return deals
 
 
 @app.get("/api/deals/{category}")
-async def get_category_deals(category: str, refresh: bool = False):
+async def get_category_deals(request: Request, category: str, refresh: bool = False):
     """Get deals for a specific category with 24h caching."""
     if category not in CATEGORIES:
         raise HTTPException(status_code=404, detail=f"Category '{category}' not found")
 
-    if not refresh and is_cache_valid(category, cache_timestamp):
-        deals = deals_cache[category]
-    else:
-        deals = fetch_deals_from_amazon(category)
-        deals_cache[category] = deals
-        cache_timestamp[category] = datetime.now()
+    # Concurrent misses for the same category share one upstream fetch. The
+    # loader raises on failure, so an error never replaces cached deals with [].
+    try:
+        entry = await deals_cache.get_or_load(category, lambda: _fetch_category_deals(category), refresh=refresh)
+    except Exception as e:
+        logger.error("Error fetching deals for %s: %s", category, e)
+        # A failed refresh=true still has the previous deals (fresh or stale) to show.
+        entry = await deals_cache.apeek(category)
+        if entry is None:
+            return {"category": category, "total": 0, "deals": []}
 
-    return {
+    return _cached_json(request, category, entry, {
         "category": category,
-        "total": len(deals),
-        "deals": deals,
-        "cached_at": cache_timestamp.get(category, datetime.now()).isoformat(),
-        "cache_valid_until": (cache_timestamp.get(category, datetime.now()) + CACHE_DURATION).isoformat(),
-    }
+        "total": len(entry.value),
+        "deals": entry.value,
+        "cached_at": datetime.fromtimestamp(entry.stored_at).isoformat(),
+        "cache_valid_until": datetime.fromtimestamp(entry.expires_at).isoformat(),
+    })
 
 
 @app.get("/api/categories")
@@ -270,127 +531,370 @@ async def get_categories():
     return {"categories": list(CATEGORIES.keys())}
 
 
+@app.get("/api/stats")
+async def get_stats():
+    """Upstream call queue and cache metrics."""
+    return {
+        "amazon": amazon_client.stats(),
+        "caches": await asyncio.gather(*(cache.astats() for cache in _CACHES)),
+        "local_index": product_index.stats(),
+        "suggest": suggestions.stats(),
+    }
+
+
+# ─── Metrics ──────────────────────────────────────────────────────────────────
+#
+# Request, upstream and scrape-stage timings are recorded where they happen
+# (services/metrics.py). Everything below is read from the components' own
+# stats only when /metrics is scraped.
+
+_CACHES = (deals_cache, search_cache, item_cache, product_cache, affiliate_link_cache)
+# One stats() per cache per scrape, taken by the /metrics handler (off the
+# event loop for shared backends) and read by every cache_* collector below.
+_scraped_cache_stats: List[dict] = []
+
+
+def _cache_samples(stat: str):
+    def collect():
+        for stats in _scraped_cache_stats:
+            if stat in stats:
+                yield (stats["name"],), stats[stat]
+    return collect
+
+
+for _stat, _kind, _doc in (
+    ("hits", "counter", "Fresh cache hits."),
+    ("stale_hits", "counter", "Expired entries served while refreshing."),
+    ("misses", "counter", "Cache misses."),
+    ("coalesced_loads", "counter", "Loads that joined another caller's in-flight load."),
+    ("entries", "gauge", "Entries stored."),
+    ("approx_bytes", "gauge", "Approximate bytes stored."),
+    ("evictions", "counter", "Entries evicted to stay under the caps."),
+):
+    _name = f"cache_{_stat}" + ("_total" if _kind == "counter" else "")
+    REGISTRY.collected(_name, _doc, ("cache",), _cache_samples(_stat), kind=_kind)
+
+REGISTRY.collected(
+    "creators_api_queue_depth", "Creators API calls waiting for an executor thread.", (),
+    lambda: [((), amazon_client.stats()["queue_depth"])],
+)
+REGISTRY.collected(
+    "creators_api_active_calls", "Creators API calls in progress.", (),
+    lambda: [((), amazon_client.stats()["active"])],
+)
+REGISTRY.collected(
+    "scraper_host_circuit_open", "1 while a marketplace host's circuit breaker is open.", ("host",),
+    lambda: [((h["host"],), int(h["state"] == "open")) for h in scraper_hosts.snapshot()["hosts"]],
+)
+REGISTRY.collected(
+    "scraper_host_concurrency_limit", "Adaptive concurrency limit per marketplace host.", ("host",),
+    lambda: [((h["host"],), h["concurrency_limit"]) for h in scraper_hosts.snapshot()["hosts"]],
+)
+REGISTRY.collected(
+    "local_index_documents", "Products in the local search index.", (),
+    lambda: [((), len(product_index))],
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    global _scraped_cache_stats
+    _scraped_cache_stats = await asyncio.gather(*(cache.astats() for cache in _CACHES))
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.post("/api/search")
 async def search_products(request: SearchRequest):
-    """Search Amazon products by keywords."""
-    if not request.keywords:
+    """Search Amazon products by keywords (24h cache, keyed on the normalized query)."""
+    if not request.keywords or not request.keywords.strip():
         raise HTTPException(status_code=400, detail="Keywords are required")
 
+    _, entry = await _cached_search(request.keywords, request.category)
+    if entry.value:
+        suggestions.add(request.keywords, SUGGEST_QUERY_WEIGHT)
+    return {"products": entry.value, "total": len(entry.value)}
+
+
+@app.get("/api/search")
+async def search_products_get(request: Request, keywords: str = "", category: Optional[str] = None):
+    """
+    Same as POST /api/search, but cacheable by browsers and the CDN.
+
+    WHY a GET variant? Conditional requests (If-None-Match → 304) only apply to
+    GETs, so repeat searches can be revalidated without re-sending the body.
+    """
+    if not keywords.strip():
+        raise HTTPException(status_code=400, detail="Keywords are required")
+
+    key, entry = await _cached_search(keywords, category)
+    if entry.value:
+        suggestions.add(keywords, SUGGEST_QUERY_WEIGHT)
+    return _cached_json(request, key, entry, {"products": entry.value, "total": len(entry.value)})
+
+
+# Local-first mode: answer plain searches from the local index when it has at
+# least SEARCH_LOCAL_MIN_RESULTS products matching every word. Those answers are
+# cached for SEARCH_LOCAL_TTL only, and a marker under "<key>:local" (kept as
+# long as a normal search entry) sends the next miss to Amazon, so local and
+# Amazon answers alternate and the query still reaches Amazon regularly.
+SEARCH_LOCAL_FIRST = os.getenv("SEARCH_LOCAL_FIRST", "false").lower() == "true"
+SEARCH_LOCAL_MIN_RESULTS = int(os.getenv("SEARCH_LOCAL_MIN_RESULTS", "10"))
+SEARCH_LOCAL_TTL = float(os.getenv("SEARCH_LOCAL_TTL", "600"))
+
+
+async def _cached_search(keywords: str, category: Optional[str]):
+    key = _search_cache_key(keywords, category)
+    # Indexed Amazon items don't carry a search index, so only "All" searches qualify.
+    if SEARCH_LOCAL_FIRST and CATEGORIES.get(category, "All") == "All":
+        cached = await search_cache.apeek(key)
+        local_key = f"{key}:local"
+        if (cached is None or not cached.is_fresh()) and await search_cache.apeek(local_key) is None:
+            hits = product_index.search(keywords, limit=10, prefix=False, require_all=True)
+            if len(hits) >= SEARCH_LOCAL_MIN_RESULTS:
+                results = [{k: hit.get(k) for k in _SEARCH_RESULT_KEYS} for hit in hits]
+                await search_cache.aset(local_key, True)
+                return key, await search_cache.aset(key, results, ttl=SEARCH_LOCAL_TTL)
     try:
-        search_index = CATEGORIES.get(request.category, "All") if request.category else "All"
-        result = amazon_api.search_items(
-            keywords=request.keywords,
-            search_index=search_index,
-            item_count=10,
-        )
-        items = result.items if result and result.items else []
-        products = []
-        for item in items:
-            try:
-                data = _parse_item(item)
-                products.append({
-                    "title": data["title"],
-                    "description": data["description"],
-                    "imageUrl": data["imageUrl"],
-                    "price": data["price"],
-                    "detailPageURL": data["detailPageURL"],
-                })
-            except Exception as e:
-                logger.error(f"Error parsing item: {e}")
-        return {"products": products, "total": len(products)}
+        entry = await search_cache.get_or_load(key, lambda: _fetch_search(keywords, category))
     except Exception as e:
-        logger.error(f"Search error: {e}")
+        logger.error("Search error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+    return key, entry
+
+
+# The to_search_result shape, for local index hits.
+_SEARCH_RESULT_KEYS = ("title", "description", "imageUrl", "price", "detailPageURL")
+
+
+async def _fetch_search(keywords: str, category: Optional[str]) -> List[Dict]:
+    search_index = CATEGORIES.get(category, "All") if category else "All"
+    result = await amazon_client.search_items(
+        keywords=" ".join(keywords.split()),
+        search_index=search_index,
+        item_count=10,
+    )
+    items = result.items if result and result.items else []
+    return [to_search_result(product) for product in item_lookup.parse_items(items)]
+
+
+@app.get("/api/search/local")
+async def search_local(q: str = "", limit: int = 20, prefix: bool = True):
+    """
+    Search products already seen (searches, deals, item lookups, Smart Imports)
+    without calling Amazon. BM25-ranked; the last word also matches as a prefix.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q is required")
+    start = time.perf_counter()
+    hits = product_index.search(q, limit=max(1, min(limit, 100)), prefix=prefix)
+    return {
+        "products": hits,
+        "total": len(hits),
+        "indexed": len(product_index),
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+@app.get("/api/suggest")
+async def suggest(q: str = "", limit: int = 8):
+    """Search box completions for `q`: popular searched keywords and product titles."""
+    return {"query": q, "suggestions": suggestions.suggest(q, limit=max(1, min(limit, 10))) if q.strip() else []}
+
+
+# ─── Advanced search result windows ──────────────────────────────────────────
+#
+# WHY? Every page used to be its own upstream trip and the endpoint always said
+# hasMore: False. Now the first request for a query fetches page 1, answers
+# from it, and fetches pages 2..ADVANCED_PREFETCH_PAGES concurrently in the
+# background. They're stored together as one window (a candidate set, see
+# services/candidates.py), and every page/items_per_page slice is cut from it.
+
+# The Creators API serves at most 10 pages of 10 items per query.
+ADVANCED_PAGE_SIZE = 10
+ADVANCED_PREFETCH_PAGES = max(1, min(int(os.getenv("ADVANCED_PREFETCH_PAGES", "5")), 10))
+ADVANCED_MAX_ITEMS_PER_PAGE = 50
+
+# Background prefetches by window cache key; a request for a slice past what's
+# loaded waits on the one in flight instead of starting its own.
+advanced_prefetches = SingleFlight()
 
 
 @app.post("/api/amazon/search-advanced")
 async def search_amazon_advanced(request: AdvancedSearchRequest):
-    """Advanced Amazon search with filters, sorting, and 24h caching."""
-    if not request.keywords:
+    """
+    Advanced Amazon search with filters, sorting, pagination and 24h caching.
+
+    Price, rating and brand filters and the price/rating sorts are
+    applied to the cached window, so changing them — or paging — doesn't
+    cost another API call.
+    """
+    if not request.keywords or not request.keywords.strip():
         raise HTTPException(status_code=400, detail="Keywords are required")
 
-    cache_key = (
-        f"{request.keywords}_{request.category}_{request.min_price}_"
-        f"{request.max_price}_{request.min_rating}_{request.brand}_"
-        f"{request.prime_only}_{request.sort_by}_{request.page}"
-    )
+    # Sorts we can't reproduce locally (NewestArrivals) get their own window.
+    upstream_sort = None if is_local_sort(request.sort_by) else request.sort_by
+    cache_key = f"{_search_cache_key(request.keywords, request.category)}:advanced:{upstream_sort or ''}"
+    page = max(1, request.page or 1)
+    per_page = max(1, min(request.items_per_page or ADVANCED_PAGE_SIZE, ADVANCED_MAX_ITEMS_PER_PAGE))
 
-    if is_cache_valid(cache_key, search_cache_timestamp):
-        cached = search_cache[cache_key]
-        cached["cached"] = True
-        cached["cached_at"] = search_cache_timestamp[cache_key].isoformat()
-        return cached
+    loaded = False
 
-    try:
-        search_index = CATEGORIES.get(request.category, "All") if request.category else "All"
-
-        search_params = {
-            "keywords": request.keywords,
-            "search_index": search_index,
-            "item_count": min(request.items_per_page, 10),
-            "item_page": min(request.page, 10),
-        }
-        if request.sort_by and request.sort_by != "Relevance":
-            search_params["sort_by"] = request.sort_by
-
-        result = amazon_api.search_items(**search_params)
-        items = result.items if result and result.items else []
-
-        products = []
-        for item in items:
-            try:
-                data = _parse_item(item)
-                # Client-side filters (Creators API doesn't support all server-side filters)
-                if request.min_price and data["price"]:
-                    try:
-                        price_val = float(data["price"].replace("₹", "").replace(",", ""))
-                        if price_val < request.min_price / 100:
-                            continue
-                    except Exception:
-                        pass
-                if request.max_price and data["price"]:
-                    try:
-                        price_val = float(data["price"].replace("₹", "").replace(",", ""))
-                        if price_val > request.max_price / 100:
-                            continue
-                    except Exception:
-                        pass
-                if request.prime_only and not data["isPrime"]:
-                    continue
-                products.append(data)
-            except Exception as e:
-                logger.error(f"Error parsing item: {e}")
-
-        current_time = datetime.now()
-        response_data = {
-            "products": products,
-            "total": len(products),
-            "totalResults": len(products),
-            "currentPage": request.page,
-            "itemsPerPage": request.items_per_page,
-            "hasMore": False,
-            "cached": False,
-            "timestamp": current_time.isoformat(),
-            "cached_at": None,
-        }
-
-        search_cache[cache_key] = response_data
-        search_cache_timestamp[cache_key] = current_time
-        return response_data
+    async def load():
+        nonlocal loaded
+        loaded = True
+        return await _load_advanced_window(cache_key, request.keywords, request.category, upstream_sort)
 
+    try:
+        # Identical concurrent searches share one upstream call (single-flight).
+        entry = await search_cache.get_or_load(cache_key, load)
+        window = entry.value
+        prefetch = advanced_prefetches.pending(cache_key)
+        if prefetch is not None and page * per_page > len(window["items"]):
+            # The slice is past page 1 — wait for the rest of the window.
+            window = await asyncio.shield(prefetch)
     except Exception as e:
-        logger.error(f"Advanced search error: {e}")
+        logger.error("Advanced search error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+    matches = select_candidates(
+        window,
+        # Prices arrive in paise.
+        min_price=request.min_price / 100 if request.min_price else None,
+        max_price=request.max_price / 100 if request.max_price else None,
+        min_rating=request.min_rating,
+        brand=request.brand,
+        sort_by=request.sort_by,
+    )
+    start = (page - 1) * per_page
+    products = matches[start:start + per_page]
+    if page == 1 and matches:
+        suggestions.add(request.keywords, SUGGEST_QUERY_WEIGHT)
+
+    return {
+        "products": products,
+        "total": len(products),
+        "totalResults": len(matches),
+        "currentPage": page,
+        "itemsPerPage": per_page,
+        # Pages still being prefetched may hold more matches.
+        "hasMore": start + per_page < len(matches) or advanced_prefetches.in_flight(cache_key),
+        "cached": not loaded,
+        "timestamp": datetime.now().isoformat(),
+        "cached_at": None if loaded else datetime.fromtimestamp(entry.stored_at).isoformat(),
+    }
+
+
+async def _fetch_advanced_page(keywords: str, category: Optional[str], sort_by: Optional[str], page: int):
+    """(products, upstream total) for one page of upstream results."""
+    search_params = {
+        "keywords": " ".join(keywords.split()),
+        "search_index": CATEGORIES.get(category, "All") if category else "All",
+        "item_count": ADVANCED_PAGE_SIZE,
+        "item_page": page,
+    }
+    if sort_by:
+        search_params["sort_by"] = sort_by
+
+    result = await amazon_client.search_items(**search_params)
+    items = result.items if result and result.items else []
+    total = getattr(result, "total_result_count", None) or 0
+    return item_lookup.parse_items(items), total
+
+
+def _advanced_window(products: list, pages: int) -> dict:
+    # Pages can repeat items near their edges; keep each ASIN's first position.
+    seen = set()
+    unique = [p for p in products if not (p.asin in seen or seen.add(p.asin))]
+    return {**build_candidates(unique), "pages": pages}
+
+
+async def _load_advanced_window(cache_key: str, keywords: str, category: Optional[str],
+                                sort_by: Optional[str]) -> dict:
+    """Page 1 as a window, with the rest of the window prefetched in the background."""
+    first, total = await _fetch_advanced_page(keywords, category, sort_by, 1)
+    last_page = min(ADVANCED_PREFETCH_PAGES, -(-total // ADVANCED_PAGE_SIZE))
+    if last_page > 1 and len(first) == ADVANCED_PAGE_SIZE:
+        advanced_prefetches.start(
+            cache_key,
+            lambda: _prefetch_advanced_window(cache_key, keywords, category, sort_by, first, last_page),
+        )
+    return _advanced_window(first, pages=1)
+
+
+async def _prefetch_advanced_window(cache_key: str, keywords: str, category: Optional[str],
+                                    sort_by: Optional[str], first: list, last_page: int) -> dict:
+    """Fetch pages 2..last_page concurrently and store them with page 1 as one window."""
+    results = await asyncio.gather(
+        *(_fetch_advanced_page(keywords, category, sort_by, page) for page in range(2, last_page + 1)),
+        return_exceptions=True,
+    )
+    products = list(first)
+    pages = 1
+    # Keep only the unbroken run of pages, so the window's order stays upstream's.
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning("Advanced search prefetch stopped at page %d: %s", pages + 1, result)
+            break
+        products.extend(result[0])
+        pages += 1
+    window = _advanced_window(products, pages=pages)
+    await search_cache.aset(cache_key, window)
+    return window
+
+
+# Cap per request: 10 GetItems calls' worth of ASINs.
+ITEMS_MAX_ASINS = int(os.getenv("ITEMS_MAX_ASINS", "100"))
+
+
+@app.post("/api/amazon/items")
+async def get_amazon_items(request: ItemsRequest):
+    """
+    Look up products by ASIN (e.g. to re-price saved products).
+
+    Cached ASINs — including anything seen in a recent search — are served from
+    the per-ASIN cache; only the rest are fetched, 10 per GetItems call.
+    """
+    if not request.asins:
+        raise HTTPException(status_code=400, detail="At least one ASIN is required")
+    if len(request.asins) > ITEMS_MAX_ASINS:
+        raise HTTPException(status_code=400, detail=f"At most {ITEMS_MAX_ASINS} ASINs per request")
+
+    result = await item_lookup.lookup(request.asins, refresh=request.refresh)
+    return {
+        "products": list(result["items"].values()),
+        "total": len(result["items"]),
+        "notFound": result["not_found"],
+        "invalid": result["invalid"],
+        "failed": result["failed"],
+        "cachedCount": result["cached"],
+        "fetchedCount": result["fetched"],
+    }
+
 
-@app.post("/api/refresh-cache")
+@app.post("/api/refresh-cache", status_code=202)
 async def refresh_cache():
-    """Manually refresh all deals cache."""
-    for category in CATEGORIES.keys():
-        deals = fetch_deals_from_amazon(category)
-        deals_cache[category] = deals
-        cache_timestamp[category] = datetime.now()
-    return {"status": "success", "message": "Cache refreshed", "timestamp": datetime.now().isoformat()}
+    """
+    Start refreshing every category's deals in the background.
+
+    Returns immediately with a job id; poll /api/refresh-cache/{job_id} for progress.
+    If a manual refresh is already running, that job is returned instead.
+    """
+    job = await deals_refresher.trigger()
+    return {
+        "status": "accepted",
+        "job_id": job.id,
+        "status_url": f"/api/refresh-cache/{job.id}",
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+@app.get("/api/refresh-cache/{job_id}")
+async def get_refresh_job(job_id: str):
+    job = await deals_refresher.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Refresh job '{job_id}' not found")
+    return job
 
 
 # ─── Earnkaro Smart Import ────────────────────────────────────────────────────
@@ -399,60 +903,117 @@ async def refresh_cache():
 async def convert_earnkaro_url(request: EarnkaroConvertRequest):
     """Convert product URL to Earnkaro affiliate link and scrape product details."""
     try:
-        logger.info(f"Converting URL: {request.url}")
-        converter = EarnkaroConverter()
+        logger.info("Converting URL: %s", request.url)
 
-        # Step 1: Convert the URL to an affiliate link
-        conversion_result = converter.convert_url(request.url)
+        # Conversion, direct scraping and (for bot-protected sites like Ajio)
+        # Earnkaro's own scraping run concurrently — see EarnkaroConverter.import_product.
+        result = await earnkaro_converter.import_product(request.url, deadline=SMART_IMPORT_DEADLINE)
+        conversion_result = result["conversion"]
         if conversion_result.get("error"):
             raise HTTPException(status_code=400, detail=conversion_result.get("message", "Conversion failed"))
 
-        # Step 2: Try direct scraping first (fast, uses og: meta tags)
-        product_details = converter.scrape_product_details(request.url)
-
-        # Step 3: If direct scraping got nothing (bot-protected site like Ajio),
-        # fall back to Earnkaro's own scraping API — their servers are whitelisted
-        # by affiliate partner platforms, bypassing Cloudflare/bot protection.
-        if not product_details.get("title") and not product_details.get("imageUrl"):
-            logger.info("Direct scrape failed, trying Earnkaro convert_and_scrape...")
-            ek_data = converter.convert_and_scrape(request.url)
-            # Earnkaro returns product info in different possible keys
-            if ek_data and not ek_data.get("error"):
-                product_details["title"] = (
-                    ek_data.get("product_name") or
-                    ek_data.get("title") or
-                    ek_data.get("name") or
-                    product_details.get("title", "")
-                )
-                product_details["imageUrl"] = (
-                    ek_data.get("image") or
-                    ek_data.get("imageUrl") or
-                    ek_data.get("product_image") or
-                    product_details.get("imageUrl", "")
-                )
-                product_details["price"] = (
-                    ek_data.get("price") or
-                    ek_data.get("selling_price") or
-                    product_details.get("price", "")
-                )
-
-        return {
-            "success": True,
-            "affiliateUrl": conversion_result.get("data", ""),
-            "title": product_details.get("title", ""),
-            "imageUrl": product_details.get("imageUrl", ""),
-            "price": product_details.get("price", ""),
-            "description": product_details.get("description", ""),
-            "category": product_details.get("category", ""),
-            "platform": "Earnkaro",
-        }
+        return _smart_import_payload(request.url, conversion_result, result["details"])
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Earnkaro conversion error: {e}")
+        logger.error("Earnkaro conversion error: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to convert URL: {e}")
 
 
+def _smart_import_payload(url: str, conversion_result: dict, product_details: dict) -> dict:
+    """The Smart Import response body; also adds the product to the local index."""
+    payload = {
+        "success": True,
+        "affiliateUrl": conversion_result.get("data", ""),
+        "title": product_details.get("title", ""),
+        "imageUrl": product_details.get("imageUrl", ""),
+        "price": product_details.get("price", ""),
+        "description": product_details.get("description", ""),
+        "category": product_details.get("category", ""),
+        "platform": "Earnkaro",
+    }
+    spec, _ = platform_registry.lookup(url)
+    product_index.add_import(canonical_product_url(url), payload, platform=spec.label if spec.key != "default" else "")
+    return payload
+
+
+@app.post("/api/earnkaro/convert/batch")
+async def convert_earnkaro_batch(body: EarnkaroBatchRequest, request: Request):
+    """
+    Smart Import a list of URLs, streaming one result per URL as it finishes.
+
+    Responds with NDJSON (one JSON object per line), or Server-Sent Events when
+    the client sends `Accept: text/event-stream`. Each item carries the URL it
+    belongs to (plus any duplicate URLs of the same product); a final summary
+    line/event reports the totals.
+    """
+    urls = [u.strip() for u in body.urls if u and u.strip()]
+    if not urls:
+        raise HTTPException(status_code=400, detail="No URLs given")
+    if len(urls) > BATCH_IMPORT_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_IMPORT_MAX_URLS} URLs per batch")
+
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    def frame(event: str, data: dict) -> str:
+        payload = json.dumps(data, ensure_ascii=False)
+        return f"event: {event}\ndata: {payload}\n\n" if sse else payload + "\n"
+
+    async def stream():
+        succeeded = failed = 0
+        results = earnkaro_converter.import_many(
+            urls,
+            deadline=SMART_IMPORT_DEADLINE,
+            max_concurrency=BATCH_IMPORT_CONCURRENCY,
+            per_host=BATCH_IMPORT_PER_HOST,
+        )
+        try:
+            async for report in results:
+                item = {"url": report["url"], "duplicates": report["duplicates"]}
+                conversion = report.get("result", {}).get("conversion", {})
+                if "error" in report or conversion.get("error"):
+                    failed += 1
+                    item.update(success=False, error=report.get("error") or conversion.get("message", "Conversion failed"))
+                else:
+                    succeeded += 1
+                    item.update(_smart_import_payload(report["url"], conversion, report["result"]["details"]))
+                yield frame("item", item)
+            yield frame("done", {
+                "done": True, "urls": len(urls), "products": succeeded + failed,
+                "succeeded": succeeded, "failed": failed,
+            })
+        finally:
+            # Client went away mid-batch: stop the imports that are still running.
+            await results.aclose()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/scraper/hosts")
+async def get_scraper_hosts():
+    """Circuit breaker state and current concurrency limit per marketplace host."""
+    return scraper_hosts.snapshot()
+
+
+@app.get("/api/platforms")
+async def get_platforms():
+    """Marketplaces Smart Import has dedicated extractors for."""
+    return platform_registry.to_dict()
+
+
+@app.post("/api/platforms/reload")
+async def reload_platforms():
+    """Re-read the platform specs file now (e.g. right after Flipkart rotates its CSS classes)."""
+    try:
+        return platform_registry.reload()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid platform specs, keeping previous: {e}")
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", "8000"))
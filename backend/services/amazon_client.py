@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from services.metrics import UPSTREAM_ERRORS, UPSTREAM_SECONDS
+
+
+class AmazonClientBusy(Exception):
+    """Raised when the Creators API call queue is full."""
+
+
+class AmazonClientTimeout(Exception):
+    """Raised when a Creators API call does not finish within the per-call timeout."""
+
+
+class AsyncAmazonClient:
+    """
+    Async wrapper around the blocking AmazonCreatorsApi client.
+
+    WHY a dedicated executor?
+    `AmazonCreatorsApi.search_items` does a blocking HTTP call. Calling it
+    directly from an `async def` endpoint freezes the whole uvicorn worker until
+    Amazon answers, so even cache hits wait behind a slow upstream call.
+    We run every call on a small, bounded thread pool instead:
+      - `max_concurrency` caps parallel upstream calls (Creators API has a TPS quota)
+      - `max_queue` caps how many calls may wait for a thread — beyond that we
+        fail fast instead of piling up requests that will time out anyway
+      - `timeout` bounds how long an endpoint waits for one call
+
+    Pass `api_factory` instead of `api` to build the SDK client on first use.
+    Importing the SDK alone takes a few hundred milliseconds, which every
+    worker would otherwise pay before it can serve anything. The factory runs
+    on an executor thread, never on the event loop; `prepare()` starts it early.
+    """
+
+    def __init__(self, api=None, max_concurrency: int = 4, max_queue: int = 32, timeout: float = 10.0,
+                 api_factory: Optional[Callable[[], Any]] = None):
+        if api is None and api_factory is None:
+            raise ValueError("AsyncAmazonClient needs an api or an api_factory")
+        self._api = api
+        self._api_factory = api_factory
+        self._api_lock = threading.Lock()
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="amazon-api")
+
+        # Counters are touched from worker threads and the event loop, so guard them.
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._max_queue_seen = 0
+        self._calls = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+
+    @property
+    def api(self):
+        """The SDK client, built by `api_factory` on first access (blocking)."""
+        if self._api is None:
+            with self._api_lock:
+                if self._api is None:
+                    self._api = self._api_factory()
+        return self._api
+
+    @api.setter
+    def api(self, api):
+        self._api = api
+
+    def prepare(self):
+        """Build the SDK client on an executor thread now, so the first call doesn't wait for it."""
+        if self._api is None:
+            self._executor.submit(lambda: self.api)
+
+    def _method(self, name: str) -> Callable:
+        # Resolved inside the worker thread, so a lazy `api` is built off the event loop.
+        def method(*args, **kwargs):
+            return getattr(self.api, name)(*args, **kwargs)
+        method.__name__ = name
+        return method
+
+    async def search_items(self, **kwargs):
+        return await self.call(self._method("search_items"), **kwargs)
+
+    async def get_items(self, asins, **kwargs):
+        """GetItems for up to 10 ASINs; returns the list of Items Amazon found."""
+        return await self.call(self._method("get_items"), items=list(asins), **kwargs)
+
+    async def call(self, fn, *args, **kwargs):
+        """Run a blocking client method on the executor and await its result."""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise AmazonClientBusy("Amazon API queue is full")
+            self._queued += 1
+            self._max_queue_seen = max(self._max_queue_seen, self._queued)
+            self._calls += 1
+
+        def _run():
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._total_seconds += time.perf_counter() - started
+
+        def _on_done(cf):
+            # A call cancelled before a thread picked it up never ran `_run`.
+            if cf.cancelled():
+                with self._lock:
+                    self._queued -= 1
+
+        operation = getattr(fn, "__name__", "call")
+        started = time.perf_counter()
+        cf = self._executor.submit(_run)
+        cf.add_done_callback(_on_done)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(cf), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # The worker thread keeps running until the SDK returns; we only
+            # stop waiting for it. A call still sitting in the queue is dropped.
+            with self._lock:
+                self._timeouts += 1
+            UPSTREAM_ERRORS.labels("creators_api", operation, "timeout").inc()
+            raise AmazonClientTimeout(f"Amazon API call timed out after {self.timeout}s")
+        except Exception as e:
+            with self._lock:
+                self._errors += 1
+            UPSTREAM_ERRORS.labels("creators_api", operation, type(e).__name__).inc()
+            raise
+        # Timed from the caller's side, so executor queueing is included.
+        UPSTREAM_SECONDS.labels("creators_api", operation).since(started)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self._calls - self._queued - self._active
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "timeout_seconds": self.timeout,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queue_seen,
+                "active": self._active,
+                "calls": self._calls,
+                "errors": self._errors,
+                "timeouts": self._timeouts,
+                "rejected": self._rejected,
+                "avg_call_seconds": round(self._total_seconds / finished, 4) if finished > 0 else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,403 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+from services.cache_backends import CacheBackend, CacheEntry, MemoryBackend
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls for the same key into one.
+
+    WHY? When a popular cache entry expires, every request that arrives before
+    the refetch finishes would otherwise call the upstream API itself — a
+    stampede on the rate-limited Creators API. With single-flight the first
+    caller starts the fetch and everyone else awaits that same result.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        # do(..., cancel_abandoned=True) callers still awaiting each call.
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def pending(self, key: Hashable) -> Optional[asyncio.Future]:
+        """The in-flight future for `key`, or None."""
+        return self._calls.get(key)
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Return the in-flight future for `key`, starting `fn()` if there is none."""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda f: self._done(key, f))
+        else:
+            self.coalesced += 1
+        return future
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], cancel_abandoned: bool = False) -> Any:
+        """
+        Await the shared call for `key`, starting `fn()` if there is none.
+
+        With `cancel_abandoned`, the call is cancelled once every caller that
+        joined it this way has been cancelled; otherwise it runs to completion
+        (and fills the cache) even if nobody is left waiting.
+        """
+        # WHY shield? If one waiting client disconnects, its cancellation must
+        # not cancel the fetch the other waiters depend on.
+        future = self.start(key, fn)
+        if not cancel_abandoned:
+            return await asyncio.shield(future)
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            left = self._waiters.pop(future) - 1
+            if left:
+                self._waiters[future] = left
+            elif not future.done():
+                future.cancel()
+
+    def _done(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every waiter went away.
+        if not future.cancelled():
+            future.exception()
+
+
+class TTLCache:
+    """
+    Bounded cache with LRU eviction and per-entry TTL.
+
+    WHY not a plain dict?
+    Search results are keyed by every keyword/filter/page combination users
+    (and crawlers) send, so a dict grows without limit. This cache:
+      - caps the number of entries (`max_entries`) and their approximate
+        total size (`max_bytes`), evicting least-recently-used entries first
+      - expires entries after `ttl` seconds (overridable per entry)
+      - actively purges expired entries every `purge_interval` seconds on
+        write, instead of leaving them around until the key is reused
+      - counts hits, misses, evictions and expirations for /api/stats
+      - coalesces concurrent loads of the same key (see SingleFlight)
+
+    With `stale_ttl > 0`, expired entries are kept for that many extra seconds
+    so `get_or_load` can serve them while one background refresh runs
+    (stale-while-revalidate). Entries restored from a snapshot (`restore`) are
+    served the same way, whatever `stale_ttl` is.
+
+    Storage is pluggable (see services/cache_backends.py): the default keeps
+    entries in this process; the SQLite and Redis backends share them between
+    workers and nodes, so adding workers doesn't multiply upstream calls.
+    Those two do I/O on every call, so async code should use get_or_load and
+    the `a`-prefixed methods (aget, aset, apeek, ...), which run a blocking
+    backend's calls on a worker thread; the plain methods stay for sync code.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024,
+                 purge_interval: float = 60.0, stale_ttl: float = 0.0, name: str = "cache",
+                 backend: Optional[CacheBackend] = None, lock_ttl: float = 15.0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.purge_interval = purge_interval
+        self.name = name
+        self.backend = backend if backend is not None else MemoryBackend(max_entries, max_bytes)
+        # How long another process may hold the load lock for a key before we
+        # stop waiting for its result and load it ourselves.
+        self.lock_ttl = lock_ttl
+
+        self._last_purge = time.time()
+        self._flights = SingleFlight()
+        self._background = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def get_entry(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """
+        Return the entry for `key` (marking it recently used), or None.
+
+        Only fresh entries are returned unless `allow_stale` is set, in which case
+        an expired entry still inside its `stale_ttl` window is returned too.
+        """
+        now = time.time()
+        try:
+            entry = self.backend.get(key, now)
+        except Exception as e:
+            # A broken shared cache should degrade to a miss, not fail the request.
+            logger.error("%s cache read failed: %s", self.name, e)
+            entry = None
+        if entry is None or not (entry.is_fresh(now) or allow_stale):
+            self.misses += 1
+            return None
+        if entry.is_fresh(now):
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else default
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Values of the fresh entries among `keys`, in one backend round trip."""
+        keys = list(keys)
+        now = time.time()
+        try:
+            entries = self.backend.get_many(keys, now)
+        except Exception as e:
+            logger.error("%s cache read failed: %s", self.name, e)
+            entries = {}
+        found = {key: entry.value for key, entry in entries.items() if entry.is_fresh(now)}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the stored entry (fresh or stale) without touching hit/miss stats."""
+        try:
+            return self.backend.get(key, time.time())
+        except Exception as e:
+            logger.error("%s cache read failed: %s", self.name, e)
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        entry = self.backend.get(key, time.time())
+        return entry is not None and entry.is_fresh()
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                          refresh: bool = False) -> CacheEntry:
+        """
+        Return the cached entry for `key`, calling `loader()` on a miss.
+
+        Concurrent misses for the same key share one `loader()` call. When
+        stale-while-revalidate is enabled (`stale_ttl > 0`), an expired entry is
+        returned immediately and a single background refresh is started.
+        `refresh=True` skips the cache lookup but still coalesces the load.
+        If `loader()` raises, nothing is cached and every waiter gets the error.
+        Always returns an entry, never None.
+        """
+        if not refresh:
+            # Backends only hold expired entries inside a stale window (ours, or
+            # the longer one a restored snapshot entry was given), so any entry
+            # they still return may be served.
+            entry = await self._io(self.get_entry, key, True)
+            if entry is not None:
+                if not entry.is_fresh():
+                    self._revalidate(key, loader)
+                return entry
+        entry = await self._flights.do(key, lambda: self._load(key, loader, wait_for_peer=not refresh))
+        if entry is None:
+            # We joined a refresh()/_revalidate flight, and those give up (None)
+            # when another process holds the key's lock. Wait for that process's
+            # entry, or load it ourselves if it doesn't arrive in time.
+            entry = await self._load(key, loader, wait_for_peer=True)
+        return entry
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                    wait_for_peer: bool = True) -> CacheEntry:
+        if not await self._io(self._try_lock, key):
+            # Another worker is already loading this key into the shared backend.
+            if wait_for_peer:
+                entry = await self._wait_for_peer(key)
+                if entry is not None:
+                    return entry
+            return await self.aset(key, await loader())
+        try:
+            return await self.aset(key, await loader())
+        finally:
+            await self._io(self._unlock, key)
+
+    async def _wait_for_peer(self, key: str) -> Optional[CacheEntry]:
+        deadline = time.time() + self.lock_ttl
+        while time.time() < deadline:
+            await asyncio.sleep(0.1)
+            entry = await self._io(self.get_entry, key)
+            if entry is not None:
+                return entry
+        return None
+
+    def _try_lock(self, key: str) -> bool:
+        try:
+            return self.backend.acquire_lock(key, self.lock_ttl)
+        except Exception as e:
+            logger.error("%s cache lock failed: %s", self.name, e)
+            return True
+
+    def _unlock(self, key: str):
+        try:
+            self.backend.release_lock(key)
+        except Exception as e:
+            logger.error("%s cache unlock failed: %s", self.name, e)
+
+    def _revalidate(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        if self._flights.in_flight(key):
+            return
+        # No waiting for peers here: we already have a value to serve, so if
+        # another worker holds the lock it is refreshing for us.
+        task = self._flights.start(key, lambda: self._refresh_if_unlocked(key, loader))
+        # Keep a reference so the task isn't garbage-collected mid-flight.
+        self._background.add(task)
+        task.add_done_callback(self._revalidated)
+
+    async def refresh(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Optional[CacheEntry]:
+        """
+        Reload `key` now, sharing any load already in flight in this process.
+
+        Returns None without calling `loader()` when another process holds the
+        key's load lock — it is refreshing the shared entry already.
+        """
+        return await self._flights.do(key, lambda: self._refresh_if_unlocked(key, loader))
+
+    async def _refresh_if_unlocked(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Optional[CacheEntry]:
+        if not await self._io(self._try_lock, key):
+            return None
+        try:
+            return await self.aset(key, await loader())
+        finally:
+            await self._io(self._unlock, key)
+
+    def _revalidated(self, task: asyncio.Future):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Background refresh failed for %s cache: %s", self.name, task.exception())
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> CacheEntry:
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        if now - self._last_purge >= self.purge_interval:
+            self.purge_expired(now)
+        try:
+            return self.backend.set(key, value, now, expires_at, expires_at + self.stale_ttl)
+        except Exception as e:
+            logger.error("%s cache write failed: %s", self.name, e)
+            return CacheEntry(value, now, expires_at, 0)
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Store several values with the same TTL, in one backend round trip/transaction."""
+        if not items:
+            return
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        try:
+            self.backend.set_many(items, now, expires_at, expires_at + self.stale_ttl)
+        except Exception as e:
+            logger.error("%s cache write failed: %s", self.name, e)
+
+    def set_many_in_background(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """
+        set_many() without waiting for it: on a worker thread for blocking backends.
+
+        For write-behind from sync code running on the event loop (e.g. caching
+        every product of a search while building its response).
+        """
+        if not self.backend.blocking:
+            self.set_many(items, ttl)
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.set_many(items, ttl)
+            return
+        task = loop.run_in_executor(None, self.set_many, items, ttl)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def restore(self, key: str, value: Any, stored_at: float, expires_at: float,
+                keep_until: float = 0.0) -> Optional[CacheEntry]:
+        """
+        Put back an entry saved earlier, keeping its original timestamps.
+
+        Unlike `set`, the entry isn't made fresh: if it has expired, `get_or_load`
+        serves it stale and refreshes it in the background. It's kept until
+        `keep_until` or the end of its normal stale window, whichever is later.
+        Nothing is written if the cache already holds a newer entry.
+        """
+        current = self.peek(key)
+        if current is not None and current.stored_at >= stored_at:
+            return None
+        keep_until = max(keep_until, expires_at + self.stale_ttl)
+        if keep_until <= time.time():
+            return None
+        try:
+            return self.backend.set(key, value, stored_at, expires_at, keep_until)
+        except Exception as e:
+            logger.error("%s cache write failed: %s", self.name, e)
+            return None
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop every entry past its expiry (plus stale window). Returns how many were removed."""
+        now = now if now is not None else time.time()
+        self._last_purge = now
+        try:
+            return self.backend.purge(now)
+        except Exception as e:
+            logger.error("%s cache purge failed: %s", self.name, e)
+            return 0
+
+    # ── Async access ─────────────────────────────────────────────────────────
+    # Counters (hits, misses...) may then be bumped from worker threads; a lost
+    # increment only skews /api/stats slightly, so they aren't locked.
+
+    async def _io(self, fn: Callable, *args) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        return await self._io(self.get, key, default)
+
+    async def aget_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return await self._io(self.get_many, list(keys))
+
+    async def apeek(self, key: str) -> Optional[CacheEntry]:
+        return await self._io(self.peek, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> CacheEntry:
+        return await self._io(self.set, key, value, ttl)
+
+    async def aset_many(self, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        await self._io(self.set_many, items, ttl)
+
+    async def astats(self) -> dict:
+        return await self._io(self.stats)
+
+    # ── Metrics ──────────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.stale_hits
+        try:
+            backend_stats = self.backend.stats()
+        except Exception as e:
+            backend_stats = {"error": str(e)}
+        return {
+            "name": self.name,
+            **backend_stats,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced_loads": self._flights.coalesced,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,544 @@
+import json
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional — stdlib json is just slower
+    orjson = None
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    stored_at: float   # wall-clock seconds (time.time())
+    expires_at: float  # wall-clock seconds
+    size: int          # approximate bytes
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+def approx_size(value: Any) -> int:
+    """
+    Rough byte size of a JSON-like value (dicts, lists, strings, numbers).
+
+    WHY not sys.getsizeof alone? It only measures the outer container — a list
+    of 20 product dicts would count as a few hundred bytes. We walk the value
+    once on insert, which is cheap compared to the upstream call that produced it.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += approx_size(k) + approx_size(v)
+    elif isinstance(value, (list, tuple, set)):
+        for v in value:
+            size += approx_size(v)
+    return size
+
+
+# ─── Serialization ────────────────────────────────────────────────────────────
+# WHY compress? Product dicts are repetitive (same keys, same image hosts), so a
+# fast zlib level shrinks a 20-deal list ~4x — less Redis memory, fewer SQLite pages.
+
+_COMPRESS_OVER = 1024
+
+
+def encode_value(value: Any) -> bytes:
+    if orjson is not None:
+        raw = orjson.dumps(value)
+    else:
+        raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(raw) > _COMPRESS_OVER:
+        return b"z" + zlib.compress(raw, 1)
+    return b"j" + raw
+
+
+def decode_value(blob: bytes) -> Any:
+    raw = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+# ─── Backend Interface ────────────────────────────────────────────────────────
+
+class CacheBackend:
+    """
+    Storage behind a TTLCache.
+
+    Backends only store entries and enforce their size caps; freshness,
+    stale-while-revalidate and hit/miss accounting live in TTLCache.
+    `keep_until` is when the backend may drop an entry for good (expiry plus
+    the stale window). Keys are strings so entries can be shared between processes.
+
+    `blocking` backends do disk or network I/O on every call; TTLCache's async
+    methods run their calls on a worker thread instead of the event loop.
+    """
+
+    blocking = False
+
+    def get(self, key: str, now: float) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def get_many(self, keys: List[str], now: float) -> Dict[str, CacheEntry]:
+        """The stored entries among `keys` (missing ones are left out)."""
+        found = {}
+        for key in keys:
+            entry = self.get(key, now)
+            if entry is not None:
+                found[key] = entry
+        return found
+
+    def set(self, key: str, value: Any, stored_at: float, expires_at: float, keep_until: float) -> CacheEntry:
+        raise NotImplementedError
+
+    def set_many(self, items: Dict[str, Any], stored_at: float, expires_at: float, keep_until: float) -> None:
+        """Store several values with the same timestamps (one round trip where the backend allows)."""
+        for key, value in items.items():
+            self.set(key, value, stored_at, expires_at, keep_until)
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def purge(self, now: float) -> int:
+        """Drop entries past `keep_until`. Returns how many were removed."""
+        return 0
+
+    def acquire_lock(self, key: str, ttl: float) -> bool:
+        """
+        Try to become the one process that loads `key`.
+
+        Single-flight only coalesces callers inside one process; shared backends
+        also use this so N workers don't each refetch the same expired key.
+        """
+        return True
+
+    def release_lock(self, key: str) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU dict — fastest, but every worker warms its own copy."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, now):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            entry, keep_until = item
+            if now >= keep_until:
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, stored_at, expires_at, keep_until):
+        entry = CacheEntry(value, stored_at, expires_at, approx_size(value))
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (entry, keep_until)
+            self._bytes += entry.size
+            # Evict least-recently-used entries until we're back under both caps.
+            # The entry we just wrote is always kept, even if it alone exceeds max_bytes.
+            while len(self._data) > 1 and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+        return entry
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def purge(self, now):
+        with self._lock:
+            expired = [k for k, (_, keep_until) in self._data.items() if keep_until <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def _remove(self, key):
+        entry, _ = self._data.pop(key)
+        self._bytes -= entry.size
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "approx_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    On-disk cache in one SQLite file, shared by every worker on the same host.
+
+    WHY SQLite? It's in the stdlib, and WAL mode lets several uvicorn workers
+    read concurrently while one writes. Calls still touch the disk, so TTLCache
+    runs them off the event loop (`blocking`).
+
+    Entry and byte totals per namespace live in `cache_totals`, kept current by
+    triggers, so every worker sees the same numbers and checking the caps (on
+    each write) or reporting stats is one primary-key read, not a COUNT/SUM
+    over the namespace. Going over a cap evicts least-recently-used entries
+    down to `EVICT_TO` of it, so a full cache doesn't evict on every write.
+    """
+
+    blocking = True
+
+    # WHY throttle last_used updates? Writing on every hit would make reads
+    # contend for the write lock; minute-level LRU precision is plenty.
+    _TOUCH_EVERY = 60.0
+    EVICT_TO = 0.9
+
+    _UPSERT = (
+        "INSERT INTO cache (namespace, key, value, stored_at, expires_at, keep_until, size, last_used)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        # An upsert rather than INSERT OR REPLACE: REPLACE's implicit delete
+        # doesn't fire the delete trigger, which would leave the totals wrong.
+        " ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, stored_at = excluded.stored_at,"
+        " expires_at = excluded.expires_at, keep_until = excluded.keep_until, size = excluded.size,"
+        " last_used = excluded.last_used"
+    )
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pid = None
+        self._token = uuid.uuid4().hex
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so open one per process lazily.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+                " stored_at REAL NOT NULL, expires_at REAL NOT NULL, keep_until REAL NOT NULL,"
+                " size INTEGER NOT NULL, last_used REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, last_used)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_locks ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, owner TEXT NOT NULL, expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._create_totals(conn)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def _create_totals(conn: sqlite3.Connection):
+        # IMMEDIATE: workers starting together must not both (re)build the totals.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'cache_totals_update'"
+            ).fetchone()
+            if not exists:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_totals ("
+                    " namespace TEXT PRIMARY KEY, entries INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE TRIGGER cache_totals_insert AFTER INSERT ON cache BEGIN"
+                    " INSERT INTO cache_totals (namespace, entries, bytes) VALUES (new.namespace, 1, new.size)"
+                    " ON CONFLICT (namespace) DO UPDATE SET entries = entries + 1, bytes = bytes + new.size;"
+                    " END"
+                )
+                conn.execute(
+                    "CREATE TRIGGER cache_totals_delete AFTER DELETE ON cache BEGIN"
+                    " UPDATE cache_totals SET entries = entries - 1, bytes = bytes - old.size"
+                    " WHERE namespace = old.namespace;"
+                    " END"
+                )
+                conn.execute(
+                    "CREATE TRIGGER cache_totals_update AFTER UPDATE OF size ON cache BEGIN"
+                    " UPDATE cache_totals SET bytes = bytes + new.size - old.size WHERE namespace = new.namespace;"
+                    " END"
+                )
+                # A cache file from before the totals existed: count it once.
+                conn.execute("DELETE FROM cache_totals")
+                conn.execute(
+                    "INSERT INTO cache_totals (namespace, entries, bytes)"
+                    " SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM cache GROUP BY namespace"
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _totals(self):
+        row = self.conn.execute(
+            "SELECT entries, bytes FROM cache_totals WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return row if row is not None else (0, 0)
+
+    def get(self, key, now):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, stored_at, expires_at, keep_until, size, last_used FROM cache"
+                " WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            blob, stored_at, expires_at, keep_until, size, last_used = row
+            if now >= keep_until:
+                self.delete(key)
+                self.expirations += 1
+                return None
+            if now - last_used >= self._TOUCH_EVERY:
+                self.conn.execute(
+                    "UPDATE cache SET last_used = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key),
+                )
+        return CacheEntry(decode_value(blob), stored_at, expires_at, size)
+
+    def get_many(self, keys, now):
+        with self._lock:
+            return super().get_many(keys, now)
+
+    def set(self, key, value, stored_at, expires_at, keep_until):
+        blob = encode_value(value)
+        with self._lock:
+            self.conn.execute(
+                self._UPSERT, (self.namespace, key, blob, stored_at, expires_at, keep_until, len(blob), stored_at),
+            )
+            self._enforce_caps({key})
+        return CacheEntry(value, stored_at, expires_at, len(blob))
+
+    def set_many(self, items, stored_at, expires_at, keep_until):
+        rows = [
+            (self.namespace, key, blob, stored_at, expires_at, keep_until, len(blob), stored_at)
+            for key, blob in ((k, encode_value(v)) for k, v in items.items())
+        ]
+        with self._lock:
+            # One transaction: one fsync-free WAL commit instead of one per row.
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(self._UPSERT, rows)
+                self._enforce_caps(set(items))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _enforce_caps(self, keep_keys: set):
+        count, total = self._totals()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        max_count, max_total = int(self.max_entries * self.EVICT_TO), int(self.max_bytes * self.EVICT_TO)
+        victims = []
+        # Iterated lazily along the (namespace, last_used) index: only as many
+        # rows are read as get evicted.
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM cache WHERE namespace = ? ORDER BY last_used", (self.namespace,)
+        ):
+            if count <= max_count and total <= max_total:
+                break
+            if key in keep_keys:
+                continue
+            victims.append((self.namespace, key))
+            count -= 1
+            total -= size
+        self.conn.executemany("DELETE FROM cache WHERE namespace = ? AND key = ?", victims)
+        self.evictions += len(victims)
+
+    def delete(self, key):
+        with self._lock:
+            self.conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def purge(self, now):
+        with self._lock:
+            removed = self.conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND keep_until <= ?", (self.namespace, now)
+            ).rowcount
+            self.expirations += removed
+            return removed
+
+    def acquire_lock(self, key, ttl):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM cache_locks WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                (self.namespace, key, now),
+            )
+            inserted = self.conn.execute(
+                "INSERT OR IGNORE INTO cache_locks (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, self._token, now + ttl),
+            ).rowcount
+            return inserted == 1
+
+    def release_lock(self, key):
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM cache_locks WHERE namespace = ? AND key = ? AND owner = ?",
+                (self.namespace, key, self._token),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._totals()[0]
+
+    def stats(self):
+        with self._lock:
+            count, total = self._totals()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": count,
+            "max_entries": self.max_entries,
+            "approx_bytes": total,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache shared by every worker on every node through a Redis-protocol server
+    (Redis, Valkey, KeyDB, Upstash...).
+
+    Entries expire through Redis key TTLs. Entry/byte caps are left to the
+    server's `maxmemory` + `allkeys-lru` policy rather than tracked here, and
+    stats() reports the database's key count (DBSIZE, one O(1) command) rather
+    than scanning for this namespace's keys.
+    """
+
+    blocking = True
+
+    # stored_at, expires_at as big-endian doubles, followed by the encoded value
+    _HEADER = struct.Struct("!dd")
+
+    def __init__(self, url: str, namespace: str, prefix: str = "affilistore"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        self.url = url
+        self.namespace = namespace
+        self._prefix = f"{prefix}:{namespace}:"
+        # Short timeouts: a slow cache must degrade to a miss, not stall the worker.
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._token = uuid.uuid4().hex.encode()
+
+    def get(self, key, now):
+        blob = self._redis.get(self._prefix + key)
+        return self._decode(blob) if blob is not None else None
+
+    def _decode(self, blob: bytes) -> CacheEntry:
+        stored_at, expires_at = self._HEADER.unpack_from(blob)
+        return CacheEntry(decode_value(blob[self._HEADER.size:]), stored_at, expires_at, len(blob))
+
+    def get_many(self, keys, now):
+        if not keys:
+            return {}
+        blobs = self._redis.mget([self._prefix + key for key in keys])
+        return {key: self._decode(blob) for key, blob in zip(keys, blobs) if blob is not None}
+
+    def set(self, key, value, stored_at, expires_at, keep_until):
+        blob = self._HEADER.pack(stored_at, expires_at) + encode_value(value)
+        ttl_ms = max(1, int((keep_until - time.time()) * 1000))
+        self._redis.set(self._prefix + key, blob, px=ttl_ms)
+        return CacheEntry(value, stored_at, expires_at, len(blob))
+
+    def set_many(self, items, stored_at, expires_at, keep_until):
+        header = self._HEADER.pack(stored_at, expires_at)
+        ttl_ms = max(1, int((keep_until - time.time()) * 1000))
+        pipe = self._redis.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self._prefix + key, header + encode_value(value), px=ttl_ms)
+        pipe.execute()
+
+    def delete(self, key):
+        self._redis.delete(self._prefix + key)
+
+    def clear(self):
+        keys = list(self._redis.scan_iter(match=self._prefix + "*", count=500))
+        if keys:
+            self._redis.delete(*keys)
+
+    def acquire_lock(self, key, ttl):
+        return bool(self._redis.set(self._prefix + "lock:" + key, self._token, nx=True, px=int(ttl * 1000)))
+
+    def release_lock(self, key):
+        lock_key = self._prefix + "lock:" + key
+        if self._redis.get(lock_key) == self._token:
+            self._redis.delete(lock_key)
+
+    def __len__(self):
+        # Scans the whole keyspace — fine for a debugging shell, not for a request.
+        return sum(1 for k in self._redis.scan_iter(match=self._prefix + "*", count=500) if b":lock:" not in k)
+
+    def stats(self):
+        return {"backend": "redis", "db_keys": self._redis.dbsize()}
+
+
+def make_backend(kind: str, namespace: str, max_entries: int, max_bytes: int, url: str = "") -> CacheBackend:
+    """
+    Build a backend from config.
+
+    kind: "memory" (default), "sqlite" (url = database file path) or
+    "redis" (url = redis://host:port/db).
+    """
+    kind = (kind or "memory").lower()
+    if kind == "memory":
+        return MemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
+    if kind == "sqlite":
+        return SQLiteBackend(url or "cache.sqlite3", namespace, max_entries=max_entries, max_bytes=max_bytes)
+    if kind == "redis":
+        return RedisBackend(url or "redis://localhost:6379/0", namespace)
+    raise ValueError(f"Unknown cache backend '{kind}' (expected memory, sqlite or redis)")
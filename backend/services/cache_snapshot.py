@@ -0,0 +1,129 @@
+import json
+import logging
+import mmap
+import os
+import time
+from typing import Dict, Iterable, Iterator, Tuple
+
+from services.cache import TTLCache
+
+try:
+    import orjson
+except ImportError:  # orjson is optional — stdlib json is just slower
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Cache snapshots
+#
+# WHY? Every deploy or idle spin-down on Render restarts the app with empty
+# caches, and the first visitor to each category waits on the Creators API.
+# Snapshots of the deals caches are written to a local file periodically and
+# at shutdown; on boot they are restored *with their original timestamps*, so
+# expired entries are served stale while the refresher replaces them in the
+# background (see TTLCache.restore) instead of being presented as fresh.
+#
+# Format: JSON lines — one header line, then one line per entry. It's written
+# to a temp file and renamed into place, so a crash mid-write leaves the
+# previous snapshot intact; loading maps the file and parses line by line.
+# ──────────────────────────────────────────────────────────────────────────────
+
+SNAPSHOT_VERSION = 1
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def save_snapshot(path: str, caches: Dict[TTLCache, Iterable[str]]) -> int:
+    """
+    Write the current entries for the given keys of each cache to `path`.
+
+    `caches` maps each cache to the keys worth persisting (entries that are
+    missing are skipped). Returns the number of entries written. Blocking —
+    call it from a worker thread on the event loop.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    written = 0
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(tmp, "wb") as f:
+        f.write(_dumps({"version": SNAPSHOT_VERSION, "saved_at": time.time()}) + b"\n")
+        for cache, keys in caches.items():
+            for key in keys:
+                entry = cache.peek(key)
+                if entry is None:
+                    continue
+                f.write(_dumps({
+                    "cache": cache.name,
+                    "key": key,
+                    "stored_at": entry.stored_at,
+                    "expires_at": entry.expires_at,
+                    "value": entry.value,
+                }) + b"\n")
+                written += 1
+    os.replace(tmp, path)
+    return written
+
+
+def _read_lines(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                yield line
+
+
+def load_snapshot(path: str, caches: Iterable[TTLCache], max_age: float) -> Dict[str, int]:
+    """
+    Restore entries from `path` into the caches with matching names.
+
+    Entries stored more than `max_age` seconds ago are skipped, and restored
+    entries are kept until at least then, even if that is past their expiry
+    plus the cache's stale window. Returns {cache name: entries restored}. A
+    missing, unreadable or old-version file restores nothing.
+    """
+    by_name = {cache.name: cache for cache in caches}
+    restored: Dict[str, int] = {name: 0 for name in by_name}
+    if not os.path.exists(path):
+        return restored
+
+    now = time.time()
+    try:
+        lines = _read_lines(path)
+        header = _loads(next(lines, b"{}"))
+        if header.get("version") != SNAPSHOT_VERSION:
+            logger.warning("Ignoring cache snapshot %s with version %s", path, header.get("version"))
+            return restored
+        for line in lines:
+            record = _loads(line)
+            cache = by_name.get(record["cache"])
+            if cache is None or now - record["stored_at"] > max_age:
+                continue
+            cache.restore(record["key"], record["value"], record["stored_at"], record["expires_at"],
+                          keep_until=record["stored_at"] + max_age)
+            restored[cache.name] += 1
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        # A truncated or corrupt snapshot just means a colder start.
+        logger.error("Cache snapshot %s could not be read: %s", path, e)
+    return restored
+
+
+def snapshot_signature(caches: Dict[TTLCache, Iterable[str]]) -> Tuple:
+    """Cheap fingerprint of what save_snapshot would write, to skip unchanged saves."""
+    signature = []
+    for cache, keys in caches.items():
+        for key in keys:
+            entry = cache.peek(key)
+            if entry is not None:
+                signature.append((cache.name, key, entry.stored_at))
+    return tuple(signature)
@@ -0,0 +1,92 @@
+from typing import List, Optional
+
+from services.products import AmazonProduct, to_item
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Advanced search candidate sets
+#
+# WHY? Advanced search used to cache one response per full filter combination,
+# so moving a price slider or changing the minimum rating was a fresh upstream
+# call, and each filter re-parsed "₹1,449.00" display strings per item. Now the
+# upstream results for keyword+category are cached once as a candidate set:
+#   - the items as response dicts, plus parallel columns (price, rating, brand)
+#     taken from the API's numeric values
+#   - sort orders (price ↑/↓, rating ↓) precomputed as index lists when the set
+#     is built, so sorting a request is a lookup rather than a sort
+# Each request's filters are then one pass over those columns.
+# ──────────────────────────────────────────────────────────────────────────────
+
+# sort_by values served from precomputed orders; "Relevance" (or none) keeps
+# upstream order. Anything else (NewestArrivals) has to be sorted upstream.
+LOCAL_SORTS = {
+    "Price:LowToHigh": "price_asc",
+    "Price:HighToLow": "price_desc",
+    "AvgCustomerReviews": "rating_desc",
+}
+
+
+def is_local_sort(sort_by: Optional[str]) -> bool:
+    return not sort_by or sort_by == "Relevance" or sort_by in LOCAL_SORTS
+
+
+def build_candidates(products: List[AmazonProduct]) -> dict:
+    """
+    A candidate set for `products`, in upstream order.
+
+    Plain lists of JSON types, so it stores in every cache backend as is.
+    """
+    price = [p.price_amount for p in products]
+    rating = [p.rating for p in products]
+    positions = range(len(products))
+    priced = [i for i in positions if price[i] is not None]
+    rated = [i for i in positions if rating[i] is not None]
+    unpriced = [i for i in positions if price[i] is None]
+    unrated = [i for i in positions if rating[i] is None]
+
+    # sorted() is stable, so ties keep upstream (relevance) order; items with
+    # no price/rating go last in every order.
+    return {
+        "items": [to_item(p) for p in products],
+        "price": price,
+        "rating": rating,
+        "brand": [p.brand.lower() for p in products],
+        "orders": {
+            "price_asc": sorted(priced, key=price.__getitem__) + unpriced,
+            "price_desc": sorted(priced, key=lambda i: -price[i]) + unpriced,
+            "rating_desc": sorted(rated, key=lambda i: -rating[i]) + unrated,
+        },
+    }
+
+
+def select(
+    candidates: dict,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    brand: Optional[str] = None,
+    sort_by: Optional[str] = None,
+) -> List[dict]:
+    """
+    Items of `candidates` matching the filters, in `sort_by` order.
+
+    Prices are in rupees. Like before, items without a price aren't dropped by
+    the price bounds; items without a rating are dropped by `min_rating`.
+    """
+    order = candidates["orders"].get(LOCAL_SORTS.get(sort_by or ""))
+    indices = order if order is not None else range(len(candidates["items"]))
+
+    price = candidates["price"]
+    if min_price:
+        indices = [i for i in indices if price[i] is None or price[i] >= min_price]
+    if max_price:
+        indices = [i for i in indices if price[i] is None or price[i] <= max_price]
+    if min_rating:
+        rating = candidates["rating"]
+        indices = [i for i in indices if rating[i] is not None and rating[i] >= min_rating]
+    if brand and brand.strip():
+        needle = brand.strip().lower()
+        brands = candidates["brand"]
+        indices = [i for i in indices if needle in brands[i]]
+
+    items = candidates["items"]
+    return [items[i] for i in indices]
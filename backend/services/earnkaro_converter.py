@@ -1,15 +1,92 @@
-import requests
+import asyncio
+import httpx
+import logging
 import os
-from bs4 import BeautifulSoup
-import re
+import time
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
 
+from services.cache import SingleFlight, TTLCache
+from services.html_head import HeadReader, extract_head_meta
+from services.host_guard import HostGuards
+from services.html_parsers import make_parser
+from services.metrics import SCRAPE_STAGE_SECONDS, UPSTREAM_ERRORS, UPSTREAM_SECONDS
+from services.platforms import PlatformRegistry, PlatformSpec
+from services.product_urls import bare_host, canonical_product_url
+
+# Stop reading a product page after this many bytes — prices never sit deeper.
+MAX_PAGE_BYTES = 4 * 1024 * 1024
+
+# Responses that mean "the host is refusing us" (bot challenge, rate limit) rather
+# than "this product page is odd" — they count against the host's circuit breaker.
+BLOCKED_STATUSES = (403, 429)
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeBlocked(Exception):
+    pass
+
+
+def _error_reason(error: Exception) -> str:
+    """Short, bounded label for upstream_errors_total."""
+    if isinstance(error, ScrapeBlocked):
+        return "blocked"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.HTTPError):
+        return "network"
+    return "error"
 
-class EarnkaroConverter:
-    """Service to convert product URLs to Earnkaro affiliate links and scrape product details"""
 
-    def __init__(self):
+def _platform_label(spec: PlatformSpec) -> str:
+    # Unknown stores share one label, however many different hosts users paste.
+    return "other" if spec.key == "default" else spec.key
+
+
+class EarnkaroConverter:
+    """
+    Service to convert product URLs to Earnkaro affiliate links and scrape product details.
+
+    WHY one shared instance with one AsyncClient?
+    A fresh connection per call means a fresh TCP + TLS handshake to
+    ekaro-api.affiliaters.in and to the marketplace on every Smart Import.
+    httpx keeps a keep-alive pool per host (and multiplexes over HTTP/2 where
+    the host supports it), so repeat calls to the same host skip the handshake.
+    The app creates one converter and ties `start()` / `aclose()` to its lifespan.
+    """
+
+    def __init__(self, max_connections: int = 50, max_keepalive: int = 20,
+                 keepalive_expiry: float = 60.0, http2: bool = True, parser: str = "auto",
+                 platforms: PlatformRegistry = None, link_cache: TTLCache = None,
+                 details_cache: TTLCache = None, negative_ttl: float = 300.0, hosts: HostGuards = None,
+                 transport: httpx.AsyncBaseTransport = None):
         self.api_token = os.getenv("EARNKARO_API_TOKEN")
         self.base_url = "https://ekaro-api.affiliaters.in/api/converter/public"
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        # None = real network. Benchmarks swap in a replay transport (benchmarks/fake_upstream.py).
+        self.transport = transport
+        self._client = None
+        self.parser = make_parser(parser)
+        # Per-marketplace selectors, category overrides and bot-protection flags (services/platforms.json).
+        self.platforms = platforms or PlatformRegistry()
+
+        # Smart Import results per canonical product URL (services/product_urls.py).
+        # Affiliate links are stable for days, scraped details (price!) go stale
+        # sooner, and failed scrapes are remembered for `negative_ttl` seconds so
+        # a bot-protected URL isn't re-fetched on every retry. None disables caching.
+        self.link_cache = link_cache
+        self.details_cache = details_cache
+        self.negative_ttl = negative_ttl
+        self._imports = SingleFlight()
+
+        # Circuit breaker + adaptive concurrency limit per marketplace host (services/host_guard.py).
+        self.hosts = hosts or HostGuards()
 
         # WHY this User-Agent?
         # Many e-commerce sites block requests from Python's default "python-requests/x.x"
@@ -25,11 +102,37 @@ class EarnkaroConverter:
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
         }
 
+    # ──────────────────────────────────────────────────────────────────────────
+    # HTTP Client Lifecycle
+    # ──────────────────────────────────────────────────────────────────────────
+
+    async def start(self):
+        if self._client is None:
+            # WHY follow_redirects? Short links (amzn.to, dl.flipkart.com) redirect
+            # to the real product page; requests followed them by default, httpx doesn't.
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=self.http2,
+                follow_redirects=True,
+                transport=self.transport,
+            )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("EarnkaroConverter.start() must be awaited before use")
+        return self._client
+
     # ──────────────────────────────────────────────────────────────────────────
     # Earnkaro URL Conversion
     # ──────────────────────────────────────────────────────────────────────────
 
-    def convert_url(self, product_url: str) -> dict:
+    async def convert_url(self, product_url: str) -> dict:
         """
         Convert a regular product URL to an Earnkaro affiliate link.
 
@@ -45,16 +148,20 @@ class EarnkaroConverter:
                 "Authorization": f"Bearer {self.api_token}",
                 "Content-Type": "application/json"
             }
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=10)
+            started = time.perf_counter()
+            response = await self.client.post(self.base_url, headers=headers, json=payload, timeout=10)
+            self._record_earnkaro("convert", started, response)
             return response.json()
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException as e:
+            UPSTREAM_ERRORS.labels("earnkaro", "convert", _error_reason(e)).inc()
             return {"error": 1, "message": "Request timeout. Please try again."}
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
+            UPSTREAM_ERRORS.labels("earnkaro", "convert", _error_reason(e)).inc()
             return {"error": 1, "message": f"Network error: {str(e)}"}
         except Exception as e:
             return {"error": 1, "message": f"Conversion failed: {str(e)}"}
 
-    def convert_and_scrape(self, product_url: str) -> dict:
+    async def convert_and_scrape(self, product_url: str) -> dict:
         """
         Use Earnkaro's convert_and_scrape option to get product details.
 
@@ -75,25 +182,216 @@ class EarnkaroConverter:
                 "Authorization": f"Bearer {self.api_token}",
                 "Content-Type": "application/json"
             }
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=15)
+            started = time.perf_counter()
+            response = await self.client.post(self.base_url, headers=headers, json=payload, timeout=15)
+            self._record_earnkaro("convert_and_scrape", started, response)
             result = response.json()
-            print(f"[SmartImport] Earnkaro scrape response: {result}")
+            logger.debug("[SmartImport] Earnkaro scrape response: %s", result)
             return result
         except Exception as e:
-            print(f"[SmartImport] Earnkaro scrape error: {e}")
+            if isinstance(e, httpx.HTTPError):
+                UPSTREAM_ERRORS.labels("earnkaro", "convert_and_scrape", _error_reason(e)).inc()
+            logger.warning("[SmartImport] Earnkaro scrape error: %s", e)
             return {}
 
+    @staticmethod
+    def _record_earnkaro(operation: str, started: float, response: httpx.Response):
+        UPSTREAM_SECONDS.labels("earnkaro", operation).since(started)
+        if response.status_code >= 400:
+            UPSTREAM_ERRORS.labels("earnkaro", operation, f"http_{response.status_code}").inc()
+
+    def _details_from_earnkaro(self, ek_data: dict) -> dict:
+        """Map Earnkaro's scrape response onto our details keys (it uses several key names)."""
+        if not ek_data or ek_data.get("error"):
+            return {}
+        return {
+            "title": ek_data.get("product_name") or ek_data.get("title") or ek_data.get("name") or "",
+            "imageUrl": ek_data.get("image") or ek_data.get("imageUrl") or ek_data.get("product_image") or "",
+            "price": ek_data.get("price") or ek_data.get("selling_price") or "",
+        }
+
+    async def _scrape_via_earnkaro(self, url: str) -> dict:
+        return self._details_from_earnkaro(await self.convert_and_scrape(url))
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Smart Import Pipeline
+    # ──────────────────────────────────────────────────────────────────────────
+
+    async def import_product(self, url: str, deadline: float = 20.0) -> dict:
+        """
+        Convert a URL and scrape its product details concurrently.
+
+        WHY concurrent? Conversion (10s timeout), direct scraping (15s) and the
+        Earnkaro scrape fallback (15s) used to run one after another — worst case
+        ~40s. They don't depend on each other, so:
+          - conversion and direct scraping start together
+          - for bot-protected hosts the Earnkaro scrape starts speculatively too;
+            for other hosts it only starts once direct scraping comes back incomplete
+          - the first scrape result with both title and image wins and the slower
+            scrape is cancelled
+          - everything is bounded by `deadline` seconds overall
+
+        Results are cached per canonical product URL, and concurrent imports of
+        the same product (two editors pasting the same deal) share one run. The
+        run is cancelled once every caller sharing it has been cancelled.
+
+        Returns {"conversion": <Earnkaro convert response>, "details": <details dict>}.
+        """
+        cache_key = canonical_product_url(url)
+        return await self._imports.do(cache_key, lambda: self._import(url, cache_key, deadline), cancel_abandoned=True)
+
+    async def import_many(self, urls: List[str], deadline: float = 20.0, max_concurrency: int = 16,
+                          per_host: int = 4) -> AsyncIterator[dict]:
+        """
+        Import many URLs concurrently, yielding each result as soon as it's ready.
+
+        WHY per-host limits? A catalogue is usually hundreds of links from the same
+        two or three marketplaces. `max_concurrency` caps the whole batch (and so
+        the Earnkaro API calls), `per_host` caps how many pages of one marketplace
+        are fetched at once so a batch never floods it. URLs that canonicalize to
+        the same product are imported once and reported together.
+
+        Yields {"url", "duplicates", "result"} or {"url", "duplicates", "error"}
+        in completion order. Closing the iterator early cancels what's still
+        running, except imports that another caller (a concurrent single import
+        or batch with the same product) is still waiting on.
+        """
+        unique: Dict[str, List[str]] = {}
+        for url in urls:
+            unique.setdefault(canonical_product_url(url), []).append(url)
+
+        batch_slots = asyncio.Semaphore(max_concurrency)
+        host_slots: Dict[str, asyncio.Semaphore] = {}
+
+        async def run(cache_key: str, originals: List[str]) -> dict:
+            url = originals[0]
+            host = urlsplit(cache_key).hostname or ""
+            report = {"url": url, "duplicates": originals[1:]}
+            # Host slot first: holding a batch slot while queueing for a busy
+            # host would starve URLs for other hosts.
+            async with host_slots.setdefault(host, asyncio.Semaphore(per_host)), batch_slots:
+                try:
+                    report["result"] = await self.import_product(url, deadline=deadline)
+                except Exception as e:
+                    report["error"] = str(e)
+            return report
+
+        tasks = [asyncio.create_task(run(key, originals)) for key, originals in unique.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _import(self, url: str, cache_key: str, deadline: float) -> dict:
+        conversion = asyncio.create_task(self._convert_cached(url, cache_key))
+        cached = await self.details_cache.aget(cache_key) if self.details_cache is not None else None
+        if cached is not None:
+            try:
+                async with asyncio.timeout(deadline):
+                    conversion_result = await conversion
+            except TimeoutError:
+                conversion_result = {"error": 1, "message": "Request timeout. Please try again."}
+            return {"conversion": conversion_result, "details": self._complete_details(url, cached)}
+
+        # A host whose circuit is open would only burn the timeout — go straight to Earnkaro's scrape.
+        direct = None
+        if not self.hosts.get(self._host(url)).is_open():
+            direct = asyncio.create_task(self.scrape_product_details(url))
+        fallback = None
+        if direct is None or self._is_bot_protected(url):
+            fallback = asyncio.create_task(self._scrape_via_earnkaro(url))
+
+        pending = {t for t in (conversion, direct, fallback) if t is not None}
+        details = {}
+        found = False
+        try:
+            async with asyncio.timeout(deadline):
+                while pending and not (found and conversion.done()):
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task is conversion:
+                            if task.result().get("error"):
+                                return {"conversion": task.result(), "details": self._complete_details(url, details)}
+                            continue
+
+                        result = task.result()
+                        if not found and result.get("title") and result.get("imageUrl"):
+                            found = True
+                            details = {**details, **{k: v for k, v in result.items() if v}}
+                            # Drop the slower scrape — the `finally` below cancels it.
+                            pending = {t for t in pending if t is conversion}
+                        else:
+                            # Keep whatever fields we have; never overwrite with blanks.
+                            for key, value in result.items():
+                                if value and not details.get(key):
+                                    details[key] = value
+
+                        if task is direct and not found and fallback is None:
+                            fallback = asyncio.create_task(self._scrape_via_earnkaro(url))
+                            pending.add(fallback)
+        except TimeoutError:
+            pass
+        finally:
+            for task in (conversion, direct, fallback):
+                if task is not None and not task.done():
+                    task.cancel()
+
+        if conversion.done() and not conversion.cancelled():
+            conversion_result = conversion.result()
+        else:
+            conversion_result = {"error": 1, "message": "Request timeout. Please try again."}
+        await self._remember_details(cache_key, details)
+        return {"conversion": conversion_result, "details": self._complete_details(url, details)}
+
+    async def _convert_cached(self, url: str, key: str) -> dict:
+        if self.link_cache is None:
+            return await self.convert_url(url)
+        cached = await self.link_cache.aget(key)
+        if cached is not None:
+            return cached
+        result = await self.convert_url(url)
+        # Errors (timeouts, unsupported store) aren't cached — a retry may well succeed.
+        if not result.get("error"):
+            await self.link_cache.aset(key, result)
+        return result
+
+    async def _remember_details(self, key: str, details: dict):
+        if self.details_cache is None:
+            return
+        complete = details.get("title") and details.get("imageUrl")
+        await self.details_cache.aset(key, details, ttl=None if complete else self.negative_ttl)
+
+    def _is_bot_protected(self, url: str) -> bool:
+        # WHY? Hosts like Ajio and Nykaa sit behind Cloudflare/Akamai bot protection,
+        # so direct scraping usually comes back empty — Earnkaro's scrape is worth starting right away.
+        return self.platforms.lookup(url)[0].bot_protected
+
+    def _complete_details(self, url: str, details: dict) -> dict:
+        details = dict(details)
+        details.setdefault("title", "")
+        details.setdefault("imageUrl", "")
+        details.setdefault("price", "")
+        details.setdefault("description", "")
+        if not details.get("category"):
+            # Earnkaro's scrape carries no category, so the marketplace's own
+            # override (e.g. nykaa.com → Beauty) still comes before URL keywords.
+            spec, host = self.platforms.lookup(url)
+            details["category"] = spec.category(host) or self._extract_category(url)
+        return details
+
     # ──────────────────────────────────────────────────────────────────────────
     # Product Detail Scraping (Main Entry Point)
     # ──────────────────────────────────────────────────────────────────────────
 
-    def scrape_product_details(self, url: str) -> dict:
+    async def scrape_product_details(self, url: str) -> dict:
         """
         Scrape title, image, price, description and category from a product URL.
 
         WHY og: meta tags are the PRIMARY source now:
         Sites like Myntra, Amazon, Ajio, Nykaa use React/JavaScript to render
-        the page in the browser. When our server makes a request with `requests`,
+        the page in the browser. When our server fetches the page with httpx,
         it gets the HTML BEFORE JavaScript runs — so all the product data that
         normally lives in JS-rendered divs is missing.
 
@@ -106,271 +404,171 @@ class EarnkaroConverter:
         These are ALWAYS in the initial HTML, no JavaScript needed.
         So we use them first, then fall back to platform-specific CSS selectors
         for price (since og: doesn't include price).
-        """
-        try:
-            response = requests.get(url, headers=self.headers, timeout=15)
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            # Step 1: Extract title, image, description from og: tags — works on ALL platforms
-            details = self._extract_og_tags(soup)
-
-            # Step 2: Extract price using platform-specific selectors
-            # WHY separately? Because og: tags never include price — price is
-            # always rendered dynamically or is in a specific element.
-            if "flipkart.com" in url:
-                details["price"] = self._get_price_flipkart(soup)
-                if not details.get("imageUrl"):
-                    details["imageUrl"] = self._get_image_flipkart(soup)
-                if not details.get("title"):
-                    details["title"] = self._get_title_flipkart(soup)
-            elif "amazon.in" in url or "amazon.com" in url:
-                details["price"] = self._get_price_amazon(soup)
-                if not details.get("imageUrl"):
-                    details["imageUrl"] = self._get_image_amazon(soup)
-            elif "myntra.com" in url:
-                details["price"] = self._get_price_myntra(soup)
-            elif "ajio.com" in url:
-                details["price"] = self._get_price_ajio(soup)
-            elif "nykaa.com" in url or "nykaafashion.com" in url:
-                # WHY both? nykaa.com is beauty, nykaafashion.com is fashion —
-                # same company, same bot protection, same handler works for both.
-                details["price"] = self._get_price_nykaa(soup)
-                details["category"] = "Beauty & Daily Needs" if "nykaa.com" in url else "Fashion"
-            elif "tatacliq.com" in url:
-                details["price"] = self._get_price_tatacliq(soup)
-            elif "snapdeal.com" in url:
-                details["price"] = self._get_price_snapdeal(soup)
-            elif "meesho.com" in url:
-                details["price"] = self._get_price_meesho(soup)
-                details["category"] = self._extract_category(url, soup)
-            else:
-                # Try Shopify JS price first (Libas, Rigo, many D2C brands use Shopify)
-                # WHY? Shopify embeds product JSON in a <script> tag with price_formatted
-                # which is always in the raw HTML — no JS execution needed.
-                details["price"] = self._get_price_shopify_js(soup) or self._get_price_generic(soup)
-
-            # Step 3: Fill category if not set
-            if not details.get("category"):
-                details["category"] = self._extract_category(url, soup)
-
-            # Step 4: Ensure all keys exist
-            details.setdefault("title", "")
-            details.setdefault("imageUrl", "")
-            details.setdefault("price", "")
-            details.setdefault("description", "")
-            details.setdefault("category", "General")
-
-            print(f"[SmartImport] Platform: {self._detect_platform(url)}")
-            print(f"[SmartImport] Title: {details['title'][:60] if details['title'] else 'NOT FOUND'}")
-            print(f"[SmartImport] Image: {'✓' if details['imageUrl'] else 'NOT FOUND'}")
-            print(f"[SmartImport] Price: {details['price'] or 'NOT FOUND'}")
-
-            return details
 
-        except Exception as e:
-            print(f"[SmartImport] Scraping error: {e}")
-            return {"title": "", "imageUrl": "", "price": "", "description": "", "category": "General"}
+        WHY stream the response?
+        The og: tags (and often a product:price meta tag or JSON-LD offer) are in
+        <head> — the first few KB of a 1–3 MB page. We read the page in chunks,
+        extract <head> with a cheap regex tokenizer, and stop downloading right
+        there unless the platform's body extractors are still needed (usually for
+        price). Only then is the full page parsed (see services/html_parsers.py).
 
-    # ──────────────────────────────────────────────────────────────────────────
-    # og: Meta Tag Extractor — Works across ALL platforms
-    # ──────────────────────────────────────────────────────────────────────────
-
-    def _extract_og_tags(self, soup) -> dict:
+        Every fetch goes through the host's HostGuard: it waits for one of the
+        host's adaptive concurrency slots, and is skipped outright while the
+        host's circuit is open.
         """
-        Extract Open Graph meta tags — the most reliable cross-platform method.
+        empty = {"title": "", "imageUrl": "", "price": "", "description": "", "category": "General"}
+        guard = self.hosts.get(self._host(url))
+        if not guard.allow():
+            logger.info("[SmartImport] Skipping direct scrape, circuit open for %s", guard.host)
+            return empty
+        try:
+            async with guard.slot():
+                details = await self._scrape(url)
+        except asyncio.CancelledError:
+            guard.cancelled()
+            raise
+        except Exception as e:
+            guard.failure(str(e) or type(e).__name__)
+            platform = _platform_label(self.platforms.lookup(url)[0])
+            UPSTREAM_ERRORS.labels("marketplace", platform, _error_reason(e)).inc()
+            logger.warning("[SmartImport] Scraping error: %s", e)
+            return empty
+        guard.success()
+        return details
+
+    def _host(self, url: str) -> str:
+        return bare_host(urlsplit(url).hostname or "")
+
+    async def _scrape(self, url: str) -> dict:
+        started = time.perf_counter()
+        async with self.client.stream("GET", url, headers=self.headers, timeout=15) as response:
+            if response.status_code in BLOCKED_STATUSES or response.status_code >= 500:
+                raise ScrapeBlocked(f"HTTP {response.status_code} from {response.url.host}")
+            # WHY the final URL? Short links (amzn.to, dl.flipkart.com) only
+            # reveal the marketplace after redirects.
+            spec, host = self.platforms.lookup(str(response.url))
+            platform = _platform_label(spec)
+            reader = HeadReader()
+            chunks = response.aiter_bytes()
+            head_complete = False
+            async for chunk in chunks:
+                if reader.feed(chunk):
+                    head_complete = True
+                    break
+            fetch_seconds = time.perf_counter() - started
+            encoding = response.encoding or "utf-8"
+            stage_started = time.perf_counter()
+            head = extract_head_meta(reader.head.decode(encoding, errors="replace"))
+            SCRAPE_STAGE_SECONDS.labels("og_extract", platform).since(stage_started)
+
+            if head_complete and not self._needs_body(spec, head):
+                self._record_fetch(platform, fetch_seconds)
+                head["category"] = spec.category(host)
+                return self._finish_details(url, spec, head)
+
+            # Price (or a title/image fallback) lives in <body> — keep reading.
+            stage_started = time.perf_counter()
+            async for chunk in chunks:
+                reader.buffer += chunk
+                if len(reader.buffer) >= MAX_PAGE_BYTES:
+                    break
+            content = bytes(reader.buffer)
+            # Fetch time covers the head and the rest of the body (not the head parse between them).
+            self._record_fetch(platform, fetch_seconds + time.perf_counter() - stage_started)
+
+        # WHY a thread? Parsing a 1–3 MB page is pure CPU —
+        # on the event loop it would stall every other request meanwhile.
+        # Timed inside the thread, but observed here: metrics are only updated
+        # from the event loop (see services/metrics.py).
+        timings = {}
+        details = await asyncio.to_thread(self._extract_details, url, spec, host, content, head, timings)
+        for stage, seconds in timings.items():
+            SCRAPE_STAGE_SECONDS.labels(stage, platform).observe(seconds)
+        return details
+
+    @staticmethod
+    def _record_fetch(platform: str, elapsed: float):
+        UPSTREAM_SECONDS.labels("marketplace", platform).observe(elapsed)
+        SCRAPE_STAGE_SECONDS.labels("fetch", platform).observe(elapsed)
+
+    def _needs_body(self, spec: PlatformSpec, head: dict) -> bool:
+        """Whether the platform extractors must look at <body> to fill what <head> lacked."""
+        if not head.get("price"):
+            return True
+        return any(not head.get(field) for field in spec.body_fields)
+
+    def _extract_details(self, url: str, spec: PlatformSpec, host: str, content: bytes, head: dict,
+                         timings: Optional[dict] = None) -> dict:
+        """Parse a downloaded product page into the details dict, noting stage seconds in `timings`."""
+        try:
+            # Step 1: Title, image, description from og: tags — works on ALL platforms.
+            # <head> was already tokenized while streaming; only re-read the og:
+            # tags from the parsed page if that found nothing (e.g. unusual markup).
+            details = dict(head)
+            need_og = not (details.get("title") or details.get("imageUrl"))
+            plan = spec.plan_with_og if need_og else spec.plan
+            started = time.perf_counter()
+            found = self.parser.extract(content, plan, timings)
+            if timings is not None:
+                timings["price_extract"] = time.perf_counter() - started - timings.get("parse", 0.0)
+            if need_og:
+                details["title"] = found["og_title"]
+                details["imageUrl"] = found["og_image"]
+                details["description"] = found["og_description"][:200]
+
+            # Step 2: Price from platform-specific selectors.
+            # WHY separately? Because og: tags never include price — price is
+            # always rendered dynamically or is in a specific element. A structured
+            # price from <head> (product:price meta / JSON-LD) beats both, though.
+            details["price"] = head.get("price") or found["price"]
 
-        WHY og: tags are reliable:
-        - Embedded in the initial HTML response (no JS needed)
-        - Standardised format across all e-commerce platforms
-        - Used for social sharing previews (WhatsApp, Twitter, Facebook)
-        - Always contain high-quality product image and accurate title
-        """
-        def _og(prop):
-            tag = soup.find("meta", property=prop)
-            if tag:
-                return tag.get("content", "").strip()
-            return ""
-
-        def _meta_name(name):
-            tag = soup.find("meta", attrs={"name": name})
-            if tag:
-                return tag.get("content", "").strip()
-            return ""
-
-        title = _og("og:title") or _meta_name("title") or ""
-        image = _og("og:image") or ""
-        description = _og("og:description") or _meta_name("description") or ""
-
-        # WHY truncate description to 200 chars?
-        # og:description can be very long. The frontend only shows a short preview.
-        return {
-            "title": title,
-            "imageUrl": image,
-            "description": description[:200] if description else "",
-            "price": "",
-            "category": "",
-        }
+            # Some platforms (Flipkart, Amazon) also have body selectors for
+            # title/image, used when og: tags are missing.
+            for key in ("title", "imageUrl"):
+                if not details.get(key) and found.get(key):
+                    details[key] = found[key]
 
-    def _detect_platform(self, url: str) -> str:
-        platforms = ["flipkart", "amazon", "myntra", "ajio", "nykaa", "tatacliq", "snapdeal", "meesho"]
-        for p in platforms:
-            if p in url:
-                return p.capitalize()
-        return "Unknown"
+            if spec.category(host):
+                details["category"] = spec.category(host)
 
-    # ──────────────────────────────────────────────────────────────────────────
-    # Price Extractors — Per Platform
-    # WHY per-platform? Each site uses different HTML structure for prices.
-    # We try specific known selectors first, then fall back to regex.
-    # ──────────────────────────────────────────────────────────────────────────
+            return self._finish_details(url, spec, details)
 
-    def _get_price_shopify_js(self, soup) -> str:
-        """
-        WHY Shopify JS extraction?
-        Shopify stores (Libas, Rigo, many Indian D2C brands) embed product data
-        in a <script> tag as a JS variable with price_formatted containing the rupee price.
-        This is in the raw HTML (not JS-rendered), so we can extract it with regex.
-        """
-        scripts = soup.find_all("script")
-        pattern = re.compile(r'price_formatted:\s*`(₹[\d,]+)`')
-        for script in scripts:
-            if script.string:
-                match = pattern.search(script.string)
-                if match:
-                    return match.group(1)
-        return ""
-
-    def _get_price_generic(self, soup) -> str:
-        """
-        WHY regex as fallback?
-        For unknown platforms, we scan ALL visible text for ₹ followed by digits.
+        except Exception as e:
+            logger.warning("[SmartImport] Scraping error: %s", e)
+            return {"title": "", "imageUrl": "", "price": "", "description": "", "category": "General"}
 
-        WHY the short-text filter?
-        A real price like "₹1,449" is short (≤ 10 chars).
-        Promo text like "Get 30% OFF on orders ₹999!" is long — we skip those
-        by checking the full surrounding text node length (≤ 25 chars).
-        """
-        price_pattern = re.compile(r"₹[\d,]+")
-        for text_node in soup.find_all(text=price_pattern):
-            cleaned = text_node.strip()
-            # Skip if the text node is a long promo sentence
-            if len(cleaned) <= 25:
-                match = price_pattern.search(cleaned)
-                if match:
-                    return match.group(0)
-        return ""
-
-    def _get_price_flipkart(self, soup) -> str:
-        # WHY multiple selectors? Flipkart regularly changes their CSS class names.
-        # We try the most recent known classes first, then fall back.
-        selectors = [
-            ("div", {"class": "Nx9bqj"}),
-            ("div", {"class": "CxhGGd"}),
-            ("div", {"class": "_30jeq3"}),
-            ("div", {"class": "_25b18c"}),
-        ]
-        for tag, attrs in selectors:
-            el = soup.find(tag, attrs)
-            if el and "₹" in el.text:
-                return el.text.strip()
-        return self._get_price_generic(soup)
-
-    def _get_title_flipkart(self, soup) -> str:
-        selectors = [
-            ("span", {"class": "VU-ZEz"}),
-            ("span", {"class": "B_NuCI"}),
-            ("h1", {"class": "yhB1nd"}),
-        ]
-        for tag, attrs in selectors:
-            el = soup.find(tag, attrs)
-            if el and el.text.strip():
-                return el.text.strip()
-        return ""
-
-    def _get_image_flipkart(self, soup) -> str:
-        selectors = [
-            ("img", {"class": "_53J4C-"}),
-            ("img", {"class": "_396cs4"}),
-            ("img", {"class": "q6DClP"}),
-        ]
-        for tag, attrs in selectors:
-            el = soup.find(tag, attrs)
-            if el:
-                src = el.get("src") or el.get("data-src", "")
-                if src:
-                    return src
-        return ""
-
-    def _get_price_amazon(self, soup) -> str:
-        # WHY "a-price-whole"? Amazon splits price into whole + decimal parts.
-        # We use the whole part as an approximation.
-        el = soup.find("span", {"class": "a-price-whole"})
-        if el:
-            return f"₹{el.text.strip()}"
-        return self._get_price_generic(soup)
-
-    def _get_image_amazon(self, soup) -> str:
-        el = soup.find("img", {"id": "landingImage"}) or soup.find("img", {"class": "a-dynamic-image"})
-        return el.get("src", "") if el else ""
-
-    def _get_price_myntra(self, soup) -> str:
-        selectors = [
-            ("span", {"class": "pdp-price"}),
-            ("strong", {"class": "pdp-price"}),
-            ("div", {"class": "pdp-price"}),
-        ]
-        for tag, attrs in selectors:
-            el = soup.find(tag, attrs)
-            if el and el.text.strip():
-                return el.text.strip()
-        return self._get_price_generic(soup)
-
-    def _get_price_ajio(self, soup) -> str:
-        el = soup.find("span", {"class": "prod-sp"}) or soup.find("div", {"class": "prod-sp"})
-        if el:
-            return el.text.strip()
-        return self._get_price_generic(soup)
-
-    def _get_price_nykaa(self, soup) -> str:
-        selectors = [
-            ("span", {"class": "css-1jczs19"}),
-            ("span", {"class": "post-card__content-price-offer"}),
-        ]
-        for tag, attrs in selectors:
-            el = soup.find(tag, attrs)
-            if el and el.text.strip():
-                return el.text.strip()
-        return self._get_price_generic(soup)
-
-    def _get_price_tatacliq(self, soup) -> str:
-        el = soup.find("h3", {"class": "ProductDetailsMainCard__price"})
-        if el:
-            return el.text.strip()
-        return self._get_price_generic(soup)
-
-    def _get_price_snapdeal(self, soup) -> str:
-        el = soup.find("span", {"itemprop": "price"}) or soup.find("span", {"class": "payBlkBig"})
-        if el:
-            return f"₹{el.text.strip()}"
-        return self._get_price_generic(soup)
-
-    def _get_price_meesho(self, soup) -> str:
-        # WHY h5 tag? Meesho uses h5 with specific structure for price display.
-        selectors = [
-            ("h5", {}),
-            ("span", {"class": re.compile(r".*price.*", re.I)}),
-        ]
-        for tag, attrs in selectors:
-            el = soup.find(tag, attrs)
-            if el and "₹" in el.text:
-                return el.text.strip()
-        return self._get_price_generic(soup)
+    def _finish_details(self, url: str, spec: PlatformSpec, details: dict) -> dict:
+        # Step 3: Fill category if not set
+        if not details.get("category"):
+            details["category"] = self._extract_category(url)
+
+        # Step 4: Ensure all keys exist
+        details.setdefault("title", "")
+        details.setdefault("imageUrl", "")
+        details.setdefault("price", "")
+        details.setdefault("description", "")
+        details.setdefault("category", "General")
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "[SmartImport] %s: title=%s image=%s price=%s",
+                spec.label, "found" if details["title"] else "NOT FOUND",
+                "found" if details["imageUrl"] else "NOT FOUND", details["price"] or "NOT FOUND",
+                extra={
+                    "platform": _platform_label(spec),
+                    "title": details["title"][:60],
+                    "has_image": bool(details["imageUrl"]),
+                    "price": details["price"],
+                },
+            )
+
+        return details
 
     # ──────────────────────────────────────────────────────────────────────────
     # Category Extractor
     # ──────────────────────────────────────────────────────────────────────────
 
-    def _extract_category(self, url: str, soup) -> str:
+    def _extract_category(self, url: str) -> str:
         """
         WHY keyword matching on URL?
         Category is rarely in og: tags or easy to scrape. But product URLs almost
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Per-host circuit breaker + adaptive concurrency
+#
+# WHY? When a marketplace starts answering with Cloudflare challenges or simply
+# stops responding, every Smart Import kept paying the full 15s scrape timeout
+# before falling back to Earnkaro's scrape. Per host we now keep:
+#   - a circuit breaker: after `failure_threshold` consecutive failures the host
+#     is "open" for `cool_off` seconds and imports go straight to Earnkaro's
+#     scrape; then one probe request is let through ("half_open") and its
+#     outcome closes or re-opens the circuit
+#   - an AIMD concurrency limit (like TCP congestion control): every success
+#     raises the limit by 1/limit (≈ +1 per full window), every failure halves
+#     it, so a struggling host gets fewer parallel fetches automatically
+# ──────────────────────────────────────────────────────────────────────────────
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class HostGuard:
+    """Breaker state and concurrency limit for one host."""
+
+    def __init__(self, host: str, failure_threshold: int = 5, cool_off: float = 300.0,
+                 min_limit: int = 1, max_limit: int = 8, initial_limit: int = 2):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cool_off = cool_off
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(initial_limit)
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.in_flight = 0
+        self._probing = False
+        self._cond = asyncio.Condition()
+
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_error = ""
+
+    # ── Breaker ──────────────────────────────────────────────────────────────
+
+    def is_open(self) -> bool:
+        """True if a request to this host would be rejected right now (no side effects)."""
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at < self.cool_off
+        return self.state == HALF_OPEN and self._probing
+
+    def allow(self) -> bool:
+        """Whether to send a request now. After the cool-off, lets exactly one probe through."""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cool_off:
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def success(self):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self._probing = False
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def failure(self, error: str = ""):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        self.limit = max(self.min_limit, self.limit / 2)
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def cancelled(self):
+        """A cancelled request says nothing about the host — just free the probe."""
+        self._probing = False
+
+    # ── Concurrency ──────────────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the host's `int(limit)` concurrent request slots."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def to_dict(self) -> dict:
+        state = self.state
+        retry_in = 0.0
+        if state == OPEN:
+            retry_in = max(0.0, self.cool_off - (time.monotonic() - self.opened_at))
+            if retry_in == 0:
+                state = HALF_OPEN  # the next request will be the probe
+        return {
+            "host": self.host,
+            "state": state,
+            "retry_in": round(retry_in, 1),
+            "concurrency_limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+        }
+
+
+class HostGuards:
+    """HostGuard per host, created on first use with shared settings."""
+
+    def __init__(self, failure_threshold: int = 5, cool_off: float = 300.0,
+                 min_limit: int = 1, max_limit: int = 8, initial_limit: int = 2):
+        self.settings = dict(
+            failure_threshold=failure_threshold,
+            cool_off=cool_off,
+            min_limit=min_limit,
+            max_limit=max_limit,
+            initial_limit=initial_limit,
+        )
+        self._guards: Dict[str, HostGuard] = {}
+
+    def get(self, host: str) -> HostGuard:
+        guard = self._guards.get(host)
+        if guard is None:
+            guard = self._guards[host] = HostGuard(host, **self.settings)
+        return guard
+
+    def snapshot(self) -> dict:
+        return {
+            "settings": self.settings,
+            "hosts": sorted((g.to_dict() for g in self._guards.values()), key=lambda g: g["host"]),
+        }
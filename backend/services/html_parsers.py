@@ -0,0 +1,216 @@
+import re
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+try:
+    import lxml.html
+except ImportError:  # lxml is optional — BeautifulSoup is the fallback
+    lxml = None
+
+# ──────────────────────────────────────────────────────────────────────────────
+# HTML Parser Backends
+#
+# WHY a parser abstraction?
+# The price extractors used to call soup.find() once per selector on an
+# html.parser tree — a pure-Python parse plus a full tree walk per selector, and
+# _get_price_generic walks every text node again. Here each platform's selector
+# lists are compiled ONCE into an ExtractionPlan, and a backend evaluates the
+# whole plan:
+#   - LxmlBackend: C parser, then ONE pass over the tree that checks every
+#     selector, the Shopify script regex and the generic ₹ text scan together
+#   - SoupBackend: the original BeautifulSoup/html.parser behaviour, kept as a
+#     compatibility fallback (and used when lxml isn't installed)
+# ──────────────────────────────────────────────────────────────────────────────
+
+PRICE_TEXT = re.compile(r"₹[\d,]+")
+SHOPIFY_PRICE = re.compile(r'price_formatted:\s*`(₹[\d,]+)`')
+
+AttrValue = Union[str, "re.Pattern"]
+
+
+class Rule(NamedTuple):
+    """
+    One selector: the first <tag> whose attributes match `attrs`.
+
+    `attrs` values are exact strings (for "class": one of the element's class
+    names) or compiled regexes. The value is the element's text, or the first
+    non-empty attribute in `read` (e.g. ("src", "data-src")). It only counts if
+    it's non-empty and contains `require`; `prefix` is prepended (Amazon's
+    a-price-whole has no ₹ sign).
+    """
+    tag: str
+    attrs: Dict[str, AttrValue] = {}
+    read: Tuple[str, ...] = ()
+    require: str = ""
+    prefix: str = ""
+
+
+class ExtractionPlan:
+    """
+    A compiled set of fields to extract from one page.
+
+    `fields` maps an output key to its rules in priority order: like the old
+    soup.find() chains, only the FIRST element matching a rule is considered,
+    and if its value doesn't qualify the next rule is tried.
+    `price_fallbacks` are tried in order when no "price" rule matched:
+    "shopify" (price_formatted in a <script>) and/or "generic" (short ₹ text).
+    """
+
+    def __init__(self, fields: Dict[str, List[Rule]], price_fallbacks: Tuple[str, ...] = ("generic",)):
+        self.fields = fields
+        self.price_fallbacks = price_fallbacks
+        # tag → [(field, rule index, rule)] so one tree pass can test every rule cheaply
+        self.by_tag: Dict[str, List[Tuple[str, int, Rule]]] = {}
+        for field, rules in fields.items():
+            for i, rule in enumerate(rules):
+                self.by_tag.setdefault(rule.tag, []).append((field, i, rule))
+        self.wants_scripts = "shopify" in price_fallbacks
+        self.wants_text = "generic" in price_fallbacks
+
+
+def _attr_matches(expected: AttrValue, actual: Optional[str], is_class: bool) -> bool:
+    if actual is None:
+        return False
+    candidates = actual.split() if is_class else [actual]
+    if isinstance(expected, str):
+        return expected in candidates
+    return any(expected.search(c) for c in candidates) or bool(expected.search(actual))
+
+
+def _qualify(rule: Rule, value: Optional[str]) -> str:
+    value = (value or "").strip()
+    if not value or (rule.require and rule.require not in value):
+        return ""
+    return rule.prefix + value
+
+
+def _generic_price(text: str) -> str:
+    # WHY the short-text filter? A real price like "₹1,449" is short; promo text
+    # like "Get 30% OFF on orders ₹999!" is long — skip text nodes over 25 chars.
+    cleaned = text.strip()
+    if len(cleaned) <= 25:
+        match = PRICE_TEXT.search(cleaned)
+        if match:
+            return match.group(0)
+    return ""
+
+
+def _resolve(plan: ExtractionPlan, first: Dict[Tuple[str, int], str], fallbacks: Dict[str, Callable[[], str]]) -> dict:
+    """Pick each field's value from the first-match table, in rule priority order."""
+    result = {}
+    for field, rules in plan.fields.items():
+        result[field] = next((first[(field, i)] for i in range(len(rules)) if first.get((field, i))), "")
+    if not result.get("price"):
+        result["price"] = next((v for v in (fallbacks[f]() for f in plan.price_fallbacks) if v), "")
+    return result
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def extract(self, content: bytes, plan: ExtractionPlan, timings: Optional[dict] = None) -> dict:
+        # WHY decode first? Given bytes without a <meta charset>, libxml2 assumes
+        # Latin-1 and "₹" turns into mojibake. Nearly every store serves UTF-8;
+        # anything else is left to libxml2's own charset sniffing.
+        try:
+            content = content.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+        started = time.perf_counter()
+        root = lxml.html.document_fromstring(content)
+        if timings is not None:
+            timings["parse"] = time.perf_counter() - started
+        first: Dict[Tuple[str, int], str] = {}
+        settled = set()  # fields whose top-priority rule already produced a value
+        shopify = ""
+        generic = ""
+
+        for el in root.iter():
+            tag = el.tag
+            if not isinstance(tag, str):  # comments / processing instructions
+                continue
+
+            for field, i, rule in plan.by_tag.get(tag, ()):
+                if (field, i) in first:
+                    continue
+                if all(_attr_matches(v, el.get(k), k == "class") for k, v in rule.attrs.items()):
+                    if rule.read:
+                        raw = next((el.get(a) for a in rule.read if el.get(a)), "")
+                    else:
+                        raw = el.text_content()
+                    first[(field, i)] = _qualify(rule, raw)
+                    if i == 0 and first[(field, i)]:
+                        settled.add(field)
+
+            # Every field is answered by its best rule — the rest of the tree can't change anything.
+            if len(settled) == len(plan.fields) and "price" in settled:
+                break
+
+            if plan.wants_scripts and not shopify and tag == "script" and el.text:
+                match = SHOPIFY_PRICE.search(el.text)
+                if match:
+                    shopify = match.group(1)
+            if plan.wants_text and not generic:
+                for text in (el.text, el.tail):
+                    if text and "₹" in text:
+                        generic = _generic_price(text)
+                        if generic:
+                            break
+
+        return _resolve(plan, first, {"shopify": lambda: shopify, "generic": lambda: generic})
+
+
+class SoupBackend:
+    name = "soup"
+
+    def extract(self, content: bytes, plan: ExtractionPlan, timings: Optional[dict] = None) -> dict:
+        # Imported on first use: bs4 costs ~90 ms of import time and is only
+        # needed when lxml isn't installed (or HTML_PARSER=soup).
+        from bs4 import BeautifulSoup
+
+        started = time.perf_counter()
+        soup = BeautifulSoup(content, "html.parser")
+        if timings is not None:
+            timings["parse"] = time.perf_counter() - started
+        first: Dict[Tuple[str, int], str] = {}
+        for field, rules in plan.fields.items():
+            for i, rule in enumerate(rules):
+                el = soup.find(rule.tag, rule.attrs)
+                if el is None:
+                    continue
+                raw = next((el.get(a) for a in rule.read if el.get(a)), "") if rule.read else el.text
+                first[(field, i)] = _qualify(rule, raw)
+                if first[(field, i)]:
+                    break
+
+        def shopify():
+            for script in soup.find_all("script"):
+                if script.string:
+                    match = SHOPIFY_PRICE.search(script.string)
+                    if match:
+                        return match.group(1)
+            return ""
+
+        def generic():
+            for text_node in soup.find_all(string=PRICE_TEXT):
+                price = _generic_price(text_node)
+                if price:
+                    return price
+            return ""
+
+        # Fallbacks only walk the tree again if no price selector matched.
+        return _resolve(plan, first, {"shopify": shopify, "generic": generic})
+
+
+def make_parser(kind: str = "auto"):
+    """
+    kind: "auto" (lxml if installed, else BeautifulSoup), "lxml" or "soup".
+    """
+    kind = (kind or "auto").lower()
+    if kind == "soup" or (kind == "auto" and lxml is None):
+        return SoupBackend()
+    if lxml is None:
+        raise RuntimeError("HTML_PARSER=lxml requires the 'lxml' package")
+    if kind in ("auto", "lxml"):
+        return LxmlBackend()
+    raise ValueError(f"Unknown HTML parser '{kind}' (expected auto, lxml or soup)")
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import re
+from typing import Callable, Dict, List, Optional
+
+from services.amazon_client import AsyncAmazonClient
+from services.cache import TTLCache
+from services.products import AmazonProduct, parse_item, to_item
+
+logger = logging.getLogger(__name__)
+
+ASIN_PATTERN = re.compile(r"^[A-Z0-9]{10}$")
+
+# Creators API GetItems accepts at most this many ASINs per call.
+GET_ITEMS_MAX_ASINS = 10
+
+# Cached under an ASIN's key when GetItems says it doesn't exist.
+NOT_FOUND = False
+
+
+def _is_items_not_found(error: Exception) -> bool:
+    # The SDK is imported lazily (main._make_amazon_api); a GetItems call has
+    # already loaded it by the time one fails, so this import costs nothing.
+    try:
+        from amazon_creatorsapi.errors import ItemsNotFoundError
+    except ImportError:
+        return False
+    return isinstance(error, ItemsNotFoundError)
+
+
+class ItemLookup:
+    """
+    Product lookups by ASIN, backed by a per-ASIN cache.
+
+    WHY? Re-pricing products editors already saved meant running a keyword
+    search per product, even though we know their ASINs. Here:
+      - every ASIN is cached on its own (the `to_item` dict), and searches
+        call `remember()` so anything seen in a listing is a cheap lookup later
+      - only the misses go upstream, as GetItems calls of up to 10 ASINs each,
+        all chunks running concurrently (AsyncAmazonClient still bounds how
+        many actually hit the API at once)
+      - ASINs GetItems doesn't know are remembered as not found for
+        `not_found_ttl` seconds, so a stale saved ASIN isn't re-asked every time
+    """
+
+    def __init__(self, client: AsyncAmazonClient, cache: TTLCache,
+                 parse: Callable[[object], AmazonProduct] = parse_item,
+                 on_parsed: Optional[Callable[[List[AmazonProduct]], None]] = None,
+                 not_found_ttl: float = 600.0):
+        self.client = client
+        self.cache = cache
+        self.not_found_ttl = not_found_ttl
+        self.parse = parse
+        # Called with every batch of parsed items (e.g. to index them for local search).
+        self.on_parsed = on_parsed
+
+    @staticmethod
+    def _key(asin: str) -> str:
+        return f"asin:{asin}"
+
+    def remember(self, products: List[AmazonProduct]):
+        """Cache parsed items (e.g. from a search) under their ASINs, and pass them to `on_parsed`."""
+        # One batched write per search, off the event loop for shared backends.
+        self.cache.set_many_in_background(
+            {self._key(product.asin): to_item(product) for product in products if product.asin}
+        )
+        if self.on_parsed is not None and products:
+            self.on_parsed(products)
+
+    def parse_items(self, items) -> List[AmazonProduct]:
+        """Parse Creators API items, caching each; unparseable items are logged and skipped."""
+        products = []
+        for item in items or ():
+            try:
+                products.append(self.parse(item))
+            except Exception as e:
+                logger.error("Error parsing item: %s", e)
+        self.remember(products)
+        return products
+
+    async def lookup(self, asins: List[str], refresh: bool = False) -> dict:
+        """
+        Look up `asins` (order kept, duplicates dropped).
+
+        Returns {"items": {asin: product}, "not_found": [...], "invalid": [...],
+        "failed": [...], "cached": n, "fetched": n}. ASINs whose GetItems chunk
+        failed end up in "failed" rather than failing the whole lookup.
+        """
+        wanted, invalid = [], []
+        for raw in asins:
+            asin = raw.strip().upper()
+            if not ASIN_PATTERN.match(asin):
+                invalid.append(raw)
+            elif asin not in wanted:
+                wanted.append(asin)
+
+        found: Dict[str, dict] = {}
+        known_missing = []
+        if not refresh:
+            cached_items = await self.cache.aget_many(self._key(asin) for asin in wanted)
+            for asin in wanted:
+                item = cached_items.get(self._key(asin))
+                if item is NOT_FOUND:
+                    known_missing.append(asin)
+                elif item is not None:
+                    found[asin] = item
+        misses = [asin for asin in wanted if asin not in found and asin not in known_missing]
+        cached = len(found)
+
+        chunks = [misses[i:i + GET_ITEMS_MAX_ASINS] for i in range(0, len(misses), GET_ITEMS_MAX_ASINS)]
+        results = await asyncio.gather(*(self._fetch(chunk) for chunk in chunks), return_exceptions=True)
+
+        failed = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.error("GetItems failed for %s: %s", chunk, result)
+                failed.extend(chunk)
+                continue
+            for product in result:
+                found[product.asin] = to_item(product)
+
+        not_found = [a for a in misses if a not in found and a not in failed]
+        if not_found and self.not_found_ttl > 0:
+            await self.cache.aset_many({self._key(a): NOT_FOUND for a in not_found}, ttl=self.not_found_ttl)
+
+        return {
+            "items": {asin: found[asin] for asin in wanted if asin in found},
+            "not_found": [a for a in wanted if a in known_missing or a in not_found],
+            "invalid": invalid,
+            "failed": failed,
+            "cached": cached,
+            "fetched": len(found) - cached,
+        }
+
+    async def _fetch(self, chunk: List[str]) -> List[AmazonProduct]:
+        try:
+            items = await self.client.get_items(chunk)
+        except Exception as e:
+            # The SDK raises instead of returning nothing when none of the
+            # chunk's ASINs exist — that's "not found", not a failed call.
+            if _is_items_not_found(e):
+                return []
+            raise
+        return self.parse_items(items)
@@ -0,0 +1,216 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional — stdlib json is just slower
+    orjson = None
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Structured, non-blocking logging
+#
+# WHY? Smart Import printed four lines per import (plus Earnkaro's whole
+# response), and every log call formatted its f-string even when the level was
+# off — all as synchronous stdout writes on the event loop. Now:
+#   - loggers hand records to a queue; one listener thread does the JSON
+#     encoding and the stdout write, so a slow pipe never stalls a request
+#     (the message and traceback are rendered before the record is queued,
+#     while its args and exception still describe the moment of the call)
+#   - messages use %-style args, interpolated only if a record is emitted
+#   - every request gets an id (the caller's X-Request-ID, or a new one) that's
+#     attached to every log line it causes and echoed in the response headers
+#   - INFO/DEBUG lines of successful requests are sampled per route (e.g. 1%
+#     of /api/suggest); warnings, errors, 5xx and slow requests always log
+# ──────────────────────────────────────────────────────────────────────────────
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="")
+# Whether this request's INFO/DEBUG lines are kept (decided once per request).
+sampled_var: ContextVar[bool] = ContextVar("log_sampled", default=True)
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# LogRecord attributes that aren't user-supplied `extra=` fields.
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+access_logger = logging.getLogger("access")
+# Renders tracebacks on the logging thread (see _EagerMessageQueueHandler).
+_TRACEBACKS = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, request_id, any `extra=` fields, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", ""):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if orjson is not None:
+            return orjson.dumps(entry, default=str).decode("utf-8")
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the request id on records and drops INFO/DEBUG of unsampled requests."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return record.levelno >= logging.WARNING or sampled_var.get()
+
+
+class _EagerMessageQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now: the args may be mutable objects
+        # the caller changes right after logging, and the exception's frames and
+        # state belong to this thread. Unlike the stock prepare(), this keeps
+        # them as separate fields (and the `extra=` ones) for the JSON output.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACKS.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RouteSampler:
+    """
+    Per-route sampling rates for success logs, matched by longest path prefix.
+
+    `rates`: {"/api/suggest": 0.01, "/metrics": 0}; unlisted paths use `default`.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, default: float = 1.0):
+        self.default = default
+        self.rates = sorted((rates or {}).items(), key=lambda kv: len(kv[0]), reverse=True)
+
+    @classmethod
+    def from_env(cls, spec: str, default: float = 1.0) -> "RouteSampler":
+        """Parse "/api/suggest=0.01,/metrics=0"."""
+        rates = {}
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            path, _, rate = part.partition("=")
+            rates[path.strip()] = float(rate)
+        return cls(rates, default)
+
+    def rate(self, path: str) -> float:
+        for prefix, rate in self.rates:
+            if path.startswith(prefix):
+                return rate
+        return self.default
+
+    def keep(self, path: str) -> bool:
+        rate = self.rate(path)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware: request id, sampling decision and one access log line per request.
+
+    The access line is INFO for successes (so it follows the request's sampling)
+    and WARNING for 5xx responses and requests slower than `slow_ms`.
+    """
+
+    def __init__(self, app, sampler: RouteSampler = None, slow_ms: float = 1000.0):
+        self.app = app
+        self.sampler = sampler or RouteSampler()
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = ""
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        request_id = incoming if _REQUEST_ID.match(incoming) else uuid.uuid4().hex[:16]
+        id_token = request_id_var.set(request_id)
+        sampled_token = sampled_var.set(self.sampler.keep(scope["path"]))
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            level = logging.WARNING if status >= 500 or duration_ms >= self.slow_ms else logging.INFO
+            if access_logger.isEnabledFor(level):
+                access_logger.log(
+                    level, "%s %s %s", scope["method"], scope["path"], status,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": getattr(scope.get("route"), "path", ""),
+                        "status": status,
+                        "duration_ms": round(duration_ms, 2),
+                    },
+                )
+            request_id_var.reset(id_token)
+            sampled_var.reset(sampled_token)
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json") -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue to one stdout writer thread.
+
+    `fmt`: "json" (default) or "text" for local development. Returns the
+    started listener; stop() it at shutdown to flush what's queued.
+    """
+    output = logging.StreamHandler()
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _EagerMessageQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+
+    # uvicorn's error log goes through the same queue; its access log is
+    # replaced by RequestContextMiddleware's (which has ids and sampling).
+    for name in ("uvicorn", "uvicorn.error"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    logging.getLogger("uvicorn.access").disabled = True
+    # httpx logs every request at INFO — that's the scraper's hot path.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    listener.start()
+    return listener
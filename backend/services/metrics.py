@@ -0,0 +1,237 @@
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Prometheus metrics
+#
+# WHY not prometheus_client? Its metrics take a lock on every observation, and
+# we record on every request, upstream call and scrape stage. These are kept
+# deliberately cheap enough to leave on in production:
+#   - a labelled child is created once and then found with one dict lookup
+#   - a histogram's bucket counts are preallocated; observe() is a bisect and
+#     two additions, no lock and no allocation
+#   - cache and queue numbers aren't tracked twice: collectors read the stats
+#     the components already keep, only when /metrics is scraped
+# Observations come from the event loop thread (scrape parsing is timed around
+# its worker thread, not inside it), so unlocked updates don't race.
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Seconds: from in-memory cache hits (~1 ms) up to Smart Import's 20 s deadline.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def since(self, started: float):
+        """Observe the seconds elapsed since `started` (a time.perf_counter() value)."""
+        self.observe(time.perf_counter() - started)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, child in list(self._children.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}")
+            labels = _labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_number(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Collected(_Metric):
+    """A gauge or counter whose samples come from `collect()` at scrape time."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Sequence[str], float]]], kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, value in self.collect():
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {_number(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def collected(self, name: str, documentation: str, labelnames: Sequence[str],
+                  collect: Callable[[], Iterable[Tuple[Sequence[str], float]]], kind: str = "gauge") -> Collected:
+        return self.register(Collected(name, documentation, labelnames, collect, kind))
+
+    def render(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ── Metrics recorded across the services ────────────────────────────────────
+
+# upstream: "creators_api" | "earnkaro" | "marketplace"; target: the API
+# operation, or the marketplace's platform key ("other" for unknown stores,
+# which keeps the label set bounded however many stores users paste).
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "Latency of calls to upstream services.", ("upstream", "target"),
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "upstream_errors_total", "Failed calls to upstream services.", ("upstream", "target", "reason"),
+)
+
+# stage: "fetch" (request until <head> — or the whole page — is read),
+# "og_extract" (og:/product: tags and JSON-LD from the streamed <head>),
+# "parse" (building the DOM of the page body) and "price_extract" (the one
+# walk over it evaluating the platform's price/title/image selectors, the og:
+# fallback and the ₹ text fallbacks). Pages whose <head> has everything stop
+# after og_extract, so parse/price_extract only count pages that needed them.
+SCRAPE_STAGE_SECONDS = REGISTRY.histogram(
+    "scrape_stage_duration_seconds", "Time spent in each stage of a product page scrape.", ("stage", "platform"),
+)
+
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency by route (until the last body byte is sent).",
+    ("method", "route", "status"),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request into HTTP_SECONDS.
+
+    WHY raw ASGI instead of @app.middleware("http")? The latter wraps every
+    response in an extra task and stream; this only wraps `send`. Routes are
+    labelled by their template ("/api/deals/{category}"), so the label set stays
+    bounded; unmatched paths (404s, scanners) share "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_and_record(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_SECONDS.labels(scope["method"], route, f"{status // 100}xx").since(started)
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from services.html_parsers import ExtractionPlan, Rule
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLATFORMS_FILE = os.path.join(os.path.dirname(__file__), "platforms.json")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Platform Registry
+#
+# WHY a data file instead of code?
+# Each marketplace used to be a branch in an `if "flipkart.com" in url ... elif`
+# chain, repeated for price, title/image fallbacks, category overrides and the
+# bot-protection list. Now one spec per marketplace lives in platforms.json:
+#   - specs are compiled into ExtractionPlans once per load, not per request
+#   - dispatch is a dict lookup on the URL's hostname (walking up its domain
+#     suffixes, so www./m./dl. subdomains match too)
+#   - adding a marketplace, or swapping Flipkart's rotated CSS classes, is an
+#     edit to the JSON file — it's picked up on the next lookup after the file's
+#     mtime changes, or immediately via POST /api/platforms/reload
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+class PlatformSpec:
+    """One marketplace's compiled extraction spec."""
+
+    def __init__(self, key: str, label: str, hosts: Tuple[str, ...], plan: ExtractionPlan,
+                 plan_with_og: ExtractionPlan, categories: Dict[str, str], bot_protected: bool):
+        self.key = key
+        self.label = label
+        self.hosts = hosts
+        self.plan = plan
+        self.plan_with_og = plan_with_og
+        self.categories = categories
+        self.bot_protected = bot_protected
+        # Fields besides price that the body selectors can fill (e.g. Flipkart title/image).
+        self.body_fields = tuple(f for f in plan.fields if f != "price")
+
+    def category(self, host: str) -> str:
+        """Category implied by the marketplace itself, or "" to fall back to URL keywords."""
+        if "*" in self.categories:
+            return self.categories["*"]
+        return self.categories.get(host, "")
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "label": self.label,
+            "hosts": list(self.hosts),
+            "bot_protected": self.bot_protected,
+            "fields": {field: len(rules) for field, rules in self.plan.fields.items()},
+            "price_fallbacks": list(self.plan.price_fallbacks),
+        }
+
+
+def _compile_rule(raw: dict) -> Rule:
+    attrs = {}
+    for name, value in raw.get("attrs", {}).items():
+        if isinstance(value, dict):
+            value = re.compile(value["regex"], re.I if value.get("ignorecase") else 0)
+        attrs[name] = value
+    return Rule(
+        raw["tag"],
+        attrs,
+        read=tuple(raw.get("read", ())),
+        require=raw.get("require", ""),
+        prefix=raw.get("prefix", ""),
+    )
+
+
+def _compile_fields(raw: dict) -> dict:
+    return {field: [_compile_rule(r) for r in rules] for field, rules in raw.items()}
+
+
+def _compile_spec(key: str, raw: dict, og_rules: dict) -> PlatformSpec:
+    rules = _compile_fields(raw.get("rules", {}))
+    fallbacks = tuple(raw.get("price_fallbacks", ("generic",)))
+    category = raw.get("category", {})
+    return PlatformSpec(
+        key=key,
+        label=raw.get("label", key.capitalize()),
+        hosts=tuple(h.lower() for h in raw.get("hosts", ())),
+        plan=ExtractionPlan(rules, price_fallbacks=fallbacks),
+        plan_with_og=ExtractionPlan({**og_rules, **rules}, price_fallbacks=fallbacks),
+        categories={"*": category} if isinstance(category, str) and category else dict(category),
+        bot_protected=bool(raw.get("bot_protected", False)),
+    )
+
+
+class PlatformRegistry:
+    """
+    Marketplace specs loaded from a JSON file, looked up by hostname.
+
+    `check_interval`: how often (seconds) `lookup` stats the file for changes;
+    0 disables hot reload. A file that fails to parse is logged and ignored —
+    the previously loaded specs stay in use.
+    """
+
+    def __init__(self, path: str = DEFAULT_PLATFORMS_FILE, check_interval: float = 30.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = 0.0
+        self._next_check = 0.0
+        self.loaded_at = 0.0
+        self.default: Optional[PlatformSpec] = None
+        self._specs: Dict[str, PlatformSpec] = {}
+        self._by_host: Dict[str, PlatformSpec] = {}
+        self.reload()
+
+    def reload(self) -> dict:
+        """Re-read the file now. Raises if it's invalid (the old specs are kept)."""
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+
+            og_rules = _compile_fields(data.get("og_rules", {}))
+            specs = {key: _compile_spec(key, raw, og_rules) for key, raw in data.get("platforms", {}).items()}
+            by_host = {}
+            for spec in specs.values():
+                for host in spec.hosts:
+                    if host in by_host:
+                        raise ValueError(f"Host '{host}' is claimed by both {by_host[host].key} and {spec.key}")
+                    by_host[host] = spec
+
+            # Swap everything at once so a concurrent lookup never sees half a registry.
+            self.default = _compile_spec("default", data.get("default", {}), og_rules)
+            self._specs, self._by_host = specs, by_host
+            self._mtime = mtime
+            self.loaded_at = time.time()
+            self._next_check = time.monotonic() + self.check_interval
+
+        logger.info("Loaded %d platform specs from %s", len(specs), self.path)
+        return self.to_dict()
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if not self.check_interval or now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime != self._mtime:
+                # Remember it even if it fails, so a broken file is logged once, not every check.
+                self._mtime = mtime
+                self.reload()
+        except Exception as e:
+            logger.error("Platform specs reload failed, keeping previous specs: %s", e)
+
+    def lookup(self, url: str) -> Tuple[PlatformSpec, str]:
+        """
+        (spec, matched host) for `url`; (default spec, "") for unknown stores.
+
+        "www.flipkart.com" → tries "www.flipkart.com", then "flipkart.com" — one
+        dict probe per domain label, independent of how many platforms exist.
+        """
+        self._maybe_reload()
+        host = (urlsplit(url).hostname or "").lower()
+        while host:
+            spec = self._by_host.get(host)
+            if spec is not None:
+                return spec, host
+            _, _, host = host.partition(".")
+        return self.default, ""
+
+    def get(self, key: str) -> Optional[PlatformSpec]:
+        return self.default if key == "default" else self._specs.get(key)
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "loaded_at": self.loaded_at,
+            "platforms": [spec.to_dict() for spec in self._specs.values()],
+        }
@@ -0,0 +1,213 @@
+import math
+import re
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from services.products import AmazonProduct, to_item
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Local product index
+#
+# WHY? Every search went to Amazon, even when the products it would return were
+# already sitting in the deals/search caches or had just been Smart Imported.
+# This is an in-process inverted index over every product we've seen:
+#   - filled incrementally — ItemLookup adds each parsed Creators API item and
+#     Smart Import adds each imported product; re-adding a product replaces it
+#   - BM25 ranking over title (+ brand/category) tokens
+#   - the last query word also matches as a prefix ("airdo" → airdopes), via a
+#     sorted term list kept in order as terms come and go, for typeahead
+#   - bounded: past `max_docs` the least recently added products are dropped
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Word characters, plus the Devanagari block: `\w` alone drops vowel signs
+# (matras), which would split "रेडमी" into pieces.
+_W = r"(?:[^\W_]|[\u0900-\u097F])"
+_WORD = re.compile(rf"{_W}+(?:[-'.]{_W}+)*")
+_ALNUM_SPLIT = re.compile(r"\d+(?:\.\d+)?|(?:[^\W\d_]|[\u0900-\u097F])+")
+_STOP_WORDS = frozenset({"a", "an", "and", "by", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+
+def _stem(token: str) -> str:
+    # Just plurals: "earbuds" and "earbud", "mens" and "men" should meet.
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Index/query terms for `text`, tuned for Indian marketplace titles.
+
+    "Men's T-Shirt" → men, tshirt, t, shirt; "128GB" → 128gb, 128, gb;
+    "Bluetooth 5.3" → bluetooth, 5.3. Devanagari words are kept as they are.
+    """
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        # "men's" is "mens"; "t-shirt" is also searched as "tshirt".
+        word = word.replace("'", "")
+        joined = word.replace("-", "")
+        if joined not in _STOP_WORDS:
+            terms.append(_stem(joined))
+        parts = _ALNUM_SPLIT.findall(word)
+        if len(parts) > 1:
+            terms.extend(_stem(p) for p in parts if p not in _STOP_WORDS)
+    return terms
+
+
+def _price_amount(price) -> Optional[float]:
+    """Rupees from a scraped display price like "₹1,299" (None if there isn't one)."""
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(price or ""))
+    return float(match.group().replace(",", "")) if match else None
+
+
+class ProductIndex:
+    """Inverted index with BM25 ranking over product documents."""
+
+    def __init__(self, max_docs: int = 50000, k1: float = 1.2, b: float = 0.75):
+        self.max_docs = max_docs
+        self.k1 = k1
+        self.b = b
+        self._docs: "OrderedDict[str, dict]" = OrderedDict()
+        self._terms: Dict[str, Dict[str, int]] = {}   # doc id → term frequencies
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}  # term → {doc id: term frequency}
+        self._total_length = 0
+        self._sorted_terms: List[str] = []  # the keys of _postings, in order
+        self.updated_at = 0.0
+        self.queries = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+
+    def add(self, doc_id: str, doc: dict, text: str):
+        """Index (or re-index) `doc` under `doc_id`, searchable by `text`."""
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        freqs: Dict[str, int] = {}
+        for term in tokenize(text):
+            freqs[term] = freqs.get(term, 0) + 1
+        if not freqs:
+            return
+
+        self._docs[doc_id] = doc
+        self._terms[doc_id] = freqs
+        length = sum(freqs.values())
+        self._lengths[doc_id] = length
+        self._total_length += length
+        for term, tf in freqs.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._sorted_terms, term)
+            postings[doc_id] = tf
+        self.updated_at = time.time()
+
+        while len(self._docs) > self.max_docs:
+            self.remove(next(iter(self._docs)))
+
+    def remove(self, doc_id: str):
+        if self._docs.pop(doc_id, None) is None:
+            return
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in self._terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._sorted_terms[bisect_left(self._sorted_terms, term)]
+
+    def add_products(self, products: Iterable[AmazonProduct]):
+        """Index parsed Creators API items (called for every search/deals/items fetch)."""
+        for p in products:
+            if p.asin and p.title:
+                doc = to_item(p)
+                doc["source"] = "amazon"
+                self.add(f"amazon:{p.asin}", doc, f"{p.title} {p.brand}")
+
+    def add_import(self, canonical_url: str, payload: dict, platform: str = ""):
+        """Index a Smart Import result (the /api/earnkaro/convert response body)."""
+        title = payload.get("title") or ""
+        if not title:
+            return
+        doc = {
+            "title": title,
+            "description": payload.get("description", ""),
+            "imageUrl": payload.get("imageUrl", ""),
+            "price": payload.get("price", ""),
+            "priceAmount": _price_amount(payload.get("price")),
+            "category": payload.get("category", ""),
+            "detailPageURL": payload.get("affiliateUrl") or canonical_url,
+            "source": platform or "import",
+        }
+        self.add(f"import:{canonical_url}", doc, f"{title} {doc['category']}")
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def _expand_prefix(self, prefix: str, limit: int = 50) -> List[str]:
+        """Indexed terms starting with `prefix` (at most `limit`, alphabetical)."""
+        terms = self._sorted_terms
+        matches = []
+        i = bisect_left(terms, prefix)
+        while i < len(terms) and len(matches) < limit and terms[i].startswith(prefix):
+            matches.append(terms[i])
+            i += 1
+        return matches
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True, require_all: bool = False) -> List[dict]:
+        """
+        Best `limit` documents for `query`, each with its BM25 "score".
+
+        `prefix`: the last query word also matches terms it's a prefix of.
+        `require_all`: only documents matching every query word.
+        """
+        self.queries += 1
+        # One group of terms per query word ("128gb" → 128gb, 128, gb); a
+        # document matches the word if it has any of them.
+        groups = []
+        for word in query.split():
+            terms = list(dict.fromkeys(tokenize(word)))
+            if terms:
+                groups.append(terms)
+        if not groups or not self._docs:
+            return []
+        if prefix:
+            # The whole-word term comes first; extend it with its completions.
+            groups[-1] = list(dict.fromkeys(groups[-1] + self._expand_prefix(groups[-1][0])))
+
+        n = len(self._docs)
+        avg_length = self._total_length / n
+        scores: Dict[str, float] = {}
+        matched: Dict[str, int] = {}
+        for group in groups:
+            group_hits = set()
+            for term in group:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                    group_hits.add(doc_id)
+            for doc_id in group_hits:
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        if require_all:
+            scores = {d: s for d, s in scores.items() if matched[d] == len(groups)}
+        # More query words matched beats a higher score from fewer words.
+        ranked = sorted(scores, key=lambda d: (matched[d], scores[d]), reverse=True)[:limit]
+        return [{**self._docs[d], "score": round(scores[d], 3)} for d in ranked]
+
+    def stats(self) -> dict:
+        return {
+            "name": "local_index",
+            "documents": len(self._docs),
+            "terms": len(self._postings),
+            "max_documents": self.max_docs,
+            "queries": self.queries,
+            "updated_at": self.updated_at,
+        }
@@ -0,0 +1,65 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Product URL canonicalization
+#
+# WHY? The same product reaches Smart Import under many URLs: with utm_/ref
+# tracking params, via m./www. hosts, or as Amazon's /Some-Title/dp/ASIN/ref=...
+# and Flipkart's /slug/p/itm...?pid=...&lid=... forms. Cache keys built from the
+# raw URL would miss every time; these collapse them to one key per product.
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Query params that never change which product a URL points to.
+TRACKING_PARAMS = {
+    "ref", "ref_", "tag", "linkcode", "linkid", "camp", "creative", "creativeasin", "ascsubtag",
+    "gclid", "fbclid", "msclkid", "srsltid", "igshid", "si",
+    "affid", "affextparam1", "affextparam2", "cmpid", "otracker", "otracker1", "iid", "ssid", "lid",
+    "srno", "spldomain",
+}
+TRACKING_PREFIXES = ("utm_", "pf_rd_", "pd_rd_", "_branch")
+
+_ASIN = re.compile(r"/(?:dp|gp/product|gp/aw/d|exec/obidos/asin)/([A-Z0-9]{10})(?:[/?]|$)", re.I)
+_HOST_PREFIXES = ("www.", "m.", "dl.")
+
+
+def bare_host(host: str) -> str:
+    """Host without its www./m./dl. prefix, e.g. dl.flipkart.com → flipkart.com."""
+    host = host.lower()
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+def canonical_product_url(url: str) -> str:
+    """
+    One stable key per product URL.
+
+    amazon.*/…/dp/ASIN/…           → https://<amazon host>/dp/ASIN (the store
+                                     is kept: amazon.com isn't amazon.in)
+    flipkart.com/…?pid=PID&…       → https://flipkart.com/p?pid=PID
+    anything else                  → lowercased host without www./m., no
+                                     fragment, tracking params dropped, the
+                                     remaining params sorted
+    """
+    parts = urlsplit(url.strip())
+    host = bare_host(parts.hostname or "")
+
+    if host.startswith("amazon."):
+        match = _ASIN.search(parts.path + "/")
+        if match:
+            return f"https://{host}/dp/{match.group(1).upper()}"
+
+    query = parse_qsl(parts.query, keep_blank_values=False)
+    if host == "flipkart.com":
+        pid = next((v for k, v in query if k.lower() == "pid"), "")
+        if pid:
+            return f"https://flipkart.com/p?pid={pid.upper()}"
+
+    kept = sorted(
+        (k, v) for k, v in query
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(kept), ""))
@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Amazon product record
+#
+# WHY not a dict per item?
+# Every item of every search went through a parser built from nested
+# try/except blocks (exceptions as control flow are slow in CPython), produced a
+# 9-key dict, and then each endpoint copied that dict into its own shape. Now
+# `parse_item` makes one pass with getattr() defaults into a slotted record,
+# and each endpoint's serializer below writes its response shape directly.
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass(slots=True)
+class AmazonProduct:
+    asin: str
+    title: str
+    description: str
+    image_url: Optional[str]
+    price: Optional[str]
+    original_price: Optional[str]
+    discount_percent: int
+    detail_url: str
+    # Numeric fields straight from the API's `amount`/rating values, so filters
+    # and sorts never re-parse display strings like "₹1,449.00".
+    price_amount: Optional[float] = None
+    original_amount: Optional[float] = None
+    rating: Optional[float] = None
+    review_count: int = 0
+    brand: str = ""
+
+
+def parse_item(item) -> AmazonProduct:
+    """
+    Extract an AmazonProduct from a Creators API item.
+
+    Reads the Creators API shape (offers_v2 listings with price.money, features
+    as plain strings) and the older PA-API shape (offers listings with
+    price.display_amount, feature objects) the first version was written for.
+    """
+    info = getattr(item, "item_info", None)
+
+    title = ""
+    description = ""
+    brand = ""
+    if info is not None:
+        title_attr = getattr(info, "title", None)
+        title = (getattr(title_attr, "display_value", None) or "") if title_attr is not None else ""
+        features = getattr(info, "features", None)
+        values = getattr(features, "display_values", None) if features is not None else None
+        if values:
+            parts = [v if isinstance(v, str) else getattr(v, "display_value", None) for v in values[:2]]
+            description = " ".join(p for p in parts if p)
+        by_line = getattr(info, "by_line_info", None)
+        brand_attr = getattr(by_line, "brand", None) if by_line is not None else None
+        if brand_attr is not None:
+            brand = getattr(brand_attr, "display_value", None) or ""
+
+    image_url = None
+    images = getattr(item, "images", None)
+    primary = getattr(images, "primary", None) if images is not None else None
+    if primary is not None:
+        size = getattr(primary, "large", None) or getattr(primary, "medium", None)
+        if size is not None:
+            image_url = getattr(size, "url", None)
+
+    price = None
+    original_price = None
+    amount = None
+    original_amount = None
+    discount_percent = 0
+    offers = getattr(item, "offers_v2", None) or getattr(item, "offers", None)
+    listings = getattr(offers, "listings", None) if offers is not None else None
+    if listings:
+        listing = listings[0]
+        price_obj = getattr(listing, "price", None)
+        if price_obj is not None:
+            # offers_v2 keeps amounts under price.money and price.saving_basis.money.
+            money = getattr(price_obj, "money", None) or price_obj
+            price = getattr(money, "display_amount", None) or None
+            amount = getattr(money, "amount", None)
+            basis = getattr(price_obj, "saving_basis", None) or getattr(listing, "saving_basis", None)
+        else:
+            basis = getattr(listing, "saving_basis", None)
+        if basis is not None:
+            basis = getattr(basis, "money", None) or basis
+            original_price = getattr(basis, "display_amount", None) or None
+            original_amount = getattr(basis, "amount", None)
+            if original_price and amount is not None and original_amount:
+                original_amount = float(original_amount)
+                discount_percent = int(((float(original_amount) - float(amount)) / float(original_amount)) * 100)
+
+    rating = None
+    review_count = 0
+    reviews = getattr(item, "customer_reviews", None)
+    if reviews is not None:
+        star = getattr(reviews, "star_rating", None)
+        rating = getattr(star, "value", None) if star is not None else None
+        review_count = int(getattr(reviews, "count", None) or 0)
+
+    return AmazonProduct(
+        asin=getattr(item, "asin", "") or "",
+        title=title,
+        description=description,
+        image_url=image_url,
+        price=price,
+        original_price=original_price,
+        discount_percent=discount_percent,
+        detail_url=getattr(item, "detail_page_url", "") or "",
+        price_amount=float(amount) if amount is not None else None,
+        original_amount=original_amount if original_price else None,
+        rating=float(rating) if rating is not None else None,
+        review_count=review_count,
+        brand=brand,
+    )
+
+
+# ── Serializers: one per response shape ─────────────────────────────────────
+
+def to_item(p: AmazonProduct) -> dict:
+    """The full product shape (advanced search, /api/amazon/items, the per-ASIN cache)."""
+    return {
+        "asin": p.asin,
+        "title": p.title,
+        "description": p.description,
+        "imageUrl": p.image_url,
+        "price": p.price,
+        "originalPrice": p.original_price,
+        "discountPercent": p.discount_percent,
+        "detailPageURL": p.detail_url,
+        "priceAmount": p.price_amount,
+        "originalAmount": p.original_amount,
+        "rating": p.rating,
+        "reviewCount": p.review_count,
+        "brand": p.brand,
+    }
+
+
+def to_category_deal(p: AmazonProduct, category: str) -> dict:
+    deal = to_item(p)
+    deal["category"] = category
+    return deal
+
+
+def to_homepage_deal(p: AmazonProduct) -> dict:
+    return {
+        "asin": p.asin,
+        "title": p.title,
+        "image_url": p.image_url,
+        "price": p.price,
+        "original_price": p.original_price,
+        "discount_percent": p.discount_percent,
+        "detail_url": p.detail_url,
+    }
+
+
+def to_search_result(p: AmazonProduct) -> dict:
+    return {
+        "title": p.title,
+        "description": p.description,
+        "imageUrl": p.image_url,
+        "price": p.price,
+        "detailPageURL": p.detail_url,
+    }
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Async token bucket: allows `rate` acquisitions per second, bursting up to `burst`.
+
+    WHY? The Creators API enforces a transactions-per-second quota. Refreshing
+    every category at once must still stay under it, otherwise Amazon answers
+    with 429s and the refresh fails anyway.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RefreshJob:
+    """One run of the refresher over a set of categories, pollable by id."""
+
+    def __init__(self, categories: List[str], trigger: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.trigger = trigger
+        self.status = "running"
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.categories: Dict[str, dict] = {c: {"status": "pending", "attempts": 0} for c in categories}
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "trigger": self.trigger,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            # Copied, so a snapshot being written from a worker thread can't
+            # see a category change mid-iteration.
+            "categories": {c: dict(state) for c, state in self.categories.items()},
+        }
+
+
+class DealsRefresher:
+    """
+    Keeps the category deals cache warm from the background.
+
+    WHY not refresh inside the request?
+    The old /api/refresh-cache walked every category one after another inside
+    the handler — six upstream latencies end to end, blocking the caller.
+    Instead:
+      - all categories refresh concurrently, paced by a TokenBucket set to the
+        Creators API TPS quota
+      - a scheduler loop refreshes entries `refresh_ahead` seconds before they
+        expire, so visitors never hit an expired category
+      - failed fetches retry with exponential backoff and full jitter; if every
+        attempt fails the previous cached deals are kept
+      - manual refreshes return a job id that can be polled for progress
+
+    Job progress is written to the `jobs` cache as it changes. On a shared
+    backend (sqlite/redis) that means any worker can answer a poll for any
+    job; without one, only the worker that started a job knows its id, so
+    polling needs a single worker (or sticky sessions).
+    """
+
+    def __init__(self, cache: TTLCache, fetch: Callable[[str], Awaitable[list]], categories: List[str],
+                 rate: float = 1.0, burst: int = 1, max_retries: int = 3, backoff_base: float = 1.0,
+                 refresh_ahead: float = 3600.0, check_interval: float = 300.0, max_jobs: int = 20,
+                 jobs: Optional[TTLCache] = None):
+        self.cache = cache
+        self.fetch = fetch
+        self.categories = categories
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.refresh_ahead = refresh_ahead
+        self.check_interval = check_interval
+        self.max_jobs = max_jobs
+        self.jobs = jobs
+
+        self._jobs: "OrderedDict[str, RefreshJob]" = OrderedDict()
+        self._tasks = set()
+        self._scheduler: Optional[asyncio.Task] = None
+        self._manual: Optional[RefreshJob] = None
+        # Serializes job writes, so a slow older snapshot never lands after a newer one.
+        self._publish_lock = asyncio.Lock()
+
+    # ── Jobs ─────────────────────────────────────────────────────────────────
+
+    async def trigger(self, categories: Optional[List[str]] = None, trigger: str = "manual") -> RefreshJob:
+        """Start refreshing `categories` (default: all) in the background and return the job."""
+        if trigger == "manual" and self._manual is not None and self._manual.status == "running":
+            return self._manual
+
+        job = RefreshJob(categories or list(self.categories), trigger)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        if trigger == "manual":
+            self._manual = job
+        # Published before the id is handed out, so the first poll finds it on any worker.
+        await self._publish(job)
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        """A job's progress (RefreshJob.to_dict()), whichever worker started it."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.jobs is None:
+            return None
+        return await self.jobs.aget(job_id)
+
+    async def _publish(self, job: RefreshJob):
+        if self.jobs is None:
+            return
+        try:
+            async with self._publish_lock:
+                await self.jobs.aset(job.id, job.to_dict())
+        except Exception as e:
+            # Progress reporting is best-effort; the refresh itself carries on.
+            logger.warning("Could not publish refresh job %s: %s", job.id, e)
+
+    async def _run(self, job: RefreshJob):
+        results = await asyncio.gather(
+            *(self._refresh_category(job, c) for c in job.categories), return_exceptions=True
+        )
+        failed = sum(1 for r in results if r is not True)
+        job.status = "done" if failed == 0 else ("failed" if failed == len(results) else "partial")
+        job.finished_at = datetime.now()
+        await self._publish(job)
+        logger.info("Refresh job %s (%s) finished: %s", job.id, job.trigger, job.status)
+
+    async def _refresh_category(self, job: RefreshJob, category: str) -> bool:
+        state = job.categories[category]
+        state["status"] = "running"
+        await self._publish(job)
+        try:
+            entry = await self.cache.refresh(category, lambda: self._fetch_with_retry(job, category, state))
+        except Exception as e:
+            state["status"] = "failed"
+            state["error"] = str(e)
+            logger.error("Refreshing %s failed after %d attempts: %s", category, state["attempts"], e)
+            await self._publish(job)
+            return False
+        if entry is None:
+            state["status"] = "skipped"
+            state["reason"] = "refreshed by another worker"
+        else:
+            state["status"] = "done"
+            state["deals"] = len(entry.value)
+        await self._publish(job)
+        return True
+
+    async def _fetch_with_retry(self, job: RefreshJob, category: str, state: dict) -> list:
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            state["attempts"] = attempt + 1
+            if attempt:
+                await self._publish(job)
+            try:
+                return await self.fetch(category)
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                # Full jitter: spread retries out so workers don't retry in lockstep.
+                await asyncio.sleep(random.uniform(0, self.backoff_base * (2 ** attempt)))
+
+    # ── Scheduler ────────────────────────────────────────────────────────────
+
+    def due_categories(self) -> List[str]:
+        """Categories that are missing or expire within `refresh_ahead` seconds."""
+        deadline = time.time() + self.refresh_ahead
+        due = []
+        for category in self.categories:
+            entry = self.cache.peek(category)
+            if entry is None or entry.expires_at <= deadline:
+                due.append(category)
+        return due
+
+    def start(self):
+        if self._scheduler is None:
+            self._scheduler = asyncio.create_task(self._schedule())
+
+    async def stop(self):
+        tasks = [t for t in (self._scheduler, *self._tasks) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._scheduler = None
+
+    async def _schedule(self):
+        while True:
+            try:
+                # Peeks the cache, which may be disk or network I/O: keep it off the loop.
+                due = await asyncio.to_thread(self.due_categories)
+                if due:
+                    await self.trigger(due, trigger="scheduled")
+            except Exception as e:
+                logger.error("Refresh scheduler error: %s", e)
+            await asyncio.sleep(self.check_interval)
@@ -0,0 +1,142 @@
+import heapq
+import itertools
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Search suggestions
+#
+# WHY? Users found the right keywords by submitting searches, and every submit
+# was a Creators API call. This index over phrases we've seen — searched
+# keywords (weighted higher) and product titles from search/deals results —
+# lets the search box suggest as the user types:
+#   - phrases live in one sorted list, so the completions of a prefix are a
+#     contiguous slice found with two bisects, ranked on the spot when small
+#   - a prefix whose slice is large ("s", "sam") gets its top-`k` memoized the
+#     first time it's asked for, and that list is kept up to date as phrases
+#     are added, so popular prefixes answer without scanning
+#   - phrases are ranked by accumulated weight (how often they were seen), then
+#     alphabetically
+#   - bounded: past `max_phrases` each add evicts the lowest-weighted phrase
+#     (least recently seen among equals), popped from a min-heap, so the cost
+#     of staying under the cap is spread evenly over adds
+# ──────────────────────────────────────────────────────────────────────────────
+
+# Prefixes matching more phrases than this keep a maintained top-k.
+MEMO_MIN_MATCHES = 100
+# Compact the eviction heap when it holds this many entries per live phrase.
+HEAP_SLACK = 2
+
+
+def normalize(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+class SuggestIndex:
+    """Weighted phrases in a sorted list; top-k completions of any prefix."""
+
+    def __init__(self, k: int = 10, max_phrases: int = 20000, max_length: int = 80):
+        self.k = k
+        self.max_phrases = max_phrases
+        self.max_length = max_length
+        self._phrases: List[str] = []
+        self._weights: Dict[str, float] = {}
+        # Eviction order: (weight, seq, phrase); an entry is live only while
+        # seq is the phrase's latest, older ones are skipped when popped.
+        self._heap: List[Tuple[float, int, str]] = []
+        self._latest: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._tops: Dict[str, List[str]] = {}
+        self._longest_memo = -1
+        self.lookups = 0
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def _rank(self, phrase: str) -> Tuple[float, str]:
+        return -self._weights[phrase], phrase
+
+    def add(self, phrase: str, weight: float = 1.0):
+        phrase = normalize(phrase)[:self.max_length].strip()
+        if not phrase:
+            return
+        if phrase not in self._weights:
+            insort(self._phrases, phrase)
+        score = self._weights.get(phrase, 0.0) + weight
+        self._weights[phrase] = score
+
+        seq = next(self._seq)
+        self._latest[phrase] = seq
+        heapq.heappush(self._heap, (score, seq, phrase))
+        if len(self._heap) > HEAP_SLACK * len(self._weights) + self.k:
+            self._compact_heap()
+
+        for prefix in self._memoized_prefixes(phrase):
+            self._update_top(self._tops[prefix], phrase)
+
+        if len(self._weights) > self.max_phrases:
+            self._evict_one()
+
+    def _memoized_prefixes(self, phrase: str) -> List[str]:
+        prefixes = (phrase[:n] for n in range(min(len(phrase), self._longest_memo) + 1))
+        return [prefix for prefix in prefixes if prefix in self._tops]
+
+    def _update_top(self, top: List[str], phrase: str):
+        if phrase in top:
+            top.remove(phrase)
+        rank = self._rank(phrase)
+        if len(top) >= self.k and rank >= self._rank(top[-1]):
+            return
+        top.insert(bisect_left(top, rank, key=self._rank), phrase)
+        del top[self.k:]
+
+    def _evict_one(self):
+        while self._heap:
+            _, seq, phrase = heapq.heappop(self._heap)
+            if self._latest.get(phrase) == seq:
+                break
+        else:
+            return
+        del self._weights[phrase]
+        del self._latest[phrase]
+        del self._phrases[bisect_left(self._phrases, phrase)]
+        for prefix in self._memoized_prefixes(phrase):
+            if phrase in self._tops[prefix]:
+                # Rare: the lowest-weighted phrase was among the best few of
+                # its prefix, so refill that list from the slice (or stop
+                # memoizing a prefix that no longer matches much).
+                lo, hi = self._slice(prefix)
+                if hi - lo > MEMO_MIN_MATCHES:
+                    self._tops[prefix] = self._ranked(lo, hi, self.k)
+                else:
+                    del self._tops[prefix]
+
+    def _compact_heap(self):
+        self._heap = [(self._weights[p], seq, p) for p, seq in self._latest.items()]
+        heapq.heapify(self._heap)
+
+    def _slice(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._phrases, prefix)
+        return lo, bisect_left(self._phrases, prefix + "\U0010ffff", lo)
+
+    def _ranked(self, lo: int, hi: int, limit: int) -> List[str]:
+        return heapq.nsmallest(limit, self._phrases[lo:hi], key=self._rank)
+
+    def suggest(self, prefix: str, limit: Optional[int] = None) -> List[dict]:
+        """Top completions of `prefix` as [{"text", "weight"}], most seen first."""
+        self.lookups += 1
+        prefix = normalize(prefix)
+        limit = min(limit or self.k, self.k)
+        top = self._tops.get(prefix)
+        if top is None:
+            lo, hi = self._slice(prefix)
+            if hi - lo <= MEMO_MIN_MATCHES:
+                top = self._ranked(lo, hi, limit)
+            else:
+                top = self._tops[prefix] = self._ranked(lo, hi, self.k)
+                self._longest_memo = max(self._longest_memo, len(prefix))
+        top = top[:limit]
+        return [{"text": p, "weight": self._weights[p]} for p in top]
+
+    def stats(self) -> dict:
+        return {"name": "suggest", "phrases": len(self._weights), "max_phrases": self.max_phrases, "lookups": self.lookups}
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.amazon_client import AmazonClientBusy, AmazonClientTimeout, AsyncAmazonClient
+
+
+class BlockingApi:
+    """search_items blocks its worker thread until `release` is set, like a slow upstream."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.threads = []
+
+    def search_items(self, **kwargs):
+        self.threads.append(threading.current_thread().name)
+        self.release.wait(5)
+        return kwargs["keywords"]
+
+
+async def _until(predicate, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+def test_full_queue_rejects_and_stats_track_queued_and_active_calls():
+    api = BlockingApi()
+    client = AsyncAmazonClient(api, max_concurrency=1, max_queue=2, timeout=5)
+
+    async def run():
+        first = asyncio.ensure_future(client.search_items(keywords="earbuds"))
+        await _until(lambda: client.stats()["active"] == 1)
+        queued = [asyncio.ensure_future(client.search_items(keywords=f"q{i}")) for i in range(2)]
+        await _until(lambda: client.stats()["queue_depth"] == 2)
+        with pytest.raises(AmazonClientBusy):
+            await client.search_items(keywords="one too many")
+        busy = client.stats()
+
+        api.release.set()
+        results = await asyncio.gather(first, *queued)
+        return busy, results, client.stats()
+
+    busy, results, done = asyncio.run(run())
+    client.shutdown()
+    assert busy["active"] == 1 and busy["queue_depth"] == 2 and busy["rejected"] == 1
+    assert results == ["earbuds", "q0", "q1"]
+    assert done["active"] == 0 and done["queue_depth"] == 0
+    assert done["calls"] == 3 and done["max_queue_depth"] == 2
+    assert api.threads == ["amazon-api_0"] * 3
+
+
+def test_slow_call_times_out_without_leaking_its_slot():
+    api = BlockingApi()
+    client = AsyncAmazonClient(api, max_concurrency=1, max_queue=4, timeout=0.05)
+
+    async def run():
+        with pytest.raises(AmazonClientTimeout):
+            await client.search_items(keywords="slow")
+        timed_out = client.stats()
+        # The worker thread is still inside the SDK call until it returns.
+        api.release.set()
+        await _until(lambda: client.stats()["active"] == 0)
+        return timed_out, await client.search_items(keywords="next"), client.stats()
+
+    timed_out, result, after = asyncio.run(run())
+    client.shutdown()
+    assert timed_out["timeouts"] == 1 and timed_out["active"] == 1
+    assert result == "next"
+    assert after["queue_depth"] == 0 and after["timeouts"] == 1
+
+
+def test_api_factory_runs_on_a_worker_thread_once():
+    built = []
+
+    def factory():
+        built.append(threading.current_thread().name)
+        api = BlockingApi()
+        api.release.set()
+        return api
+
+    client = AsyncAmazonClient(api_factory=factory, max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(*(client.search_items(keywords=k) for k in ("a", "b", "c")))
+
+    assert asyncio.run(run()) == ["a", "b", "c"]
+    client.shutdown()
+    assert len(built) == 1 and built[0].startswith("amazon-api")
+
+
+def test_needs_an_api_or_a_factory():
+    with pytest.raises(ValueError):
+        AsyncAmazonClient()
@@ -0,0 +1,171 @@
+import asyncio
+
+from services.cache import SingleFlight, TTLCache
+from services.cache_backends import SQLiteBackend
+
+
+def _shared_caches(tmp_path, stale_ttl: float = 0.0):
+    """Two caches on one SQLite file, like two uvicorn workers."""
+    path = str(tmp_path / "cache.sqlite3")
+    make = lambda: TTLCache(ttl=60, stale_ttl=stale_ttl, name="deals", lock_ttl=1.0,  # noqa: E731
+                            backend=SQLiteBackend(path, "deals"))
+    return make(), make()
+
+
+def test_get_or_load_never_returns_none_when_joining_a_skipped_refresh(tmp_path):
+    worker_a, worker_b = _shared_caches(tmp_path)
+
+    async def run():
+        # Worker A is loading the key, so it holds the shared lock.
+        assert worker_a.backend.acquire_lock("Electronics", 30)
+        load_started = asyncio.Event()
+
+        async def slow_loader():
+            load_started.set()
+            await asyncio.sleep(0.05)
+            return ["fetched"]
+
+        # Worker B's refresher gives up (another process holds the lock)...
+        refreshing = asyncio.ensure_future(worker_b.refresh("Electronics", slow_loader))
+        # ...and a request arriving meanwhile joins that flight.
+        request = asyncio.ensure_future(worker_b.get_or_load("Electronics", slow_loader))
+        assert await refreshing is None
+
+        # Worker A finishes its load while B's request waits for it; the request
+        # must end up with that entry.
+        await asyncio.sleep(0.2)
+        worker_a.set("Electronics", ["from worker a"])
+        worker_a.backend.release_lock("Electronics")
+        entry = await request
+        assert entry is not None
+        assert entry.value == ["from worker a"]
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(10)))
+
+    entries = asyncio.run(run())
+    assert calls == 1
+    assert {e.value for e in entries} == {1}
+
+
+def test_failed_load_is_not_cached():
+    cache = TTLCache(ttl=60)
+
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    async def run():
+        try:
+            await cache.get_or_load("k", failing)
+        except RuntimeError:
+            pass
+        return await cache.get_or_load("k", lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(run()).value == "ok"
+
+
+def test_stale_entry_is_served_while_one_background_refresh_runs():
+    cache = TTLCache(ttl=60, stale_ttl=60)
+    cache.set("k", "old", ttl=-1)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "new"
+
+    async def run():
+        first = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(5)))
+        await asyncio.sleep(0.05)
+        return first, cache.get("k")
+
+    first, after = asyncio.run(run())
+    assert {e.value for e in first} == {"old"}
+    assert calls == 1
+    assert after == "new"
+
+
+def test_lru_eviction_respects_max_entries():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a is now more recently used than b
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_restore_keeps_timestamps_and_serves_expired_entries_stale():
+    cache = TTLCache(ttl=60)
+
+    async def loader():
+        return "refetched"
+
+    async def run():
+        cache.restore("k", "snapshot", stored_at=1.0, expires_at=2.0, keep_until=2 ** 40)
+        served = await cache.get_or_load("k", loader)
+        await asyncio.sleep(0.01)
+        return served, cache.get("k")
+
+    served, after = asyncio.run(run())
+    assert served.value == "snapshot"
+    assert served.stored_at == 1.0
+    assert after == "refetched"
+
+
+def test_single_flight_cancels_an_abandoned_call_only_after_its_last_waiter():
+    flights = SingleFlight()
+
+    async def run():
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(10)
+
+        first = asyncio.ensure_future(flights.do("k", work, cancel_abandoned=True))
+        second = asyncio.ensure_future(flights.do("k", work, cancel_abandoned=True))
+        await started.wait()
+        call = flights.pending("k")
+
+        first.cancel()
+        await asyncio.sleep(0)
+        still_running = not call.done()
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0)
+        return still_running, call.cancelled(), flights.in_flight("k")
+
+    assert asyncio.run(run()) == (True, True, False)
+
+
+def test_single_flight_keeps_running_for_later_readers_by_default():
+    flights = SingleFlight()
+
+    async def run():
+        async def work():
+            await asyncio.sleep(0.01)
+            return "done"
+
+        waiter = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+        call = flights.pending("k")
+        waiter.cancel()
+        return await call
+
+    assert asyncio.run(run()) == "done"
@@ -0,0 +1,64 @@
+import sqlite3
+import time
+
+from services.cache_backends import SQLiteBackend
+
+
+def _backend(tmp_path, **kwargs) -> SQLiteBackend:
+    return SQLiteBackend(str(tmp_path / "cache.sqlite3"), "items", **kwargs)
+
+
+def _counted(backend: SQLiteBackend):
+    return backend.conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE namespace = ?", (backend.namespace,)
+    ).fetchone()
+
+
+def test_totals_follow_inserts_overwrites_and_deletes(tmp_path):
+    backend = _backend(tmp_path)
+    now = time.time()
+    backend.set("a", {"title": "short"}, now, now + 60, now + 60)
+    backend.set("a", {"title": "a much longer title than before"}, now, now + 60, now + 60)
+    backend.set_many({"b": [1, 2, 3], "c": "x" * 50}, now, now + 60, now + 60)
+    backend.delete("b")
+
+    assert tuple(backend._totals()) == _counted(backend)
+    assert len(backend) == 2
+    assert backend.stats()["entries"] == 2
+
+
+def test_totals_are_rebuilt_for_a_cache_file_from_before_they_existed(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    now = time.time()
+    old = sqlite3.connect(path)
+    old.execute(
+        "CREATE TABLE cache (namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+        " stored_at REAL NOT NULL, expires_at REAL NOT NULL, keep_until REAL NOT NULL,"
+        " size INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (namespace, key))"
+    )
+    old.execute("INSERT INTO cache VALUES ('items', 'a', x'6a31', ?, ?, ?, 2, ?)", (now, now + 60, now + 60, now))
+    old.commit()
+    old.close()
+
+    assert len(SQLiteBackend(path, "items")) == 1
+
+
+def test_going_over_the_cap_evicts_least_recently_used_down_to_the_low_water_mark(tmp_path):
+    backend = _backend(tmp_path, max_entries=10)
+    now = time.time()
+    for i in range(10):
+        backend.set(f"k{i}", i, now + i, now + 60, now + 60)
+    backend.set("new", "kept", now + 20, now + 60, now + 60)
+
+    assert len(backend) == 9  # EVICT_TO * max_entries
+    assert backend.get("new", now) is not None
+    assert backend.get("k0", now) is None
+    assert backend.get("k9", now) is not None
+    assert tuple(backend._totals()) == _counted(backend)
+
+
+def test_get_many_returns_only_stored_keys(tmp_path):
+    backend = _backend(tmp_path)
+    now = time.time()
+    backend.set_many({"a": 1, "b": 2}, now, now + 60, now + 60)
+    assert {k: e.value for k, e in backend.get_many(["a", "b", "missing"], now).items()} == {"a": 1, "b": 2}
@@ -0,0 +1,81 @@
+import json
+import time
+
+import pytest
+
+from services import cache_snapshot
+from services.cache import TTLCache
+from services.cache_snapshot import load_snapshot, save_snapshot, snapshot_signature
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    """Run each test with orjson (if installed) and with the stdlib fallback."""
+    if request.param == "json":
+        monkeypatch.setattr(cache_snapshot, "orjson", None)
+    elif cache_snapshot.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_round_trip_keeps_original_timestamps(tmp_path, encoder):
+    path = str(tmp_path / "snapshot.jsonl")
+    deals = TTLCache(ttl=60, name="deals")
+    deals.set("Electronics", [{"title": "boAt Airdopes 141", "price": "₹1,099"}])
+    deals.set("Fashion", ["deal"])
+    saved = deals.peek("Electronics")
+
+    written = save_snapshot(path, {deals: ["Electronics", "Fashion", "Books"]})
+    assert written == 2  # missing keys are skipped
+
+    fresh = TTLCache(ttl=60, name="deals")
+    other = TTLCache(ttl=60, name="search")
+    assert load_snapshot(path, [fresh, other], max_age=3600) == {"deals": 2, "search": 0}
+    restored = fresh.peek("Electronics")
+    assert restored.value == saved.value
+    assert (restored.stored_at, restored.expires_at) == (saved.stored_at, saved.expires_at)
+
+
+def test_expired_entries_come_back_stale_and_old_ones_are_skipped(tmp_path, encoder):
+    path = str(tmp_path / "snapshot.jsonl")
+    now = time.time()
+    deals = TTLCache(ttl=60, name="deals")
+    deals.restore("yesterday", ["old"], now - 90_000, now - 3_600, keep_until=now + 60)
+    deals.restore("last hour", ["recent"], now - 3_000, now - 60, keep_until=now + 60)
+    save_snapshot(path, {deals: ["yesterday", "last hour"]})
+
+    fresh = TTLCache(ttl=60, name="deals")
+    assert load_snapshot(path, [fresh], max_age=86_400) == {"deals": 1}
+    assert fresh.peek("yesterday") is None
+    entry = fresh.peek("last hour")
+    assert entry.value == ["recent"] and not entry.is_fresh()
+
+
+def test_unreadable_or_foreign_snapshots_restore_nothing(tmp_path):
+    deals = TTLCache(ttl=60, name="deals")
+    assert load_snapshot(str(tmp_path / "missing.jsonl"), [deals], max_age=60) == {"deals": 0}
+
+    old_version = tmp_path / "old.jsonl"
+    old_version.write_text(json.dumps({"version": 0}) + "\n")
+    assert load_snapshot(str(old_version), [deals], max_age=60) == {"deals": 0}
+
+    empty = tmp_path / "empty.jsonl"
+    empty.write_bytes(b"")
+    assert load_snapshot(str(empty), [deals], max_age=60) == {"deals": 0}
+
+    truncated = tmp_path / "truncated.jsonl"
+    truncated.write_text(json.dumps({"version": cache_snapshot.SNAPSHOT_VERSION}) + '\n{"cache": "deals", "ke')
+    assert load_snapshot(str(truncated), [deals], max_age=60) == {"deals": 0}
+    assert len(deals) == 0
+
+
+def test_signature_changes_only_when_an_entry_is_rewritten():
+    deals = TTLCache(ttl=60, name="deals")
+    deals.set("Electronics", ["a"])
+    keys = {deals: ["Electronics", "Fashion"]}
+    before = snapshot_signature(keys)
+    deals.get("Electronics")
+    assert snapshot_signature(keys) == before
+    time.sleep(0.001)
+    deals.set("Electronics", ["b"])
+    assert snapshot_signature(keys) != before
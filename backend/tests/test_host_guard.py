@@ -0,0 +1,84 @@
+import asyncio
+
+from services.host_guard import CLOSED, HALF_OPEN, OPEN, HostGuard, HostGuards
+
+
+def test_breaker_opens_after_consecutive_failures_and_lets_one_probe_through(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("services.host_guard.time.monotonic", lambda: clock[0])
+    guard = HostGuard("flipkart.com", failure_threshold=3, cool_off=60)
+
+    guard.failure("503")
+    guard.success()  # a success resets the run of failures
+    for _ in range(3):
+        assert guard.allow()
+        guard.failure("503")
+    assert guard.state == OPEN and guard.is_open()
+    assert not guard.allow()
+
+    clock[0] += 61
+    assert not guard.is_open()
+    assert guard.allow()  # the probe
+    assert guard.state == HALF_OPEN
+    assert not guard.allow()  # everyone else waits for its outcome
+    assert guard.rejected == 2
+
+    guard.failure("still 503")  # a failed probe re-opens at once
+    assert guard.state == OPEN
+    clock[0] += 61
+    assert guard.allow()
+    guard.success()
+    assert guard.state == CLOSED and guard.allow()
+
+
+def test_cancelled_probe_frees_the_slot_for_another(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("services.host_guard.time.monotonic", lambda: clock[0])
+    guard = HostGuard("meesho.com", failure_threshold=1, cool_off=10)
+    guard.failure()
+    clock[0] = 11
+    assert guard.allow()
+    guard.cancelled()
+    assert guard.allow()
+
+
+def test_limit_is_additive_increase_multiplicative_decrease():
+    guard = HostGuard("amazon.in", min_limit=1, max_limit=4, initial_limit=2)
+    guard.failure()
+    assert guard.limit == 1
+    guard.failure()
+    assert guard.limit == 1  # never below min_limit
+    for _ in range(50):
+        guard.success()
+    assert guard.limit == 4  # never above max_limit
+    guard.failure()
+    assert guard.limit == 2
+
+
+def test_slot_caps_concurrent_requests_at_the_limit():
+    guard = HostGuard("amazon.in", initial_limit=2)
+    peak = 0
+
+    async def fetch():
+        nonlocal peak
+        async with guard.slot():
+            peak = max(peak, guard.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(fetch() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert guard.in_flight == 0
+
+
+def test_guards_are_per_host_with_shared_settings():
+    guards = HostGuards(failure_threshold=2, max_limit=3)
+    assert guards.get("amazon.in") is guards.get("amazon.in")
+    guards.get("flipkart.com").failure("timeout")
+
+    snapshot = guards.snapshot()
+    assert snapshot["settings"]["failure_threshold"] == 2
+    assert [h["host"] for h in snapshot["hosts"]] == ["amazon.in", "flipkart.com"]
+    assert snapshot["hosts"][1]["last_error"] == "timeout"
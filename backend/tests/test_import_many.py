@@ -0,0 +1,56 @@
+import asyncio
+
+from services.earnkaro_converter import EarnkaroConverter
+
+
+def _converter(started: list, cancelled: list) -> EarnkaroConverter:
+    converter = EarnkaroConverter()
+
+    async def fake_import(url, cache_key, deadline):
+        started.append(cache_key)
+        try:
+            await asyncio.sleep(0 if "fast" in url else 10)
+        except asyncio.CancelledError:
+            cancelled.append(cache_key)
+            raise
+        return {"conversion": {"success": 1}, "details": {"title": url}}
+
+    converter._import = fake_import
+    return converter
+
+
+def test_closing_import_many_cancels_imports_nobody_else_waits_for():
+    started, cancelled = [], []
+    converter = _converter(started, cancelled)
+    urls = ["https://www.amazon.in/fast-charger/dp/B0FAST0001", "https://www.flipkart.com/p/slow-1",
+            "https://www.meesho.com/p/slow-2"]
+
+    async def run():
+        # A single import of one of the slow products is running alongside the batch.
+        shared = asyncio.ensure_future(converter.import_product(urls[1]))
+        results = converter.import_many(urls)
+        first = await results.__anext__()
+        await results.aclose()
+        await asyncio.sleep(0.05)
+        cancelled_by_close = list(cancelled)
+        shared_alive = not shared.done()
+        shared.cancel()
+        await asyncio.gather(shared, return_exceptions=True)
+        return first, cancelled_by_close, shared_alive
+
+    first, cancelled_by_close, shared_alive = asyncio.run(run())
+    assert first["url"] == urls[0] and "result" in first
+    assert len(started) == 3
+    # The slow import only the batch wanted was cancelled at once; the shared
+    # one kept running until its other caller gave up too.
+    assert cancelled_by_close == ["https://meesho.com/p/slow-2"]
+    assert shared_alive
+    assert len(cancelled) == 2
+
+
+def test_earnkaro_details_take_the_marketplace_category_before_url_keywords():
+    converter = EarnkaroConverter()
+    # The Nykaa URL mentions "dress", which keyword matching alone files under Fashion.
+    details = converter._complete_details("https://www.nykaa.com/dress-up-lipstick/p/123", {"title": "Lipstick"})
+    assert details["category"] == "Beauty & Daily Needs"
+    assert converter._complete_details("https://www.flipkart.com/mobiles/p/1", {})["category"] == "Electronics"
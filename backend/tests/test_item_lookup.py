@@ -0,0 +1,71 @@
+import asyncio
+
+from amazon_creatorsapi.errors import ItemsNotFoundError
+
+from services.cache import TTLCache
+from services.item_lookup import ItemLookup
+from services.products import AmazonProduct
+
+KNOWN = "B0KNOWN001"
+
+
+def _product(asin: str) -> AmazonProduct:
+    return AmazonProduct(asin=asin, title=f"Product {asin}", description="", image_url=None, price="₹999",
+                         original_price=None, discount_percent=0, detail_url=f"https://www.amazon.in/dp/{asin}")
+
+
+class FakeClient:
+    """GetItems like the SDK: unknown ASINs are left out, and all-unknown raises."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def get_items(self, asins):
+        self.calls.append(list(asins))
+        if self.fail:
+            raise RuntimeError("503 Service Unavailable")
+        items = [asin for asin in asins if asin == KNOWN]
+        if not items:
+            raise ItemsNotFoundError("No items have been found")
+        return items
+
+
+def _lookup(client, **kwargs) -> ItemLookup:
+    return ItemLookup(client, TTLCache(ttl=60, name="items"), parse=_product, **kwargs)
+
+
+def test_unknown_asins_are_not_found_rather_than_failed():
+    lookup = _lookup(FakeClient())
+
+    result = asyncio.run(lookup.lookup(["B000000001", "not-an-asin"]))
+
+    assert result["not_found"] == ["B000000001"]
+    assert result["failed"] == []
+    assert result["invalid"] == ["not-an-asin"]
+
+
+def test_not_found_asins_are_remembered_until_a_refresh():
+    client = FakeClient()
+    lookup = _lookup(client)
+
+    async def run():
+        first = await lookup.lookup([KNOWN, "B000000001"])
+        second = await lookup.lookup(["B000000001", KNOWN])
+        refreshed = await lookup.lookup(["B000000001"], refresh=True)
+        return first, second, refreshed
+
+    first, second, refreshed = asyncio.run(run())
+    assert list(first["items"]) == [KNOWN] and first["not_found"] == ["B000000001"]
+    assert second["not_found"] == ["B000000001"] and second["cached"] == 1
+    assert refreshed["not_found"] == ["B000000001"]
+    assert client.calls == [[KNOWN, "B000000001"], ["B000000001"]]
+
+
+def test_upstream_errors_are_reported_as_failed():
+    lookup = _lookup(FakeClient(fail=True), not_found_ttl=0)
+
+    result = asyncio.run(lookup.lookup(["B000000001"]))
+
+    assert result["failed"] == ["B000000001"]
+    assert result["not_found"] == []
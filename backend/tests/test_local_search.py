@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+import main
+from services.cache import TTLCache
+from services.product_index import ProductIndex
+
+
+def test_local_answers_expire_into_an_amazon_search(monkeypatch):
+    index = ProductIndex()
+    for i in range(10):
+        title = f"boAt Airdopes {i} wireless earbuds"
+        index.add(f"amazon:B0TEST{i:04d}", {"title": title}, title)
+    amazon_calls = []
+
+    async def fetch_search(keywords, category):
+        amazon_calls.append(keywords)
+        return [{"title": "from Amazon"}]
+
+    monkeypatch.setattr(main, "SEARCH_LOCAL_FIRST", True)
+    monkeypatch.setattr(main, "SEARCH_LOCAL_TTL", 0.05)
+    monkeypatch.setattr(main, "search_cache", TTLCache(ttl=60, name="search"))
+    monkeypatch.setattr(main, "product_index", index)
+    monkeypatch.setattr(main, "_fetch_search", fetch_search)
+
+    async def run():
+        _, first = await main._cached_search("wireless earbuds", None)
+        _, cached = await main._cached_search("wireless earbuds", None)
+        calls_before_expiry = len(amazon_calls)
+        time.sleep(0.06)  # the local answer's TTL runs out
+        _, refreshed = await main._cached_search("wireless earbuds", None)
+        _, after = await main._cached_search("wireless earbuds", None)
+        return first, cached, calls_before_expiry, refreshed, after
+
+    first, cached, calls_before_expiry, refreshed, after = asyncio.run(run())
+    # Answered locally until the local TTL runs out...
+    assert len(first.value) == 10
+    assert cached.value == first.value
+    assert calls_before_expiry == 0
+    # ...then from Amazon, which is cached like any other search.
+    assert refreshed.value == [{"title": "from Amazon"}]
+    assert after.value == [{"title": "from Amazon"}]
+    assert amazon_calls == ["wireless earbuds"]
@@ -0,0 +1,52 @@
+import json
+import logging
+import sys
+
+from services.logging_setup import JsonFormatter, RouteSampler, _EagerMessageQueueHandler
+
+
+class _ListQueue(list):
+    put_nowait = list.append
+
+
+def _queued(record: logging.LogRecord) -> logging.LogRecord:
+    log_queue = _ListQueue()
+    _EagerMessageQueueHandler(log_queue).handle(record)
+    return log_queue[0]
+
+
+def test_message_is_rendered_before_the_caller_can_change_its_args():
+    cart = ["phone"]
+    record = logging.LogRecord("shop", logging.INFO, __file__, 1, "cart: %s", (cart,), None)
+    queued = _queued(record)
+    cart.append("charger")
+
+    entry = json.loads(JsonFormatter().format(queued))
+    assert entry["msg"] == "cart: ['phone']"
+    assert queued.args is None
+
+
+def test_exceptions_are_formatted_on_the_calling_thread_and_kept_separate():
+    try:
+        raise ValueError("bad price")
+    except ValueError:
+        exc_info = sys.exc_info()
+    record = logging.LogRecord("shop", logging.ERROR, __file__, 1, "import failed", (), exc_info)
+    record.url = "https://www.amazon.in/dp/B0TEST0001"
+    queued = _queued(record)
+
+    assert queued.exc_info is None
+    entry = json.loads(JsonFormatter().format(queued))
+    assert entry["msg"] == "import failed"
+    assert entry["url"] == "https://www.amazon.in/dp/B0TEST0001"
+    assert "ValueError: bad price" in entry["exc"]
+    # The plain-text format shows the traceback too.
+    assert "ValueError: bad price" in logging.Formatter().format(_queued(record))
+
+
+def test_route_sampler_uses_the_longest_matching_prefix():
+    sampler = RouteSampler.from_env("/api=0.5,/api/suggest=0,/metrics=0")
+    assert sampler.rate("/api/suggest") == 0
+    assert sampler.rate("/api/search") == 0.5
+    assert sampler.rate("/") == 1.0
+    assert not sampler.keep("/metrics")
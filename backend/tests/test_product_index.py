@@ -0,0 +1,34 @@
+from services.product_index import ProductIndex, tokenize
+
+
+def _titles(results):
+    return [r["title"] for r in results]
+
+
+def test_tokenize_splits_marketplace_titles():
+    assert tokenize("Men's T-Shirt") == ["men", "tshirt", "t", "shirt"]
+    assert tokenize("128GB Bluetooth 5.3") == ["128gb", "128", "gb", "bluetooth", "5.3"]
+
+
+def test_last_word_matches_terms_added_after_earlier_searches():
+    index = ProductIndex()
+    index.add("1", {"title": "boAt Airdopes 141"}, "boAt Airdopes 141")
+    assert _titles(index.search("airdo")) == ["boAt Airdopes 141"]
+
+    # New terms must be searchable by prefix straight away.
+    index.add("2", {"title": "boAt Airpods case"}, "boAt Airpods case")
+    assert set(_titles(index.search("air"))) == {"boAt Airdopes 141", "boAt Airpods case"}
+    assert index._sorted_terms == sorted(index._postings)
+
+
+def test_removed_terms_leave_the_prefix_list():
+    index = ProductIndex(max_docs=2)
+    index.add("1", {"title": "Redmi Note 13"}, "Redmi Note 13")
+    index.add("2", {"title": "Samsung Galaxy M14"}, "Samsung Galaxy M14")
+    index.add("3", {"title": "Realme Narzo 70"}, "Realme Narzo 70")
+
+    assert len(index) == 2
+    assert index.search("redm") == []
+    assert "redmi" not in index._sorted_terms
+    assert index._sorted_terms == sorted(index._postings)
+    assert _titles(index.search("galaxy", require_all=True)) == ["Samsung Galaxy M14"]
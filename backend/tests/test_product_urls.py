@@ -0,0 +1,40 @@
+import pytest
+
+from services.product_urls import bare_host, canonical_product_url
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.amazon.in/boAt-Airdopes-141/dp/B09N3ZNHTY/ref=sr_1_3?keywords=earbuds&tag=x-21",
+    "https://amazon.in/dp/b09n3znhty",
+    "http://m.amazon.in/gp/product/B09N3ZNHTY?psc=1",
+    "https://www.amazon.in/gp/aw/d/B09N3ZNHTY",
+])
+def test_amazon_urls_collapse_to_the_asin(url):
+    assert canonical_product_url(url) == "https://amazon.in/dp/B09N3ZNHTY"
+
+
+def test_amazon_urls_keep_their_store():
+    assert canonical_product_url("https://www.amazon.com/dp/B09N3ZNHTY?th=1") == "https://amazon.com/dp/B09N3ZNHTY"
+
+
+def test_flipkart_urls_collapse_to_the_pid():
+    assert canonical_product_url(
+        "https://dl.flipkart.com/dl/apple-iphone-15/p/itm6ac6485515ae4?pid=mobgtagpaqnvfzzy&lid=LSTMOB&otracker=hp"
+    ) == "https://flipkart.com/p?pid=MOBGTAGPAQNVFZZY"
+
+
+def test_other_urls_drop_tracking_params_and_sort_the_rest():
+    assert canonical_product_url(
+        " https://WWW.Meesho.com/saree/p/3x9k1/?utm_source=wa&size=M&color=red&fbclid=abc#reviews "
+    ) == "https://meesho.com/saree/p/3x9k1?color=red&size=M"
+    assert canonical_product_url("https://www.myntra.com/") == "https://myntra.com/"
+
+
+def test_amazon_url_without_an_asin_is_still_cleaned():
+    assert canonical_product_url("https://www.amazon.in/s?k=earbuds&ref=nb_sb_noss") == "https://amazon.in/s?k=earbuds"
+
+
+def test_bare_host_strips_one_mobile_or_www_prefix():
+    assert bare_host("DL.Flipkart.com") == "flipkart.com"
+    assert bare_host("m.media-amazon.com") == "media-amazon.com"
+    assert bare_host("shop.example.com") == "shop.example.com"
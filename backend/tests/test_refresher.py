@@ -0,0 +1,85 @@
+import asyncio
+
+from services.cache import TTLCache
+from services.cache_backends import SQLiteBackend
+from services.refresher import DealsRefresher
+
+
+def _refresher(path: str, fetch, **kwargs) -> DealsRefresher:
+    """A refresher whose deals and job caches live in the SQLite file at `path`."""
+    deals = TTLCache(ttl=60, name="deals", backend=SQLiteBackend(path, "deals"))
+    jobs = TTLCache(ttl=3600, name="refresh_jobs", backend=SQLiteBackend(path, "refresh_jobs"))
+    return DealsRefresher(deals, fetch, ["Electronics", "Fashion"], rate=1000, burst=10,
+                          backoff_base=0.001, jobs=jobs, **kwargs)
+
+
+def test_job_progress_is_visible_to_other_workers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    release = asyncio.Event()
+
+    async def fetch(category):
+        await release.wait()
+        return [f"{category} deal"]
+
+    async def run():
+        worker_a = _refresher(path, fetch)
+        worker_b = _refresher(path, fetch)
+        job = await worker_a.trigger()
+        polled_early = await worker_b.get_job(job.id)
+        release.set()
+        while job.status == "running":
+            await asyncio.sleep(0.01)
+        return job, polled_early, await worker_b.get_job(job.id), await worker_b.get_job("missing")
+
+    job, early, done, missing = asyncio.run(run())
+    assert early["job_id"] == job.id and early["status"] == "running"
+    assert done["status"] == "done"
+    assert done["categories"]["Electronics"] == {"status": "done", "attempts": 1, "deals": 1}
+    assert missing is None
+
+
+def test_failed_fetches_retry_then_keep_the_old_deals(tmp_path):
+    calls = []
+
+    async def fetch(category):
+        calls.append(category)
+        if category == "Fashion":
+            raise RuntimeError("upstream down")
+        return ["deal"]
+
+    async def run():
+        refresher = _refresher(str(tmp_path / "cache.sqlite3"), fetch, max_retries=2)
+        refresher.cache.set("Fashion", ["yesterday's deal"])
+        job = await refresher.trigger()
+        while job.status == "running":
+            await asyncio.sleep(0.01)
+        return job, refresher.cache.get("Fashion")
+
+    job, fashion = asyncio.run(run())
+    assert job.status == "partial"
+    assert job.categories["Fashion"]["status"] == "failed"
+    assert job.categories["Fashion"]["attempts"] == 3
+    assert calls.count("Fashion") == 3
+    assert fashion == ["yesterday's deal"]
+
+
+def test_a_running_manual_job_is_reused_and_due_categories_skip_fresh_ones(tmp_path):
+    release = asyncio.Event()
+
+    async def fetch(category):
+        await release.wait()
+        return ["deal"]
+
+    async def run():
+        refresher = _refresher(str(tmp_path / "cache.sqlite3"), fetch, refresh_ahead=30)
+        refresher.cache.set("Electronics", ["deal"], ttl=3600)
+        due = refresher.due_categories()
+        first = await refresher.trigger()
+        second = await refresher.trigger()
+        release.set()
+        await refresher.stop()
+        return due, first, second
+
+    due, first, second = asyncio.run(run())
+    assert due == ["Fashion"]
+    assert first is second
@@ -0,0 +1,60 @@
+import random
+
+from services import suggest
+from services.suggest import SuggestIndex
+
+
+def _texts(index: SuggestIndex, prefix: str, limit=None):
+    return [s["text"] for s in index.suggest(prefix, limit)]
+
+
+def _expected(weights: dict, prefix: str, k: int):
+    matches = [p for p in weights if p.startswith(prefix)]
+    return sorted(matches, key=lambda p: (-weights[p], p))[:k]
+
+
+def test_ranks_by_weight_then_alphabetically():
+    index = SuggestIndex(k=3)
+    index.add("Boat   Airdopes 141")
+    index.add("boat airdopes 131")
+    index.add("boat speaker", 5)
+    index.add("boat airdopes 141")
+
+    assert _texts(index, "bo") == ["boat speaker", "boat airdopes 141", "boat airdopes 131"]
+    assert _texts(index, "boat a") == ["boat airdopes 141", "boat airdopes 131"]
+    assert _texts(index, "boat a", limit=1) == ["boat airdopes 141"]
+    assert index.suggest("boat airdopes 141")[0]["weight"] == 2
+    assert _texts(index, "samsung") == []
+
+
+def test_evicts_lowest_weight_one_phrase_at_a_time():
+    index = SuggestIndex(max_phrases=3)
+    index.add("keep me", 5)
+    index.add("old")
+    index.add("newer")
+    index.add("newest")
+
+    assert len(index) == 3
+    assert _texts(index, "old") == []
+    assert _texts(index, "") == ["keep me", "newer", "newest"]
+
+
+def test_memoized_prefixes_match_a_full_scan_through_adds_and_evictions(monkeypatch):
+    monkeypatch.setattr(suggest, "MEMO_MIN_MATCHES", 5)
+    rng = random.Random(7)
+    words = ["boat", "bose", "samsung", "sony", "redmi", "realme"]
+    index = SuggestIndex(k=4, max_phrases=60)
+    for i in range(2000):
+        phrase = f"{rng.choice(words)} {rng.choice(words)} {rng.randint(1, 40)}"
+        index.add(phrase, rng.choice([1, 1, 1, 5]))
+        if i % 50 == 0:
+            # Touch a spread of prefixes so some get memoized early.
+            for prefix in ("", "b", "bo", "s", "sam", "re", "realme r"):
+                index.suggest(prefix)
+
+    weights = {p: w for p, w in index._weights.items()}
+    assert len(weights) == 60
+    assert index._phrases == sorted(weights)
+    assert index._tops, "expected some prefixes to be memoized"
+    for prefix in ("", "b", "bo", "boat", "s", "sam", "sony s", "re", "realme r", "x"):
+        assert _texts(index, prefix) == _expected(weights, prefix, 4), prefix
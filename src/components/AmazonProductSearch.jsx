@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { FaStar, FaAmazon } from 'react-icons/fa';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
@@ -17,7 +17,6 @@ function AmazonProductSearch({ onProductSelect }) {
         maxPrice: '',
         minRating: '',
         brand: '',
-        primeOnly: false,
         sortBy: 'Relevance'
     });
 
@@ -28,6 +27,36 @@ function AmazonProductSearch({ onProductSelect }) {
     const [timestamp, setTimestamp] = useState(null);
     const [isCached, setIsCached] = useState(false);
 
+    // Typeahead: suggestions come from /api/suggest (no Amazon API call), so
+    // users can settle on keywords before submitting an actual search.
+    const [suggestions, setSuggestions] = useState([]);
+
+    useEffect(() => {
+        const q = keywords.trim();
+        if (q.length < 2) {
+            setSuggestions([]);
+            return;
+        }
+        const controller = new AbortController();
+        const timer = setTimeout(async () => {
+            try {
+                const res = await fetch(`${API_URL}/api/suggest?q=${encodeURIComponent(q)}`, {
+                    signal: controller.signal,
+                });
+                if (res.ok) {
+                    const data = await res.json();
+                    setSuggestions((data.suggestions || []).map(s => s.text));
+                }
+            } catch (err) {
+                if (err.name !== 'AbortError') console.error('Suggest Error:', err);
+            }
+        }, 150);
+        return () => {
+            clearTimeout(timer);
+            controller.abort();
+        };
+    }, [keywords]);
+
     const handleSearch = async (e, loadMore = false) => {
         if (e) e.preventDefault();
         setError('');
@@ -56,7 +85,6 @@ function AmazonProductSearch({ onProductSelect }) {
                     max_price: maxPrice,
                     min_rating: filters.minRating ? parseInt(filters.minRating) : null,
                     brand: filters.brand || null,
-                    prime_only: filters.primeOnly,
                     sort_by: filters.sortBy !== 'Relevance' ? filters.sortBy : null,
                     page,
                     items_per_page: 10
@@ -108,7 +136,6 @@ function AmazonProductSearch({ onProductSelect }) {
             maxPrice: '',
             minRating: '',
             brand: '',
-            primeOnly: false,
             sortBy: 'Relevance'
         });
     };
@@ -135,8 +162,13 @@ function AmazonProductSearch({ onProductSelect }) {
                             onChange={(e) => setKeywords(e.target.value)}
                             placeholder="Search keywords (e.g., wireless headphones)"
                             className="w-full px-3 py-2 border border-gray-300 rounded"
+                            list="amazon-search-suggestions"
+                            autoComplete="off"
                             required
                         />
+                        <datalist id="amazon-search-suggestions">
+                            {suggestions.map(text => <option key={text} value={text} />)}
+                        </datalist>
                     </div>
                     <div>
                         <select
@@ -229,19 +261,6 @@ function AmazonProductSearch({ onProductSelect }) {
                             </select>
                         </div>
 
-                        {/* Prime Only */}
-                        <div className="flex items-end">
-                            <label className="flex items-center cursor-pointer">
-                                <input
-                                    type="checkbox"
-                                    checked={filters.primeOnly}
-                                    onChange={(e) => setFilters({ ...filters, primeOnly: e.target.checked })}
-                                    className="mr-2"
-                                />
-                                <span className="text-sm font-medium">Prime Only</span>
-                            </label>
-                        </div>
-
                         {/* Clear Filters */}
                         <div className="flex items-end">
                             <button
@@ -323,11 +342,6 @@ function AmazonProductSearch({ onProductSelect }) {
                                                 Save {product.savingsPercent}%
                                             </span>
                                         )}
-                                        {product.isPrime && (
-                                            <span className="text-xs bg-blue-100 text-blue-800 px-2 py-1 rounded">
-                                                Prime
-                                            </span>
-                                        )}
                                     </div>
                                     {product.price && (
                                         <div className="text-xs text-gray-500 mb-2">